@@ -0,0 +1,51 @@
+"""
+セリフからキャラクターのアクション・感情を推論します。
+app_server.py と script_compiler.py で共有します。
+
+ルールは dictionaries/inference_rules.json に置き、読み込み時にキーワードの
+オートマトンへコンパイルします。ファイルが更新されると次の呼び出しで読み直すので、
+uvicorn を再起動せずにルールを調整できます。推論はセリフを1回走査するだけで、
+ルールの数が増えても速度はほとんど変わりません。
+"""
+
+import os
+import json
+import threading
+from keyword_matcher import KeywordMatcher
+
+RULES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "dictionaries", "inference_rules.json")
+
+_lock = threading.Lock()
+_compiled = {"stamp": None, "matchers": {}}
+
+def _load_rules(path=None):
+    """ルールファイルが更新されていればコンパイルし直し、{種類: (マッチャー, 既定値)} を返します。"""
+    path = path or RULES_PATH
+    stat = os.stat(path)
+    stamp = (path, stat.st_mtime_ns, stat.st_size)
+    with _lock:
+        if _compiled["stamp"] == stamp:
+            return _compiled["matchers"]
+        with open(path, "r", encoding="utf-8") as f:
+            rules = json.load(f)
+        matchers = {
+            kind: (KeywordMatcher(section.get("rules") or {}), section.get("default"))
+            for kind, section in rules.items()
+            if not kind.startswith("_")
+        }
+        _compiled["stamp"] = stamp
+        _compiled["matchers"] = matchers
+        return matchers
+
+def infer(kind: str, text: str) -> str:
+    """kind（"action" / "emotion"）のルールで最もスコアの高いラベルを返す"""
+    matcher, default = _load_rules()[kind]
+    return matcher.best_scored_label(text, default=default)
+
+def infer_action(text: str) -> str:
+    """セリフの内容からアクションを推論する"""
+    return infer("action", text)
+
+def infer_emotion(text: str) -> str:
+    """セリフの内容から感情（表情）を推論する"""
+    return infer("emotion", text)
@@ -1,17 +1,24 @@
-import json
 import requests
 import asyncio
 import uuid
 import os
-import subprocess
 import base64
 import re
 import threading
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse
+from fastapi.responses import Response, StreamingResponse
 from pydantic import BaseModel
 from typing import List, Optional, Any, Dict
+from action_inference import infer_action
+from scene_store import get_store, scene_delta
+from content_hash import is_blob
+import json_io
+from media_response import file_response, content_hash, IMMUTABLE_CACHE
+from render_profiles import get_profile, profile_options, DEFAULT_PROFILE
+from remotion_render import prebuild_bundle
+from voicevox_client import VoicevoxClient
+from render_pool import get_pool, RenderCancelled
 
 app = FastAPI(title="VisionForge Studio Backend")
 
@@ -35,15 +42,25 @@ SPEAKER_IDS = {
     "kanon": 10
 }
 
+# 発音辞書（dictionaries/voicevox_user_dict.tsv）の同期用。同期できるまで合成のたびに試す
+voicevox = VoicevoxClient(VOICEVOX_URL)
+
+# セリフ末尾の余白（秒）。durationには足さず padding として保存する
+VOICE_PADDING = 0.3
+
 VIDEO_DIR = os.path.join(BASE_DIR, "video")
 OUTPUT_DIR = os.path.join(VIDEO_DIR, "out")
 
 # Render state management
 render_state: Dict[str, Any] = {
-    "status": "idle",  # idle | rendering | done | error
+    "status": "idle",  # idle | rendering | done | error | cancelled
     "progress": 0,
     "error": None,
+    # レンダリング中は phase（bundling / selecting / rendering / encoding）、
+    # renderedFrames / totalFrames、fps、eta（秒）も入る
 }
+# 実行中のレンダリングジョブ（キャンセル用）
+render_job = None
 
 class Scene(BaseModel):
     id: int
@@ -54,6 +71,7 @@ class Scene(BaseModel):
     audio: str
     image: Optional[str] = None
     duration: Optional[float] = None
+    padding: Optional[float] = None
 
 class ScriptUpdate(BaseModel):
     scenes: List[Scene]
@@ -73,6 +91,7 @@ def get_audio_duration(file_path):
 
 def generate_voice(text, speaker_id, filename, speaker_name="kanon", speed_scale=1.0):
     print(f"🎤 音声生成中 ({speaker_name}, speed={speed_scale}): {text[:10]}...")
+    voicevox.sync_user_dict()
     try:
         # クエリ作成
         res1 = requests.post(f"{VOICEVOX_URL}/audio_query", params={"text": text, "speaker": speaker_id})
@@ -97,127 +116,337 @@ def generate_voice(text, speaker_id, filename, speaker_name="kanon", speed_scale
         with open(output_path, "wb") as f:
             f.write(res2.content)
             
-        # 実際のファイルから長さを取得し、少し余裕を持たせる
-        return get_audio_duration(output_path) + 0.3
+        # 実際のファイルから長さを取得（余白は呼び出し側で padding として付与）
+        return get_audio_duration(output_path)
     except Exception as e:
         print(f"❌ 音声生成エラー: {e}")
         return 5.0
 
-def infer_action(text: str) -> str:
-    """セリフの内容からアクションを推論する"""
-    keywords = {
-        "fly_away": ["うわあ", "わああ", "吹っ飛", "飛ばさ", "助けて", "ぎゃあ", "きゃあ"],
-        "run_left": ["逃げろ", "さらば", "バイバイ", "走れ", "逃げる"],
-        "run_right": ["あっちいけ", "行け", "急げ"],
-        "jump": ["ジャンプ", "跳ぶ", "やった", "うれしい", "わーい"],
-        "big_jump": ["大ジャンプ", "高く跳ぶ", "すごい"],
-        "nod": ["うん", "はい", "そうですね", "納得", "了解", "なるほど", "承知"],
-        "shake_head": ["ダメ", "違う", "無理", "嫌だ", "そんな", "いやだ", "お断り"],
-        "shiver": ["怖い", "寒い", "震える", "ゾクゾク", "ひえっ"],
-        "spin": ["回転", "回る", "くるくる", "ダンス"],
-        "zoom_in": ["注目", "見て", "ドアップ", "ここからです"],
-        "back_off": ["やめて", "近寄るな", "引くわ", "ドン引き"],
-        "angry_vibe": ["激怒", "許さん", "ぶっ飛ばす", "怒った"],
-        "happy_hop": ["ルンルン", "楽しい", "わくわく"],
-        "fall_down": ["ガーン", "絶望", "力尽きた", "無理です"],
-        "thinking": ["うーん", "考え中", "どうしよう", "かな？"]
-    }
-    
-    for action, words in keywords.items():
-        if any(word in text for word in words):
-            return action
-    return "none"
+class SceneIndex:
+    """
+    cat_data.json をメモリ上に id→シーン の索引として保持します。
+    書き込みは scene_store 経由で行い、他のプロセス（生成スクリプト等）が
+    書き換えてリビジョンが進んでいれば、次のアクセス時に読み直します。
+    """
+    def __init__(self, path):
+        self.store = get_store(path)
+        self.lock = threading.Lock()
+        self.revision = None
+        self.order: List[int] = []
+        self.by_id: Dict[int, dict] = {}
+        # GET /api/script 用にシリアライズ済みの本文をリビジョンごとにキャッシュする
+        self._body = None
+        self._etag = None
+
+    def _refresh(self):
+        if self.store.revision() == self.revision:
+            return
+        scenes, self.revision = self.store.read()
+        self.order = [s["id"] for s in scenes]
+        self.by_id = {s["id"]: s for s in scenes}
+        self._body = None
+        # 読み直した後に別の書き込みがあっても、キャッシュする本文と同じリビジョンの ETag にする
+        self._etag = self.store.etag(self.revision)
+
+    def _write(self):
+        # 人が直接編集するファイルなので、生成スクリプトと同じく整形して書き出す
+        self.revision = self.store.write([self.by_id[i] for i in self.order])
+        self._body = None
+        self._etag = self.store.etag(self.revision)
+
+    def scenes(self) -> List[dict]:
+        with self.lock:
+            self._refresh()
+            return [self.by_id[i] for i in self.order]
+
+    def snapshot(self):
+        """(リビジョン, シーンのリスト) を返します。変更通知の差分計算用。"""
+        with self.lock:
+            self._refresh()
+            return self.revision, [self.by_id[i] for i in self.order]
+
+    def body(self):
+        """(ETag, JSON本文) を返します。リビジョンが変わらない限り再シリアライズしません。"""
+        with self.lock:
+            self._refresh()
+            if self._body is None:
+                scenes = [self.by_id[i] for i in self.order]
+                self._body = json_io.dumps(scenes)
+            return self._etag, self._body
+
+    def get(self, scene_id: int) -> Optional[dict]:
+        with self.lock:
+            self._refresh()
+            return self.by_id.get(scene_id)
+
+    def replace_all(self, scenes: List[dict]):
+        with self.lock, self.store.lock:
+            self.order = [s["id"] for s in scenes]
+            self.by_id = {s["id"]: s for s in scenes}
+            self._write()
+
+    def replace(self, scene: dict) -> bool:
+        """既存のシーンを1つ差し替えます。そのIDのシーンがなければ何もせず False を返します。"""
+        with self.lock, self.store.lock:
+            self._refresh()
+            if scene["id"] not in self.by_id:
+                return False
+            self.by_id[scene["id"]] = scene
+            self._write()
+            return True
+
+    def apply(self, changed: List[dict], deleted: List[int]):
+        """変更されたシーンだけを差し替え（新しいIDは末尾に追加）、削除IDを取り除きます。"""
+        with self.lock, self.store.lock:
+            self._refresh()
+            for scene in changed:
+                if scene["id"] not in self.by_id:
+                    self.order.append(scene["id"])
+                self.by_id[scene["id"]] = scene
+            removed = {i for i in deleted if i in self.by_id}
+            if removed:
+                self.order = [i for i in self.order if i not in removed]
+                for i in removed:
+                    del self.by_id[i]
+            self._write()
+            return len(removed)
+
+scene_index = SceneIndex(JSON_PATH)
+
+def process_scene(scene: Scene, old_scene: Optional[dict], generate_audio: bool, speed_scale: float) -> dict:
+    """保存前のシーンにアクション推論・音声生成を行います。old_scene は保存済みの同じIDのシーン。"""
+    scene_dict = scene.dict()
+    # 画像だけ・カットインのシーンなど、text を持たない保存済みシーンもある
+    text_changed = old_scene is not None and scene.text != old_scene.get("text")
+
+    # アクションが未指定、またはテキストが変わっていたら推論
+    if scene.action == "none" or text_changed:
+        scene_dict["action"] = infer_action(scene.text)
+
+    # ファイル名がない場合は生成（パスだけは確保しておく）
+    if not scene.audio:
+        scene_dict["audio"] = f"audio/{uuid.uuid4()}.wav"
+        scene_dict["duration"] = 5.0 # デフォルト
+
+    # ディレクトリ確認
+    if generate_audio:
+        os.makedirs(os.path.join(PUBLIC_DIR, "audio"), exist_ok=True)
+
+    # 音声生成が必要か判定
+    needs_update = old_scene is None or text_changed
+    file_exists = os.path.exists(os.path.join(PUBLIC_DIR, scene_dict["audio"]))
+
+    if generate_audio and (needs_update or not file_exists):
+        # dedup_assets.py でまとめた blobs/ の音声は他のシーンと共有しているので、上書きせず新しいパスに書く
+        if is_blob(scene_dict["audio"]):
+            scene_dict["audio"] = f"audio/{uuid.uuid4()}.wav"
+        speaker_id = SPEAKER_IDS.get(scene.speaker, 10)
+        duration = generate_voice(scene.text, speaker_id, scene_dict["audio"], scene.speaker, speed_scale)
+        scene_dict["duration"] = duration
+        scene_dict["padding"] = VOICE_PADDING
+    elif not needs_update:
+        # 変わっていなければ以前の再生時間を維持
+        scene_dict["duration"] = old_scene.get("duration", 5.0)
+        scene_dict["padding"] = old_scene.get("padding")
+        if scene.action == "none": # 明示的に変えてない場合のみ継承
+            scene_dict["action"] = old_scene.get("action", "none")
+    # 音声生成せず保存だけする場合は、durationは仮のまま更新しない
+
+    return scene_dict
+
+class SceneFeed:
+    """
+    シーンの変更を購読者（SSE接続）に配信します。
+    監視は1本のタスクで行い、リビジョンが進んだら変わったシーンだけの差分を全購読者へ送ります。
+    CLIの生成スクリプトによる書き込みも、リビジョンの変化として検知されます。
+    """
+    def __init__(self, index: SceneIndex, interval: float = 0.5):
+        self.index = index
+        self.interval = interval
+        self.subscribers: set = set()
+        self.task = None
+
+    def subscribe(self) -> asyncio.Queue:
+        queue: asyncio.Queue = asyncio.Queue(maxsize=100)
+        self.subscribers.add(queue)
+        if self.task is None or self.task.done():
+            self.task = asyncio.create_task(self._watch())
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue):
+        self.subscribers.discard(queue)
+
+    async def _watch(self):
+        revision, scenes = await asyncio.to_thread(self.index.snapshot)
+        while self.subscribers:
+            await asyncio.sleep(self.interval)
+            current = await asyncio.to_thread(self.index.store.revision)
+            if current == revision:
+                continue
+            revision, new_scenes = await asyncio.to_thread(self.index.snapshot)
+            event = {"revision": revision, **scene_delta(scenes, new_scenes)}
+            scenes = new_scenes
+            for queue in list(self.subscribers):
+                try:
+                    queue.put_nowait(event)
+                except asyncio.QueueFull:
+                    # 受け取りが追いつかない接続は切断し、再接続時に全体を取り直してもらう
+                    self.subscribers.discard(queue)
+                    while not queue.empty():
+                        queue.get_nowait()
+                    queue.put_nowait(None)
+
+scene_feed = SceneFeed(scene_index)
 
 @app.get("/api/script")
-async def get_script():
+async def get_script(request: Request):
     try:
-        if not os.path.exists(JSON_PATH):
-            return []
-        with open(JSON_PATH, "r", encoding="utf-8") as f:
-            return json.load(f)
+        etag, body = scene_index.body()
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+    # 毎回再検証させ、変わっていなければ本文を返さない
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+@app.get("/api/script/events")
+async def script_events(request: Request):
+    """シーンの変更を Server-Sent Events で配信します（event: scenes、data: 差分JSON）。"""
+    queue = scene_feed.subscribe()
+
+    async def stream():
+        try:
+            yield f"event: ready\ndata: {json_io.dumps({'revision': scene_index.store.revision()}).decode()}\n\n"
+            while True:
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=15)
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        break
+                    # 接続維持用のコメント行
+                    yield ": keep-alive\n\n"
+                    continue
+                if event is None:
+                    break
+                data = json_io.dumps(event).decode("utf-8")
+                yield f"id: {event['revision']}\nevent: scenes\ndata: {data}\n\n"
+        finally:
+            scene_feed.unsubscribe(queue)
+
+    return StreamingResponse(stream(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache"})
 
 @app.post("/api/save")
 async def save_script(data: ScriptUpdate, generate_audio: bool = True, speed_scale: float = 1.0):
     try:
-        # 1. 既存のデータと比較して、テキストが変わったシーンだけ音声を再生成
-        old_data = []
-        if os.path.exists(JSON_PATH):
-            with open(JSON_PATH, "r", encoding="utf-8") as f:
-                old_data = json.load(f)
-        
-        old_texts = {s["id"]: s["text"] for s in old_data}
-        
-        new_scenes = []
-        for scene in data.scenes:
-            scene_dict = scene.dict()
-            
-            # アクションが未指定、またはテキストが変わっていたら推論
-            if scene.action == "none" or (scene.id in old_texts and scene.text != old_texts[scene.id]):
-                scene_dict["action"] = infer_action(scene.text)
-            
-            # ファイル名がない場合は生成（パスだけは確保しておく）
-            if not scene.audio:
-                scene_dict["audio"] = f"audio/{uuid.uuid4()}.wav"
-                scene_dict["duration"] = 5.0 # デフォルト
-            
-            # ディレクトリ確認
-            if generate_audio:
-                os.makedirs(os.path.join(PUBLIC_DIR, "audio"), exist_ok=True)
-
-            # 音声生成が必要か判定
-            needs_update = scene.id not in old_texts or scene.text != old_texts[scene.id]
-            file_exists = os.path.exists(os.path.join(PUBLIC_DIR, scene_dict["audio"]))
-
-            if generate_audio and (needs_update or not file_exists):
-                speaker_id = SPEAKER_IDS.get(scene.speaker, 10)
-                duration = generate_voice(scene.text, speaker_id, scene_dict["audio"], scene.speaker, speed_scale)
-                scene_dict["duration"] = duration
-            elif not generate_audio and needs_update:
-                 # 音声生成せず保存だけする場合でも、durationは仮で維持するか更新しない
-                 pass
-            elif not needs_update:
-                # 変わっていなければ以前の再生時間を維持
-                old_scene = next((s for s in old_data if s["id"] == scene.id), None)
-                if old_scene:
-                    scene_dict["duration"] = old_scene.get("duration", 5.0)
-                    if scene.action == "none": # 明示的に変えてない場合のみ継承
-                         scene_dict["action"] = old_scene.get("action", "none")
-            
-            new_scenes.append(scene_dict)
-
-        # 2. JSONを保存
-        with open(JSON_PATH, "w", encoding="utf-8") as f:
-            json.dump(new_scenes, f, ensure_ascii=False, indent=2)
-            
+        # 既存のデータと比較して、テキストが変わったシーンだけ音声を再生成
+        new_scenes = [
+            process_scene(scene, scene_index.get(scene.id), generate_audio, speed_scale)
+            for scene in data.scenes
+        ]
+        scene_index.replace_all(new_scenes)
         return {"status": "success", "message": "保存と音声生成、アクション推論が完了しました"}
     except Exception as e:
         print(f"Error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+class ScenePatch(BaseModel):
+    scenes: List[Scene] = []
+    deleted: List[int] = []
+
+@app.patch("/api/scenes")
+async def patch_scenes(data: ScenePatch, generate_audio: bool = True, speed_scale: float = 1.0):
+    """変更・追加されたシーンと削除されたIDだけを受け取って保存します（並び順は維持、新規は末尾）。"""
+    try:
+        changed = [
+            process_scene(scene, scene_index.get(scene.id), generate_audio, speed_scale)
+            for scene in data.scenes
+        ]
+        deleted = scene_index.apply(changed, data.deleted)
+        return {"status": "success", "updated": len(changed), "deleted": deleted}
+    except Exception as e:
+        print(f"Error: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.patch("/api/scenes/{scene_id}")
+async def patch_scene(scene_id: int, scene: Scene, generate_audio: bool = True, speed_scale: float = 1.0):
+    """既存のシーンを1つだけ更新します（存在しないIDは 404）。"""
+    old_scene = scene_index.get(scene_id)
+    if old_scene is None:
+        raise HTTPException(status_code=404, detail=f"シーン {scene_id} が見つかりません")
+    scene.id = scene_id
+    try:
+        scene_dict = process_scene(scene, old_scene, generate_audio, speed_scale)
+        replaced = scene_index.replace(scene_dict)
+    except Exception as e:
+        print(f"Error: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+    if not replaced:
+        # 音声生成の間に他の処理で削除された
+        raise HTTPException(status_code=404, detail=f"シーン {scene_id} が見つかりません")
+    return {"status": "success", "scene": scene_dict}
+
+@app.post("/api/script/undo")
+async def undo_script():
+    """直前の保存を取り消します（生成スクリプトによる書き込みも対象）。"""
+    try:
+        revision = scene_index.store.undo()
+    except IndexError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return {"status": "success", "revision": revision}
+
 from fastapi import File, UploadFile
-import shutil
+import hashlib
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from image_variants import ingest_image
+
+UPLOAD_DIR = "images/uploads"
+UPLOAD_CHUNK = 1024 * 1024
+# 画像の変換はCPUを使うので、イベントループとは別のスレッドで行う
+variant_pool = ThreadPoolExecutor(max_workers=2)
 
 @app.post("/api/upload_image")
 async def upload_image(file: UploadFile = File(...)):
+    """
+    画像をチャンクごとにディスクへ書き出しながらハッシュを計算し、内容ハッシュ名で保存します。
+    同じ画像は重複保存せず、レンダリング用とサムネイルのURLも返します。
+    url はレンダリング用（従来の呼び出し元との互換のため）。
+    """
+    upload_dir = os.path.join(PUBLIC_DIR, UPLOAD_DIR)
+    os.makedirs(upload_dir, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(prefix=".upload_", dir=upload_dir)
     try:
-        # ディレクトリ確認
-        upload_dir = os.path.join(PUBLIC_DIR, "images")
-        os.makedirs(upload_dir, exist_ok=True)
-        
-        # 安全なファイル名を生成
-        file_extension = os.path.splitext(file.filename)[1]
-        new_filename = f"{uuid.uuid4()}{file_extension}"
-        file_location = os.path.join(upload_dir, new_filename)
-        
-        with open(file_location, "wb+") as file_object:
-            shutil.copyfileobj(file.file, file_object)
-            
-        return {"status": "success", "url": f"images/{new_filename}"}
+        digest = hashlib.sha256()
+        with os.fdopen(fd, "wb") as out:
+            while chunk := await file.read(UPLOAD_CHUNK):
+                digest.update(chunk)
+                await asyncio.to_thread(out.write, chunk)
+
+        loop = asyncio.get_running_loop()
+        result = await loop.run_in_executor(
+            variant_pool, ingest_image, tmp_path, upload_dir, digest.hexdigest()[:20])
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         print(f"Error uploading image: {e}")
         raise HTTPException(status_code=500, detail=str(e))
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+    def rel(path):
+        return os.path.relpath(path, PUBLIC_DIR).replace(os.sep, "/")
+
+    return {
+        "status": "success",
+        "url": rel(result["render"]),
+        "original": rel(result["original"]),
+        "render": rel(result["render"]),
+        "thumbnail": rel(result["thumbnail"]),
+        "deduplicated": result["deduplicated"],
+    }
 
 # ============================================================
 # Render API - 動画エクスポート
@@ -226,6 +455,8 @@ async def upload_image(file: UploadFile = File(...)):
 class RenderRequest(BaseModel):
     blocks: List[dict]
     imageSpans: Optional[List[dict]] = []
+    profile: Optional[str] = DEFAULT_PROFILE  # draft | proxy | final
+    concurrency: Optional[int] = None         # 省略時はCPUコア数から決める
 
 def extract_and_save_images(blocks: List[dict]) -> List[dict]:
     """base64画像をファイルに保存し、パスに置換する"""
@@ -275,69 +506,36 @@ def save_base64_image(data_url: str, output_dir: str) -> str:
         f.write(base64.b64decode(img_data))
     return filename
 
-def run_render(props_path: str, output_path: str):
-    """Remotion レンダリングをバックグラウンドで実行"""
-    global render_state
-    render_state = {"status": "rendering", "progress": 0, "error": None}
+def run_render(props_path: str, output_path: str, options: Dict[str, Any]):
+    """Remotion レンダリングを常駐ワーカーで実行（バックグラウンドスレッドから呼ぶ）"""
+    global render_state, render_job
+
+    def on_event(event: dict):
+        # render_worker.mjs から届く構造化された進捗でジョブの状態を更新する
+        if event["type"] == "phase":
+            render_state["phase"] = event["phase"]
+        elif event["type"] == "progress":
+            render_state["phase"] = event["phase"]
+            render_state["progress"] = min(99, int(event["progress"] * 100))
+            for key in ("renderedFrames", "encodedFrames", "totalFrames", "fps", "eta"):
+                if key in event:
+                    render_state[key] = event[key]
 
     try:
-        os.makedirs(os.path.dirname(output_path), exist_ok=True)
-
-        cmd = [
-            "npx", "remotion", "render",
-            "src/index.ts", "EditorExport",
-            output_path,
-            f"--props={props_path}",
-            "--log=verbose",
-        ]
-        print(f"[Render] Starting: {' '.join(cmd)}")
-
-        process = subprocess.Popen(
-            cmd,
-            cwd=VIDEO_DIR,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.STDOUT,
-            text=True,
-            encoding="utf-8",
-            errors="replace",
-            shell=True,
-        )
-
-        for line in iter(process.stdout.readline, ""):
-            line = line.strip()
-            if not line:
-                continue
-            print(f"[Render] {line}")
-
-            # Parse progress from Remotion output (e.g., "Rendering frame 30/300 (10%)")
-            progress_match = re.search(r'(\d+)%', line)
-            if progress_match:
-                render_state["progress"] = int(progress_match.group(1))
-
-            # Also detect "x/y" frame patterns
-            frame_match = re.search(r'(\d+)/(\d+)', line)
-            if frame_match:
-                current = int(frame_match.group(1))
-                total = int(frame_match.group(2))
-                if total > 0:
-                    render_state["progress"] = min(99, int(current / total * 100))
-
-        process.wait()
-
-        if process.returncode == 0 and os.path.exists(output_path):
-            render_state = {"status": "done", "progress": 100, "error": None}
-            print(f"[Render] Complete: {output_path}")
-        else:
-            render_state = {
-                "status": "error",
-                "progress": render_state.get("progress", 0),
-                "error": f"Render failed with exit code {process.returncode}",
-            }
-            print(f"[Render] Failed with code {process.returncode}")
-
+        render_job = get_pool().submit("EditorExport", output_path, props_path, options, on_event)
+        render_job.wait()
+        render_state = {"status": "done", "progress": 100, "error": None, "phase": "done"}
+        print(f"[Render] Complete: {output_path}")
     except Exception as e:
-        render_state = {"status": "error", "progress": 0, "error": str(e)}
-        print(f"[Render] Error: {e}")
+        render_state = {
+            "status": "cancelled" if isinstance(e, RenderCancelled) else "error",
+            "progress": render_state.get("progress", 0),
+            "error": str(e),
+            "phase": render_state.get("phase"),
+        }
+        print(f"[Render] Failed: {e}")
+    finally:
+        render_job = None
 
 @app.post("/api/render")
 async def start_render(data: RenderRequest):
@@ -346,49 +544,122 @@ async def start_render(data: RenderRequest):
     if render_state.get("status") == "rendering":
         raise HTTPException(status_code=409, detail="Render already in progress")
 
+    try:
+        profile = get_profile(data.profile)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
     try:
         # 1. Extract and save base64 images to files
         updated_blocks = extract_and_save_images(data.blocks)
 
-        # 2. Save props JSON
+        # 2. Save props JSON（fps はコンポジションの calculateMetadata で使う）
         props = {
             "blocks": updated_blocks,
             "imageSpans": data.imageSpans or [],
+            "fps": profile["fps"],
         }
         props_path = os.path.join(VIDEO_DIR, "render_props.json")
-        with open(props_path, "w", encoding="utf-8") as f:
-            json.dump(props, f, ensure_ascii=False)
+        json_io.dump_file(props_path, props)
 
         # 3. Start render in background thread
         output_path = os.path.join(OUTPUT_DIR, "export.mp4")
+        render_state = {"status": "rendering", "progress": 0, "error": None, "phase": "starting"}
         thread = threading.Thread(
             target=run_render,
-            args=(props_path, output_path),
+            args=(props_path, output_path, profile_options(data.profile, data.concurrency)),
             daemon=True,
         )
         thread.start()
 
-        return {"status": "started"}
+        return {"status": "started", "profile": data.profile}
 
     except Exception as e:
         print(f"[Render] Start error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.on_event("startup")
+async def sync_voicevox_dict():
+    """起動時にバックグラウンドで発音辞書をエンジンに登録し、最初の音声生成から読みを反映する"""
+    threading.Thread(target=voicevox.sync_user_dict, daemon=True).start()
+
+@app.on_event("startup")
+async def warm_render_bundle():
+    """起動時にバックグラウンドでバンドルとワーカー（Chromium）を用意し、最初のエクスポートを速くする"""
+    def build():
+        try:
+            prebuild_bundle()
+            print("[Render] Bundle ready")
+            get_pool().warm()
+        except Exception as e:
+            print(f"[Render] Warm-up skipped: {e}")
+    threading.Thread(target=build, daemon=True).start()
+
+@app.on_event("shutdown")
+async def stop_render_workers():
+    # 書き出し中ならキャンセルしてから、ワーカー（Node と Chromium）を止める
+    if render_job is not None:
+        render_job.cancel()
+    await asyncio.to_thread(get_pool().close)
+
+@app.post("/api/render/cancel")
+async def cancel_render():
+    job = render_job
+    if job is None or job.done():
+        raise HTTPException(status_code=409, detail="No render in progress")
+    job.cancel()
+    return {"status": "cancelling"}
+
 @app.get("/api/render/status")
 async def get_render_status():
     return render_state
 
 @app.get("/api/render/download")
-async def download_render():
+async def download_render(request: Request):
     output_path = os.path.join(OUTPUT_DIR, "export.mp4")
     if not os.path.exists(output_path):
         raise HTTPException(status_code=404, detail="Export file not found")
-    return FileResponse(
-        output_path,
+    # Range 対応なので、プレビュー再生でもシークした位置から読み込める
+    return await asyncio.to_thread(
+        file_response, request, output_path,
         media_type="video/mp4",
         filename="visionforge_export.mp4",
     )
 
+# ============================================================
+# Media API - public/audio, public/images（と dedup_assets.py でまとめた blobs）の配信
+# ============================================================
+
+MEDIA_DIRS = ("audio", "images", "blobs")
+
+def resolve_media_path(path: str) -> str:
+    """public 配下の audio/ images/ blobs/ のファイルだけを許可し、実パスを返します。"""
+    full = os.path.realpath(os.path.join(PUBLIC_DIR, path))
+    for kind in MEDIA_DIRS:
+        root = os.path.realpath(os.path.join(PUBLIC_DIR, kind))
+        if full.startswith(root + os.sep) and os.path.isfile(full):
+            return full
+    raise HTTPException(status_code=404, detail="Media not found")
+
+@app.get("/api/media_url")
+async def media_url(path: str):
+    """内容ハッシュ付きのURLを返します。このURLはブラウザに長期間キャッシュされます。"""
+    full = resolve_media_path(path)
+    digest = await asyncio.to_thread(content_hash, full)
+    return {"url": f"/api/media/{path}?v={digest[:16]}"}
+
+@app.get("/api/media/{path:path}")
+async def get_media(path: str, request: Request, v: Optional[str] = None):
+    """
+    音声・画像を Range / ETag 対応で配信します。
+    ?v= が現在の内容ハッシュと一致すれば immutable として長期キャッシュさせ、
+    それ以外は毎回 ETag で再検証させます（同じ名前で上書きされる音声があるため）。
+    """
+    full = resolve_media_path(path)
+    digest = await asyncio.to_thread(content_hash, full)
+    cache_control = IMMUTABLE_CACHE if v == digest[:16] else "no-cache"
+    return await asyncio.to_thread(file_response, request, full, cache_control=cache_control)
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
@@ -0,0 +1,223 @@
+"""
+オフライン音声マスタリング
+ナレーションWAVとBGMのラウドネスを事前に測定し、シーンJSONに
+正規化ゲインとBGMのダッキング量を書き込みます。
+Remotion側はこの値を volume に渡すだけで済み、レンダリング時の音声処理は不要です。
+
+    python src/audio_mastering.py [video/public/cat_data.json]
+"""
+
+import os
+import sys
+import struct
+import subprocess
+from functools import partial
+import numpy as np
+from ffmpeg_bin import ffmpeg_exe
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PUBLIC_DIR = os.path.join(BASE_DIR, "video", "public")
+
+# ラウドネス目標値 (LUFS相当)
+VOICE_TARGET_LUFS = -16.0
+BGM_TARGET_LUFS = -24.0
+# ナレーション中にBGMを下げる量 (dB)
+DUCK_DB = -10.0
+# ゲインの上限（無音に近いファイルを極端に持ち上げない）
+MAX_GAIN = 4.0
+# クリップ防止のピーク上限 (約 -0.2 dBFS)
+PEAK_CEILING = 0.98
+# Remotion 側（HelloWorld.tsx の BGMController）が再生するBGM。
+# シーンの bgm は今のところ再生に使われないので、ゲインは常にこのファイルで測る
+DEFAULT_BGM = "bgm/bgm_cute_main.mp3"
+# BGMを測定できない場合の音量（従来の固定値）
+FALLBACK_BGM_GAIN = 0.15
+
+# 測定ブロック長（BS.1770 のゲーティングブロックに合わせて400ms）
+BLOCK_SEC = 0.4
+ABSOLUTE_GATE_LUFS = -70.0
+RELATIVE_GATE_LU = -10.0
+
+_loudness_cache = {}
+
+def log(msg):
+    print(msg, flush=True)
+
+def _read_wav_layout(file_path):
+    """RIFFチャンクを走査し、fmt情報とdataチャンクの位置を返します。"""
+    with open(file_path, "rb") as f:
+        header = f.read(12)
+        if len(header) < 12 or header[:4] != b"RIFF" or header[8:12] != b"WAVE":
+            return None
+        fmt = None
+        while True:
+            chunk = f.read(8)
+            if len(chunk) < 8:
+                return None
+            chunk_id, chunk_size = struct.unpack("<4sI", chunk)
+            if chunk_id == b"fmt ":
+                body = f.read(chunk_size)
+                format_tag, channels, rate, _, _, bits = struct.unpack("<HHIIHH", body[:16])
+                if format_tag == 0xFFFE and len(body) >= 26:
+                    # WAVE_FORMAT_EXTENSIBLE: サブフォーマットの先頭2バイトが実際の形式
+                    format_tag = struct.unpack("<H", body[24:26])[0]
+                fmt = (format_tag, channels, rate, bits)
+            elif chunk_id == b"data":
+                if fmt is None:
+                    return None
+                return fmt + (f.tell(), chunk_size)
+            else:
+                f.seek(chunk_size, 1)
+            if chunk_size % 2:
+                f.seek(1, 1)
+
+def _wav_blocks(file_path, block_sec):
+    """WAVをメモリマップし、(フレーム数, チャンネル数)のfloat配列をブロック単位で返します。"""
+    layout = _read_wav_layout(file_path)
+    if layout is None:
+        return None
+    format_tag, channels, rate, bits, offset, size = layout
+    dtypes = {(1, 8): "u1", (1, 16): "<i2", (1, 32): "<i4", (3, 32): "<f4", (3, 64): "<f8"}
+    dtype = dtypes.get((format_tag, bits))
+    if dtype is None:
+        return None  # 24bit等はffmpegデコードに任せる
+
+    def generate():
+        samples = np.memmap(file_path, dtype=dtype, mode="r", offset=offset,
+                            shape=(size // (bits // 8),))
+        frames = samples[: len(samples) - len(samples) % channels].reshape(-1, channels)
+        step = max(1, int(rate * block_sec))
+        for start in range(0, len(frames), step):
+            block = np.asarray(frames[start:start + step], dtype=np.float64)
+            if dtype == "u1":
+                block = (block - 128.0) / 128.0
+            elif dtype == "<i2":
+                block /= 32768.0
+            elif dtype == "<i4":
+                block /= 2147483648.0
+            yield block
+
+    return generate()
+
+def _ffmpeg_blocks(file_path, block_sec, rate=48000, channels=2):
+    """MP3等をffmpegでfloat32にデコードしながらブロック単位で返します。"""
+    cmd = [ffmpeg_exe(), "-v", "error", "-i", file_path,
+           "-f", "f32le", "-ac", str(channels), "-ar", str(rate), "-"]
+    block_bytes = int(rate * block_sec) * channels * 4
+    process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+    try:
+        while True:
+            data = process.stdout.read(block_bytes)
+            if not data:
+                break
+            usable = len(data) - len(data) % (channels * 4)
+            yield np.frombuffer(data[:usable], dtype="<f4").astype(np.float64).reshape(-1, channels)
+    finally:
+        process.stdout.close()
+        process.wait()
+
+def measure_loudness(file_path):
+    """
+    統合ラウドネスとサンプルピークを測定します。
+    BS.1770のゲーティング（絶対-70 / 相対-10LU）に従いますが、Kフィルタは省略した簡易版です。
+    戻り値: (loudness_lufs or None, peak)
+    """
+    try:
+        stat = os.stat(file_path)
+    except OSError:
+        return None, 0.0
+    key = (file_path, stat.st_mtime, stat.st_size)
+    if key in _loudness_cache:
+        return _loudness_cache[key]
+
+    blocks = None
+    if file_path.lower().endswith(".wav"):
+        blocks = _wav_blocks(file_path, BLOCK_SEC)
+    if blocks is None:
+        blocks = _ffmpeg_blocks(file_path, BLOCK_SEC)
+
+    powers = []
+    peak = 0.0
+    try:
+        for block in blocks:
+            if len(block) == 0:
+                continue
+            # チャンネルごとの平均二乗を合算（BS.1770のチャンネル重みは全て1.0）
+            powers.append(float(np.sum(np.mean(block * block, axis=0))))
+            peak = max(peak, float(np.max(np.abs(block))))
+    except Exception as e:
+        log(f"  [WARNING] ラウドネス測定失敗: {os.path.basename(file_path)} ({e})")
+        return None, 0.0
+
+    result = (_gated_loudness(np.asarray(powers)), peak)
+    _loudness_cache[key] = result
+    return result
+
+def _gated_loudness(powers):
+    if len(powers) == 0:
+        return None
+    with np.errstate(divide="ignore"):
+        block_lufs = -0.691 + 10 * np.log10(powers)
+    gated = powers[block_lufs > ABSOLUTE_GATE_LUFS]
+    if len(gated) == 0:
+        return None
+    relative_gate = -0.691 + 10 * np.log10(np.mean(gated)) + RELATIVE_GATE_LU
+    gated = powers[(block_lufs > ABSOLUTE_GATE_LUFS) & (block_lufs > relative_gate)]
+    if len(gated) == 0:
+        return None
+    return float(-0.691 + 10 * np.log10(np.mean(gated)))
+
+def normalize_gain(loudness, peak, target_lufs):
+    """目標ラウドネスに合わせる線形ゲインを返します（ピーク制限付き）。"""
+    if loudness is None:
+        return 1.0
+    gain = 10 ** ((target_lufs - loudness) / 20)
+    if peak > 0:
+        gain = min(gain, PEAK_CEILING / peak)
+    return max(0.0, min(gain, MAX_GAIN))
+
+def master_scenes(scenes, public_dir=PUBLIC_DIR):
+    """
+    各シーンに mix.voiceGain / mix.bgmGain を書き込みます。
+    bgmGain はシーン単位のダッキングエンベロープで、ナレーションがあるシーンでは DUCK_DB 分下げます。
+    """
+    duck = 10 ** (DUCK_DB / 20)
+    bgm_loudness, bgm_peak = measure_loudness(os.path.join(public_dir, DEFAULT_BGM))
+    if bgm_loudness is None:
+        base_bgm_gain = FALLBACK_BGM_GAIN
+    else:
+        base_bgm_gain = normalize_gain(bgm_loudness, bgm_peak, BGM_TARGET_LUFS)
+    for scene in scenes:
+        voice_gain = 1.0
+        has_voice = False
+        if scene.get("audio"):
+            loudness, peak = measure_loudness(os.path.join(public_dir, scene["audio"]))
+            voice_gain = normalize_gain(loudness, peak, VOICE_TARGET_LUFS)
+            has_voice = loudness is not None
+
+        bgm_gain = base_bgm_gain
+        if has_voice:
+            bgm_gain *= duck
+
+        scene["mix"] = {
+            "voiceGain": round(voice_gain, 3),
+            "bgmGain": round(bgm_gain, 3),
+        }
+    return scenes
+
+def master_json(json_path):
+    """シーンJSONファイルを読み込み、ミックス値を書き込んで保存します。"""
+    from scene_store import get_store
+    store = get_store(json_path)
+    before, _ = store.read()
+    store.update(partial(master_scenes, public_dir=os.path.dirname(json_path)))
+    after, _ = store.read()
+    changed = sum(old.get("mix") != new.get("mix") for old, new in zip(before, after))
+    log(f"[OK] ミックス値を書き込みました: {json_path} ({changed}/{len(after)}シーンを更新)")
+
+if __name__ == "__main__":
+    # 標準出力をUTF-8に（Windows環境の文字化け対策。reconfigure は何度呼んでも安全）
+    if sys.platform == "win32":
+        sys.stdout.reconfigure(encoding='utf-8')
+    target = sys.argv[1] if len(sys.argv) > 1 else os.path.join(PUBLIC_DIR, "cat_data.json")
+    master_json(target)
@@ -0,0 +1,127 @@
+"""
+バッチ生成
+マニフェストに並べた複数の台本を1プロセスでまとめて動画化します。
+VOICEVOX・Pexelsのクライアント（HTTPセッションとキャッシュ）は全動画で共有し、
+ある動画のレンダリング中に次の動画の素材取得・音声合成を進めます。
+レンダリングは常駐ワーカー（render_pool.py）で行い、Node と Chromium の起動はワーカーごとに1回だけです。
+
+    python src/batch_runner.py src/scripts/batch.yaml
+
+マニフェスト:
+    render: true            # false なら素材とJSONの生成だけ行う
+    compile_workers: 2      # 素材取得・音声合成を同時に進める本数
+    render_workers: 1       # 同時レンダリング数（CPU/メモリに応じて）
+    profile: final          # レンダリング品質（draft / proxy / final）
+    videos:
+      - {name: isekai_0101, script: isekai.yaml}   # script は scripts/ からの相対パスでも可
+
+各動画の素材は video/public/batch/<name>/ に、動画は video/out/batch/<name>.mp4 に出力します。
+"""
+
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dotenv import load_dotenv
+import json_io
+from pexels_client import PexelsClient
+from remotion_render import render_composition
+from render_pool import RenderPool
+from script_compiler import compile_script, load_script, PUBLIC_DIR, SCRIPTS_DIR, BASE_DIR
+from voicevox_client import VoicevoxClient
+
+load_dotenv()
+
+BATCH_ASSET_DIR = "batch"
+BATCH_OUTPUT_DIR = os.path.join(BASE_DIR, "video", "out", "batch")
+
+def log(msg):
+    print(msg, flush=True)
+
+def _resolve_script(path, manifest_dir):
+    for base in (manifest_dir, SCRIPTS_DIR):
+        candidate = os.path.join(base, path)
+        if os.path.exists(candidate):
+            return candidate
+    return path
+
+def _prepare_video(entry, manifest_dir, voice_client, image_client):
+    """1本分の素材を生成し、レンダリング用のprops JSONのパスを返します。"""
+    name = entry["name"]
+    asset_dir = f"{BATCH_ASSET_DIR}/{name}"
+    video_dir = os.path.join(PUBLIC_DIR, asset_dir)
+    os.makedirs(video_dir, exist_ok=True)
+
+    scenes = compile_script(
+        _resolve_script(entry["script"], manifest_dir),
+        output_path=os.path.join(video_dir, "scenes.json"),
+        client=voice_client,
+        image_client=image_client,
+        asset_dir=asset_dir,
+    )
+    props_path = os.path.join(video_dir, "render_props.json")
+    json_io.dump_file(props_path, {"scenes": scenes})
+    return props_path
+
+def run_batch(manifest_path):
+    """マニフェストの全動画を生成します。戻り値: {name: 出力パス or 例外}"""
+    manifest = load_script(manifest_path)
+    manifest_dir = os.path.dirname(os.path.abspath(manifest_path))
+    videos = manifest.get("videos") or []
+    names = [v["name"] for v in videos]
+    if len(set(names)) != len(names):
+        raise ValueError("マニフェスト内の name が重複しています")
+
+    compile_workers = manifest.get("compile_workers", 2)
+    voice_client = VoicevoxClient(pool_size=4 * compile_workers)
+    image_client = PexelsClient()
+    results = {}
+
+    render_workers = manifest.get("render_workers", 1)
+
+    log(f"📦 バッチ開始: {len(videos)}本")
+    with ThreadPoolExecutor(max_workers=compile_workers) as compile_pool, \
+         ThreadPoolExecutor(max_workers=render_workers) as render_pool, \
+         RenderPool(size=render_workers) as workers:
+        prepare_futures = {
+            compile_pool.submit(_prepare_video, v, manifest_dir, voice_client, image_client): v["name"]
+            for v in videos
+        }
+        render_futures = {}
+        # 素材ができた順にレンダリングへ回す（後続の素材生成と並行して進む）
+        for future in as_completed(prepare_futures):
+            name = prepare_futures[future]
+            try:
+                props_path = future.result()
+            except Exception as e:
+                log(f"✗ [{name}] 素材生成に失敗: {e}")
+                results[name] = e
+                continue
+            if not manifest.get("render", True):
+                results[name] = props_path
+                continue
+            output_path = os.path.join(BATCH_OUTPUT_DIR, f"{name}.mp4")
+            render_futures[render_pool.submit(
+                render_composition, "VisionForgeLong", output_path, props_path,
+                profile=manifest.get("profile"), pool=workers)] = name
+
+        for future in as_completed(render_futures):
+            name = render_futures[future]
+            try:
+                results[name] = future.result()
+                log(f"🎬 [{name}] レンダリング完了")
+            except Exception as e:
+                log(f"✗ [{name}] レンダリングに失敗: {e}")
+                results[name] = e
+
+    ok = sum(1 for r in results.values() if not isinstance(r, Exception))
+    log(f"✅ バッチ完了: {ok}/{len(videos)}本 成功")
+    return results
+
+if __name__ == "__main__":
+    # 標準出力をUTF-8に（Windows環境の文字化け対策。reconfigure は何度呼んでも安全）
+    if sys.platform == "win32":
+        sys.stdout.reconfigure(encoding='utf-8')
+    if len(sys.argv) < 2:
+        print("使い方: python src/batch_runner.py <マニフェスト>")
+        sys.exit(1)
+    run_batch(sys.argv[1])
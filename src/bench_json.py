@@ -0,0 +1,62 @@
+"""
+JSONシリアライズのマイクロベンチマーク
+500シーンの台本を想定したデータで、標準 json（従来の indent=2）と json_io
+（orjson があれば orjson）の書き出し・読み込み時間を比較します。
+
+    python src/bench_json.py [シーン数] [繰り返し回数]
+"""
+
+import sys
+import json
+import time
+import json_io
+
+def make_scenes(count):
+    scenes = []
+    for i in range(count):
+        scenes.append({
+            "id": i + 1,
+            "speaker": "zundamon" if i % 2 else "metan",
+            "emotion": "happy",
+            "action": "nod",
+            "text": f"これは{i}番目のセリフなのだ。長い台本でも保存が速いかどうかを確かめるのだ！" * 2,
+            "title": f"第{i // 20 + 1}章",
+            "audio": f"audio/scene_{i}.wav",
+            "bg_image": "images/bg_thread.jpg",
+            "image": "images/bg_thread.jpg",
+            "duration": 3.456 + i % 7,
+            "padding": 0.5,
+            "mix": {"voiceGain": 0.912, "bgmGain": 0.048},
+            "direction": {"mood": "normal", "importance": "normal", "isTopicChange": False},
+            "telop": {"emphasisWords": ["ワイルズ", "ガチ勢"]},
+            "camera": {"preset": "center"},
+        })
+    return scenes
+
+def bench(label, func, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = func()
+    elapsed = (time.perf_counter() - start) / repeat * 1000
+    size = f"{len(result) / 1024:8.1f} KB" if isinstance(result, (bytes, str)) else ""
+    print(f"  {label:<36} {elapsed:8.3f} ms {size}")
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    scenes = make_scenes(count)
+    text = json.dumps(scenes, ensure_ascii=False)
+    data = json_io.dumps(scenes)
+
+    print(f"{count}シーン / {repeat}回平均 / json_io のバックエンド: {json_io.BACKEND}")
+    print("書き出し")
+    bench("json.dumps(indent=2)  ※従来", lambda: json.dumps(scenes, ensure_ascii=False, indent=2).encode("utf-8"), repeat)
+    bench("json.dumps(compact)", lambda: json.dumps(scenes, ensure_ascii=False, separators=(",", ":")).encode("utf-8"), repeat)
+    bench("json_io.dumps(pretty=True)", lambda: json_io.dumps(scenes, pretty=True), repeat)
+    bench("json_io.dumps()  ※compact", lambda: json_io.dumps(scenes), repeat)
+    print("読み込み")
+    bench("json.loads", lambda: json.loads(text), repeat)
+    bench("json_io.loads", lambda: json_io.loads(data), repeat)
+
+if __name__ == "__main__":
+    main()
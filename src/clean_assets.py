@@ -1,12 +1,38 @@
+"""
+未使用アセットのクリーンアップ（マーク＆スイープ）
+video/public 配下のすべてのシーンJSON・render_props.json（video/render_props.json も含む）と
+シーンの編集履歴（work/scene_history、取り消しで戻せる分）から参照を集め、
+どこからも参照されていない音声・画像だけを削除します。
+
+- 参照はキー名に頼らず JSON の中の文字列をすべて調べるので、blocks[].images[].src のような
+  入れ子の画像や、新しく増えたキーも拾います
+- アップロード画像は元画像・レンダリング用・サムネイルのどれかが参照されていれば3つとも残します
+- 作られたばかりのファイル（既定で1時間以内）は、JSONに書き込まれる前の生成途中とみなして残します
+- 読めない参照ファイルが1つでもあれば削除は行いません（cron で回しても消しすぎない）
+
+    python src/clean_assets.py                  # 削除対象と回収できる容量を表示するだけ
+    python src/clean_assets.py --force          # 実際に削除
+    python src/clean_assets.py --min-age=0      # 作成直後のファイルも対象にする（秒）
+"""
+
 import os
-import json
-import logging
+import re
+import sys
+import time
 import fnmatch
+import logging
+from collections import defaultdict
+import json_io
 
 # 設定
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 PROJECT_DIR = os.path.join(BASE_DIR, "video", "public")
-DATA_FILE = os.path.join(PROJECT_DIR, "cat_data.json")
+# public の外にある参照元
+EXTRA_REFERENCE_FILES = [os.path.join(BASE_DIR, "video", "render_props.json")]
+HISTORY_DIR = os.path.join(BASE_DIR, "work", "scene_history")
+# アップロード画像の置き場所（<ハッシュ>.<拡張子>, <ハッシュ>_render.jpg, <ハッシュ>_thumb.jpg）
+UPLOAD_DIR = "images/uploads"
+DEFAULT_MIN_AGE = 3600
 
 # ログ設定
 logging.basicConfig(level=logging.INFO, format='%(levelname)s: %(message)s')
@@ -30,97 +56,166 @@ PROTECTED_PATTERNS = [
     "robots.txt",
 ]
 
-def get_used_assets():
-    """cat_data.jsonを読み込み、現在使用されているアセットの相対パスリストを返す"""
-    if not os.path.exists(DATA_FILE):
-        logging.warning(f"データファイルが見つかりません: {DATA_FILE}")
-        return set()
+# スキャン対象外（JSON自体と出力先）
+SKIP_PATTERNS = ["*.json", "out/*"]
 
-    used = set()
-    try:
-        with open(DATA_FILE, "r", encoding="utf-8") as f:
-            data = json.load(f)
-        
-        for item in data:
-            # 音声、背景画像、個別画像などのフィールドを確認
-            for key in ["audio", "bg_image", "image", "bgm"]:
-                if key in item and item[key]:
-                    # Windowsパスを正規化
-                    path = item[key].replace("\\", "/")
-                    used.add(path)
-    except Exception as e:
-        logging.error(f"データファイルの読み込み中にエラーが発生しました: {e}")
-    
-    return used
+def _compile(dirs, patterns):
+    """ディレクトリとglobパターンを1つの正規表現にまとめる（ファイルごとにパターンを回さない）"""
+    parts = [re.escape(d) + r"(?:/.*)?\Z" for d in dirs]
+    parts.extend(fnmatch.translate(p) for p in patterns)
+    return re.compile("|".join(f"(?:{p})" for p in parts))
+
+PROTECTED_RE = _compile(PROTECTED_DIRS, PROTECTED_PATTERNS)
+SKIP_RE = _compile([], SKIP_PATTERNS)
 
 def is_protected(rel_path):
     """ファイルが保護対象かどうかを判定する"""
-    rel_path = rel_path.replace("\\", "/")
-    
-    # ディレクトリ保護
-    for d in PROTECTED_DIRS:
-        if rel_path.startswith(d + "/") or rel_path == d:
-            return True
-            
-    # ファイルパターン保護
-    for p in PROTECTED_PATTERNS:
-        if fnmatch.fnmatch(rel_path, p):
-            return True
-            
-    return False
-
-def cleanup_assets(dry_run=True):
-    """未使用のアセットを特定して削除する"""
-    used_assets = get_used_assets()
-    all_files = []
-
-    # 全ファイルをスキャン
-    for root, dirs, files in os.walk(PROJECT_DIR):
-        for f in files:
-            full_path = os.path.join(root, f)
-            rel_path = os.path.relpath(full_path, PROJECT_DIR).replace("\\", "/")
-            
-            # JSONファイル自体や、出力先フォルダは除外
-            if rel_path.endswith(".json") or rel_path.startswith("out/"):
-                continue
-            
-            all_files.append(rel_path)
-
-    to_delete = []
-    for f in all_files:
-        # 保護ルールに合致するか？
-        if is_protected(f):
+    return PROTECTED_RE.match(rel_path.replace("\\", "/")) is not None
+
+def normalize_ref(value):
+    """JSON中の文字列を public からの相対パスにそろえる（パスらしくなければ None）"""
+    if "/" not in value and "\\" not in value and "." not in value:
+        return None
+    path = value.replace("\\", "/").split("?", 1)[0].split("#", 1)[0]
+    for prefix in ("/api/media/", "/public/", "public/", "/"):
+        if path.startswith(prefix):
+            path = path[len(prefix):]
+            break
+    return path or None
+
+def _collect_strings(obj, out):
+    stack = [obj]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, str):
+            out.add(item)
+        elif isinstance(item, dict):
+            stack.extend(item.values())
+        elif isinstance(item, list):
+            stack.extend(item)
+
+def reference_files(include_history=True):
+    """参照元になるJSONファイルの一覧（include_history=False なら編集履歴を除く）"""
+    files = []
+    for root in (PROJECT_DIR, HISTORY_DIR) if include_history else (PROJECT_DIR,):
+        for dirpath, _, names in os.walk(root):
+            files.extend(os.path.join(dirpath, n) for n in names if n.endswith(".json"))
+    files.extend(p for p in EXTRA_REFERENCE_FILES if os.path.exists(p))
+    return files
+
+def get_used_assets(include_history=True):
+    """
+    すべての参照元から、使われているアセットの相対パスを集める（マーク）。
+    戻り値: (参照されているパスの set, 読めなかったファイルのリスト)
+    """
+    strings = set()
+    failed = []
+    for path in reference_files(include_history):
+        try:
+            _collect_strings(json_io.load_file(path), strings)
+        except Exception as e:
+            logging.error(f"参照ファイルを読み込めません: {path} - {e}")
+            failed.append(path)
+    used = set()
+    for value in strings:
+        ref = normalize_ref(value)
+        if ref:
+            used.add(ref)
+    return used, failed
+
+def _upload_group(rel_path):
+    """アップロード画像のサイズ違いをまとめるキー（アップロード画像でなければ None）"""
+    directory, _, name = rel_path.rpartition("/")
+    if directory != UPLOAD_DIR:
+        return None
+    return name.split(".", 1)[0].split("_", 1)[0]
+
+def scan_assets():
+    """public 配下のファイルを {相対パス: (サイズ, 更新時刻)} で返す"""
+    files = {}
+    stack = [""]
+    while stack:
+        rel_dir = stack.pop()
+        with os.scandir(os.path.join(PROJECT_DIR, rel_dir)) as it:
+            for entry in it:
+                rel_path = f"{rel_dir}/{entry.name}" if rel_dir else entry.name
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(rel_path)
+                elif entry.is_file(follow_symlinks=False) and not SKIP_RE.match(rel_path):
+                    st = entry.stat(follow_symlinks=False)
+                    files[rel_path] = (st.st_size, st.st_mtime)
+    return files
+
+def find_unused(min_age=DEFAULT_MIN_AGE):
+    """
+    削除対象を決める。戻り値: (削除対象 {相対パス: サイズ}, 読めなかった参照ファイル)
+    """
+    used, failed = get_used_assets()
+    files = scan_assets()
+    used_groups = {g for g in map(_upload_group, used & files.keys()) if g}
+    cutoff = time.time() - min_age
+
+    unused = {}
+    for rel_path, (size, mtime) in files.items():
+        if rel_path in used or is_protected(rel_path) or mtime > cutoff:
             continue
-            
-        # 現在のデータで使用されているか？
-        if f in used_assets:
+        group = _upload_group(rel_path)
+        if group and group in used_groups:
             continue
-            
-        to_delete.append(f)
+        unused[rel_path] = size
+    return unused, failed
+
+def format_bytes(size):
+    for unit in ("B", "KB", "MB", "GB"):
+        if size < 1024 or unit == "GB":
+            return f"{size:.1f}{unit}" if unit != "B" else f"{size}{unit}"
+        size /= 1024
+
+def cleanup_assets(dry_run=True, min_age=DEFAULT_MIN_AGE):
+    """未使用のアセットを特定して削除する（スイープ）。削除（予定）の件数とバイト数を返す"""
+    to_delete, failed = find_unused(min_age)
 
     if not to_delete:
         logging.info("未使用のアセットは見つかりませんでした。クリーンです。")
-        return
+        return 0, 0
 
+    total = sum(to_delete.values())
+    by_dir = defaultdict(lambda: [0, 0])
     logging.info(f"--- 未使用アセット一覧 ({len(to_delete)}件) ---")
-    for f in to_delete:
-        print(f" [DELETE] {f}")
+    for f in sorted(to_delete):
+        print(f" [DELETE] {f} ({format_bytes(to_delete[f])})")
+        stats = by_dir[f.rpartition("/")[0] or "."]
+        stats[0] += 1
+        stats[1] += to_delete[f]
+    for d, (count, size) in sorted(by_dir.items()):
+        logging.info(f"  {d}/: {count}件 {format_bytes(size)}")
+    logging.info(f"合計 {len(to_delete)}件 {format_bytes(total)} を回収できます")
 
     if dry_run:
         logging.info("\n*** これはプレビューです。実際に削除するには --force オプションを付けて実行してください ***")
-    else:
-        logging.info(f"\n{len(to_delete)}件のファイルを削除しています...")
-        count = 0
-        for f in to_delete:
-            try:
-                os.remove(os.path.join(PROJECT_DIR, f))
-                count += 1
-            except Exception as e:
-                logging.error(f"削除失敗: {f} - {e}")
-        logging.info(f"クリーンアップ完了。{count}件のファイルを削除しました。")
+        return len(to_delete), total
+    if failed:
+        logging.error("読み込めない参照ファイルがあるため削除を中止しました（参照を見落とす恐れがあります）")
+        return 0, 0
+
+    logging.info(f"\n{len(to_delete)}件のファイルを削除しています...")
+    count = 0
+    freed = 0
+    for f, size in to_delete.items():
+        try:
+            os.remove(os.path.join(PROJECT_DIR, f))
+            count += 1
+            freed += size
+        except Exception as e:
+            logging.error(f"削除失敗: {f} - {e}")
+    logging.info(f"クリーンアップ完了。{count}件 {format_bytes(freed)} を削除しました。")
+    return count, freed
 
 if __name__ == "__main__":
-    import sys
     # --force が引数にあれば実際に削除
     force_mode = "--force" in sys.argv
-    cleanup_assets(dry_run=not force_mode)
+    min_age = DEFAULT_MIN_AGE
+    for arg in sys.argv[1:]:
+        if arg.startswith("--min-age="):
+            min_age = float(arg.split("=", 1)[1])
+    cleanup_assets(dry_run=not force_mode, min_age=min_age)
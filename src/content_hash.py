@@ -0,0 +1,57 @@
+"""
+ファイル内容のハッシュ
+パイプラインのスキップ判定（pipeline_runner.py）、メディア配信の ETag（media_response.py）、
+重複ファイルの検出（dedup_assets.py）で共通に使います。
+"""
+
+import os
+import hashlib
+import threading
+
+HASH_CHUNK = 1024 * 1024
+# dedup_assets.py が重複をまとめる置き場（video/public からの相対パス）。
+# ここのファイルは複数のシーンから参照されるので、上書きしてはいけない
+BLOB_DIR = "blobs"
+
+def is_blob(rel_path):
+    """まとめられた共有ファイル（blobs/ 以下）へのパスか"""
+    return rel_path.replace("\\", "/").lstrip("/").startswith(BLOB_DIR + "/")
+
+class ContentHasher:
+    """ファイル内容のSHA-256を、サイズと更新時刻が変わらない限りキャッシュします。"""
+    def __init__(self, cache=None):
+        self.cache = cache or {}
+        self.lock = threading.Lock()
+
+    def file_hash(self, path):
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        stamp = [stat.st_size, stat.st_mtime_ns]
+        with self.lock:
+            cached = self.cache.get(path)
+        if cached and cached[:2] == stamp:
+            return cached[2]
+
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(HASH_CHUNK), b""):
+                digest.update(chunk)
+        value = digest.hexdigest()
+        with self.lock:
+            self.cache[path] = stamp + [value]
+        return value
+
+    def path_hash(self, path):
+        """ファイルならその内容、ディレクトリなら配下全ファイルの内容からハッシュを作ります。"""
+        if not os.path.isdir(path):
+            return self.file_hash(path)
+        digest = hashlib.sha256()
+        for root, dirs, files in os.walk(path):
+            dirs.sort()
+            for name in sorted(files):
+                full = os.path.join(root, name)
+                digest.update(os.path.relpath(full, path).replace("\\", "/").encode("utf-8"))
+                digest.update((self.file_hash(full) or "").encode("ascii"))
+        return digest.hexdigest()
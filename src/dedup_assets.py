@@ -0,0 +1,225 @@
+"""
+video/public の重複メディアをまとめる
+同じ内容の音声・画像（uuid名で保存された同じセリフ、images/render/ に何度もコピーされた画像など）を
+内容ハッシュ名の1ファイル（blobs/<ハッシュ>.<拡張子>）にまとめ、シーンJSON・render_props.json の
+参照をそのファイルに書き換えてから重複を削除します。
+
+- ハッシュはサイズが同じファイルがあるものだけ、チャンク読み込み・並列で計算する
+- サイズと更新時刻が変わっていないファイルは work/dedup_hash_cache.json のハッシュを再利用する
+- 対象はシーンJSONから参照されているファイルだけ（コードに直接書かれた背景などの保護対象は触らない）
+- 参照の書き換えは SceneStore.rewrite で行い、取り消し用の履歴の中のパスも一緒に書き換える
+  （書き換えるのは参照が変わるシーンJSONと render_props.json だけ。書式は元のファイルに合わせる。
+  それ以外のJSONから参照されている重複は削除しない）
+- リンク（ハードリンク・シンボリックリンク）にはしない。生成スクリプトは同じパスに上書き保存するので、
+  リンクだと別のシーンの音声まで書き換わってしまうため
+- 同じ理由で、blobs/ のファイルは上書きしない。音声を作り直すとき（app_server.process_scene、
+  generate_audio_for_json.py）は、参照が blobs/ なら新しいシーン専用のパスに書き出す
+
+    python src/dedup_assets.py            # まとめられるファイルと削減できる容量を表示するだけ
+    python src/dedup_assets.py --force    # 実際にまとめる
+"""
+
+import os
+import sys
+import shutil
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+import json_io
+from clean_assets import (
+    PROJECT_DIR, UPLOAD_DIR, DEFAULT_MIN_AGE,
+    scan_assets, reference_files, get_used_assets, normalize_ref, is_protected, format_bytes,
+)
+from content_hash import ContentHasher, BLOB_DIR, is_blob
+from scene_store import get_store, atomic_write_json
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CACHE_PATH = os.path.join(BASE_DIR, "work", "dedup_hash_cache.json")
+HASH_WORKERS = min(8, (os.cpu_count() or 2) * 2)
+
+def log(msg):
+    print(msg, flush=True)
+
+def _load_hasher():
+    try:
+        return ContentHasher(json_io.load_file(CACHE_PATH))
+    except (FileNotFoundError, ValueError):
+        return ContentHasher()
+
+def _save_hasher(hasher):
+    # 消えたファイルのエントリは捨てる
+    cache = {p: v for p, v in hasher.cache.items() if os.path.exists(p)}
+    json_io.dump_file(CACHE_PATH, cache)
+
+def _is_canonical(rel_path):
+    """内容ハッシュ名で保存されていて、上書きされることのないファイルか"""
+    return is_blob(rel_path) or rel_path.startswith(UPLOAD_DIR + "/")
+
+def find_duplicates(min_age=DEFAULT_MIN_AGE):
+    """
+    まとめられる重複を探します。
+    戻り値: [(ハッシュ, 残すファイル or None, [まとめるファイル...], 1ファイルのサイズ)]
+    残すファイルが None の場合は blobs/ に新しく作ります。
+    """
+    files = scan_assets()
+    # 編集履歴の中のパスは書き換えで一緒に付け替えるので、現在の内容から参照されているものだけ見る
+    used, _ = get_used_assets(include_history=False)
+    cutoff = time.time() - min_age
+
+    def candidate(rel_path):
+        if _is_canonical(rel_path):
+            return True
+        _, mtime = files[rel_path]
+        return rel_path in used and not is_protected(rel_path) and mtime <= cutoff
+
+    # サイズが同じファイルがなければ内容も同じではないので、ハッシュを計算しない
+    by_size = defaultdict(list)
+    for rel_path, (size, _) in files.items():
+        if size > 0 and candidate(rel_path):
+            by_size[size].append(rel_path)
+    to_hash = [p for paths in by_size.values() if len(paths) > 1 for p in paths]
+
+    hasher = _load_hasher()
+    with ThreadPoolExecutor(max_workers=HASH_WORKERS) as pool:
+        digests = pool.map(lambda p: hasher.file_hash(os.path.join(PROJECT_DIR, p)), to_hash)
+        by_hash = defaultdict(list)
+        for rel_path, digest in zip(to_hash, digests):
+            if digest:
+                by_hash[digest].append(rel_path)
+    _save_hasher(hasher)
+
+    groups = []
+    for digest, paths in by_hash.items():
+        canonical = sorted(p for p in paths if _is_canonical(p))
+        members = sorted(p for p in paths if not _is_canonical(p))
+        if not members or (len(members) == 1 and not canonical):
+            continue
+        groups.append((digest, canonical[0] if canonical else None, members, files[members[0]][0]))
+    return groups
+
+def _blob_path(digest, member):
+    ext = os.path.splitext(member)[1].lower()
+    return f"{BLOB_DIR}/{digest[:32]}{ext}"
+
+def _replacer(mapping, hits=None):
+    """mapping に従って参照を付け替える関数を返します。hits には付け替えた元のパスを追加します。"""
+    def replace(obj):
+        if isinstance(obj, str):
+            ref = normalize_ref(obj)
+            if ref in mapping:
+                if hits is not None:
+                    hits.add(ref)
+                return obj.replace(ref, mapping[ref]) if ref in obj else mapping[ref]
+            return obj
+        if isinstance(obj, dict):
+            return {k: replace(v) for k, v in obj.items()}
+        if isinstance(obj, list):
+            return [replace(v) for v in obj]
+        return obj
+    return replace
+
+def _json_indent(path):
+    """既存ファイルの書式に合わせた indent（整形されていれば 2、compact なら None）を返します。"""
+    with open(path, "rb") as f:
+        head = f.read(2)
+    return 2 if head[1:2] in (b"\n", b"\r") else None
+
+def _is_scene_list(data):
+    return isinstance(data, list) and all(isinstance(s, dict) for s in data)
+
+def _plan_rewrites(mapping):
+    """
+    参照の書き換え方を決めます。
+    戻り値: (シーンJSONのパス, (render_props のパス, 新しい内容) のリスト, 削除してはいけないパスの set)
+    シーンJSON・render_props.json 以外のJSON（manifest.json など）は書き換えず、そこから参照されている
+    重複は削除せずに残します。
+    """
+    scene_files, props_files, keep = [], [], set()
+    for path in reference_files(include_history=False):
+        data = json_io.load_file(path)
+        hits = set()
+        new = _replacer(mapping, hits)(data)
+        if _is_scene_list(data):
+            # 内容が変わらなくても、取り消し用の履歴があれば履歴の中のパスを書き換える
+            if hits or os.path.isdir(get_store(path).history_dir):
+                scene_files.append(path)
+        elif os.path.basename(path) == "render_props.json":
+            if hits:
+                props_files.append((path, new))
+        else:
+            keep |= hits
+    return scene_files, props_files, keep
+
+def dedup_assets(dry_run=True, min_age=DEFAULT_MIN_AGE):
+    """重複をまとめ、(まとめたファイル数, 削減したバイト数) を返します。"""
+    groups = find_duplicates(min_age)
+    if not groups:
+        log("重複しているファイルはありません。")
+        return 0, 0
+
+    saved = sum(size * (len(members) - (0 if canonical else 1)) for _, canonical, members, size in groups)
+    count = sum(len(members) for _, _, members, _ in groups)
+    log(f"--- 重複ファイル ({len(groups)}種類, {count}ファイル) ---")
+    for digest, canonical, members, size in groups:
+        target = canonical or _blob_path(digest, members[0])
+        log(f" [{format_bytes(size)}] {', '.join(members)} -> {target}")
+    log(f"合計 {format_bytes(saved)} を削減できます")
+    if dry_run:
+        log("\n*** これはプレビューです。実際にまとめるには --force オプションを付けて実行してください ***")
+        return count, saved
+
+    # 1. まとめ先を用意する（元のファイルは参照を書き換えるまで残す）
+    mapping = {}
+    created = 0
+    for digest, canonical, members, _ in groups:
+        target = canonical
+        if target is None:
+            target = _blob_path(digest, members[0])
+            target_full = os.path.join(PROJECT_DIR, target)
+            if not os.path.exists(target_full):
+                os.makedirs(os.path.dirname(target_full), exist_ok=True)
+                tmp_path = target_full + ".tmp"
+                shutil.copy2(os.path.join(PROJECT_DIR, members[0]), tmp_path)
+                os.replace(tmp_path, target_full)
+                created += os.path.getsize(target_full)
+        for member in members:
+            mapping[member] = target
+
+    # 2. 参照を書き換える（シーンJSONは履歴の中のパスも一緒に。書式は元のファイルに合わせる）
+    replace = _replacer(mapping)
+    try:
+        scene_files, props_files, keep = _plan_rewrites(mapping)
+        for path in scene_files:
+            get_store(path).rewrite(replace, indent=_json_indent(path))
+        for path, data in props_files:
+            atomic_write_json(path, data, indent=_json_indent(path))
+    except Exception as e:
+        log(f"[Error] 参照を書き換えられませんでした: {e}")
+        log("重複ファイルの削除は中止しました（まとめ先のファイルは残っています）")
+        return 0, 0
+    for member in sorted(keep):
+        log(f"  シーンJSON以外から参照されているため残します: {member}")
+
+    # 3. まとめたファイルを削除する
+    removed = 0
+    freed = 0
+    for member in mapping:
+        if member in keep:
+            continue
+        full = os.path.join(PROJECT_DIR, member)
+        try:
+            freed += os.path.getsize(full)
+            os.remove(full)
+            removed += 1
+        except OSError as e:
+            log(f"[Error] 削除失敗: {member} - {e}")
+    log(f"完了: {removed}ファイルをまとめ、{format_bytes(max(0, freed - created))} 削減しました。")
+    return removed, freed - created
+
+if __name__ == "__main__":
+    force_mode = "--force" in sys.argv
+    min_age = DEFAULT_MIN_AGE
+    for arg in sys.argv[1:]:
+        if arg.startswith("--min-age="):
+            min_age = float(arg.split("=", 1)[1])
+    dedup_assets(dry_run=not force_mode, min_age=min_age)
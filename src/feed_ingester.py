@@ -0,0 +1,162 @@
+"""
+RSSフィードの取得（条件付きリクエスト・既読管理つき）
+複数のフィードを並列に取得し、まだ動画にしていない記事だけを新しい順に返します。
+
+- 前回の ETag / Last-Modified を送り、304（更新なし）なら前回解析した記事一覧を使う
+- 記事は guid（なければ link / タイトル）のハッシュで既読を管理し、mark_seen() した記事は二度と返さない
+- 状態は work/feeds/state.json に保存（既読は SEEN_DAYS 日で忘れる）
+- URL の代わりにローカルのファイルパスも指定できる（更新時刻が変わっていなければ読み直さない）
+
+フィードの一覧は .env の NEWS_FEEDS（カンマ区切り）で変更できます。
+
+    python src/feed_ingester.py            # 新しい記事を表示（既読にはしない）
+"""
+
+import os
+import re
+import sys
+import time
+import calendar
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+import feedparser
+import requests
+import json_io
+from scene_store import FileLock, atomic_write_json
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STATE_PATH = os.path.join(BASE_DIR, "work", "feeds", "state.json")
+DEFAULT_FEEDS = ["https://www.4gamer.net/rss/index.xml"]
+# 既読を覚えておく日数
+SEEN_DAYS = 90
+FETCH_TIMEOUT = 15
+MAX_WORKERS = 8
+SUMMARY_CHARS = 120
+USER_AGENT = "VisionForge/1.0 (+feed_ingester)"
+
+TAG_PATTERN = re.compile(r'<.*?>')
+
+def log(msg):
+    print(msg, flush=True)
+
+def configured_feeds():
+    feeds = os.getenv("NEWS_FEEDS")
+    if not feeds:
+        return list(DEFAULT_FEEDS)
+    return [f.strip() for f in feeds.split(",") if f.strip()]
+
+def entry_key(entry):
+    """記事を識別するキー（guid → link → タイトルの順に使う）"""
+    ident = entry.get("id") or entry.get("link") or entry.get("title") or ""
+    return hashlib.sha1(ident.encode("utf-8")).hexdigest()[:20]
+
+def _to_item(entry, feed_url):
+    published = entry.get("published_parsed") or entry.get("updated_parsed")
+    return {
+        "key": entry_key(entry),
+        "title": entry.get("title", ""),
+        "summary": TAG_PATTERN.sub('', entry.get("summary", ""))[:SUMMARY_CHARS],
+        "link": entry.get("link"),
+        "published": calendar.timegm(published) if published else None,
+        "feed": feed_url,
+    }
+
+class FeedIngester:
+    def __init__(self, feeds=None, state_path=STATE_PATH, session=None):
+        self.feeds = feeds or configured_feeds()
+        self.state_path = state_path
+        self.lock = FileLock(state_path + ".lock")
+        self.session = session or requests.Session()
+        self.session.headers.setdefault("User-Agent", USER_AGENT)
+
+    def _load_state(self):
+        try:
+            state = json_io.load_file(self.state_path)
+        except (FileNotFoundError, ValueError):
+            state = {}
+        state.setdefault("feeds", {})
+        state.setdefault("seen", {})
+        return state
+
+    def _fetch_url(self, url, cache):
+        headers = {}
+        if cache.get("etag"):
+            headers["If-None-Match"] = cache["etag"]
+        if cache.get("modified"):
+            headers["If-Modified-Since"] = cache["modified"]
+        response = self.session.get(url, headers=headers, timeout=FETCH_TIMEOUT)
+        if response.status_code == 304:
+            return None, None
+        response.raise_for_status()
+        validators = {"etag": response.headers.get("ETag"), "modified": response.headers.get("Last-Modified")}
+        return response.content, validators
+
+    def _fetch_file(self, path, cache):
+        mtime = os.stat(path).st_mtime_ns
+        if cache.get("mtime") == mtime:
+            return None, None
+        with open(path, "rb") as f:
+            return f.read(), {"mtime": mtime}
+
+    def _fetch(self, url, cache):
+        """1つのフィードを取得し、記事一覧を cache["items"] に入れます。更新がなければそのまま。"""
+        try:
+            if url.startswith(("http://", "https://")):
+                body, validators = self._fetch_url(url, cache)
+            else:
+                body, validators = self._fetch_file(url, cache)
+        except Exception as e:
+            log(f"[Feed] 取得失敗: {url} ({e})")
+            return
+        if body is None:
+            log(f"[Feed] 更新なし: {url}")
+            return
+        parsed = feedparser.parse(body)
+        # メンテナンス中の HTML などは bozo にならず、形式 (version) が空の0件として解析される
+        if not parsed.entries and (parsed.bozo or not parsed.version):
+            log(f"[Feed] 解析失敗: {url} ({parsed.get('bozo_exception') or 'フィードではありません'})")
+            return
+        # 解析できたときだけ検証子を更新する（失敗した版を「更新なし」で使い続けないように）
+        cache.update(validators)
+        cache["items"] = [_to_item(e, url) for e in parsed.entries]
+        log(f"[Feed] {len(cache['items'])}件: {url}")
+
+    def fetch_new(self, limit=None):
+        """全フィードを並列に取得し、未読の記事を新しい順に返します（既読にはしません）。"""
+        with self.lock:
+            state = self._load_state()
+            caches = {url: state["feeds"].get(url, {}) for url in self.feeds}
+            with ThreadPoolExecutor(max_workers=min(MAX_WORKERS, len(self.feeds)) or 1) as pool:
+                list(pool.map(lambda url: self._fetch(url, caches[url]), self.feeds))
+            # 設定から外したフィードの状態は捨てる
+            state["feeds"] = caches
+            atomic_write_json(self.state_path, state, indent=None)
+
+        seen = state["seen"]
+        items = {}
+        for cache in caches.values():
+            for item in cache.get("items", []):
+                if item["key"] not in seen and item["key"] not in items:
+                    items[item["key"]] = item
+        ordered = sorted(items.values(), key=lambda i: i["published"] or 0, reverse=True)
+        return ordered[:limit] if limit else ordered
+
+    def mark_seen(self, items):
+        """記事を既読にします（動画にし終えた記事を渡す）。"""
+        now = time.time()
+        with self.lock:
+            state = self._load_state()
+            for item in items:
+                state["seen"][item["key"]] = now
+            expire = now - SEEN_DAYS * 86400
+            state["seen"] = {k: t for k, t in state["seen"].items() if t >= expire}
+            atomic_write_json(self.state_path, state, indent=None)
+
+if __name__ == "__main__":
+    # 標準出力をUTF-8に（Windows環境の文字化け対策。reconfigure は何度呼んでも安全）
+    if sys.platform == "win32":
+        sys.stdout.reconfigure(encoding='utf-8')
+    from dotenv import load_dotenv
+    load_dotenv()
+    for item in FeedIngester().fetch_new():
+        log(f"- {item['title']} ({item['link']})")
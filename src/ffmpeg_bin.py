@@ -0,0 +1,26 @@
+"""
+ffmpeg 実行ファイルの場所
+imageio-ffmpeg がインストールされていれば同梱の ffmpeg を使い、なければパスの通った ffmpeg を使います。
+（以前は moviepy が imageio-ffmpeg を連れてきていたので、ffmpeg を別途入れなくても動いていました）
+
+    pip install imageio-ffmpeg   # ffmpeg をインストールしていない環境向け
+    FFMPEG_BINARY=/path/to/ffmpeg  # 特定の ffmpeg を使う場合（imageio-ffmpeg が参照する）
+"""
+
+import shutil
+from functools import lru_cache
+
+try:
+    import imageio_ffmpeg
+except ImportError:
+    imageio_ffmpeg = None
+
+@lru_cache(maxsize=1)
+def ffmpeg_exe():
+    """ffmpeg のパスを返します。見つからなければ RuntimeError。"""
+    if imageio_ffmpeg is not None:
+        return imageio_ffmpeg.get_ffmpeg_exe()
+    path = shutil.which("ffmpeg")
+    if path is None:
+        raise RuntimeError("ffmpeg が見つかりません。pip install imageio-ffmpeg を実行するか、ffmpeg をパスに追加してください")
+    return path
@@ -1,6 +1,6 @@
 import os
-import json
 import sys
+from scene_store import update_scenes
 
 def fix_image_data():
     """
@@ -23,23 +23,23 @@ def fix_image_data():
         return
 
     try:
-        with open(CAT_DATA_PATH, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-
         modified = False
-        for item in data:
-            # bg_image または image フィールドをチェック
-            for field in ["bg_image", "image"]:
-                if field in item and item[field]:
-                    for bad_img, good_img in FIX_RULES.items():
-                        if bad_img in item[field]:
-                            print(f"[FIX] シーン {item.get('id')} の画像を修正: {item[field]} -> {good_img}")
-                            item[field] = good_img
-                            modified = True
+
+        def fix(data):
+            nonlocal modified
+            for item in data:
+                # bg_image または image フィールドをチェック
+                for field in ["bg_image", "image"]:
+                    if field in item and item[field]:
+                        for bad_img, good_img in FIX_RULES.items():
+                            if bad_img in item[field]:
+                                print(f"[FIX] シーン {item.get('id')} の画像を修正: {item[field]} -> {good_img}")
+                                item[field] = good_img
+                                modified = True
+
+        update_scenes(CAT_DATA_PATH, fix)
 
         if modified:
-            with open(CAT_DATA_PATH, 'w', encoding='utf-8') as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
             print("[SUCCESS] 画像データの修正が完了しました。")
         else:
             print("[INFO] 修正が必要な箇所は見つかりませんでした。")
@@ -1,6 +1,7 @@
 import os
 import requests
 from dotenv import load_dotenv
+from voicevox_dict import sync_user_dict
 
 load_dotenv()
 
@@ -30,10 +31,13 @@ def generate_voice(text, output_path):
 
 if __name__ == "__main__":
     # Target file: audio/isekai_8.wav
-    # Original text: "でも結局、ゲームそのものが異世界（サ終）へ旅立っちゃったわね。皮肉なものだわ。"
-    # Fixing pronunciation for "サ終" -> "サシュウ"
-    
-    text_for_audio = "でも結局、ゲームそのものが異世界サシュウへ旅立っちゃったわね。皮肉なものだわ。"
+    # "サ終" -> "サシュウ" の読みは dictionaries/voicevox_user_dict.tsv でエンジン側に登録する
+    try:
+        sync_user_dict(VOICEVOX_URL)
+    except requests.RequestException as e:
+        print(f"[WARNING] ユーザー辞書の同期に失敗しました（エンジンは起動していますか？）: {e}")
+
+    text_for_audio = "でも結局、ゲームそのものが異世界（サ終）へ旅立っちゃったわね。皮肉なものだわ。"
     output_path = r"c:\repos\VisionForge\video\public\audio\isekai_8.wav"
     
     generate_voice(text_for_audio, output_path)
@@ -1,9 +1,10 @@
 import os
-import json
 import requests
 import wave
 import contextlib
 import sys
+from scene_store import load_scenes, update_scenes
+from content_hash import is_blob
 
 # 標準出力をUTF-8に設定
 if sys.platform == "win32":
@@ -60,38 +61,43 @@ def main():
     if not os.path.exists(AUDIO_DIR):
         os.makedirs(AUDIO_DIR)
 
-    with open(JSON_PATH, 'r', encoding='utf-8') as f:
-        data = json.load(f)
+    data = load_scenes(JSON_PATH)
 
     log(f"--- 音声生成開始: {len(data)} シーン ---")
     
-    updated_data = []
+    # 音声生成中に他の処理がファイルを書き換えても上書きしないよう、更新内容は id ごとに記録して最後に反映する
+    updates = {}
     for item in data:
         speaker = item.get("speaker", "kanon")
         text = item.get("text", "")
         audio_file = item.get("audio", f"t{item['id']}.wav")
+        # dedup_assets.py でまとめた blobs/ の音声は他のシーンと共有しているので、上書きせず別のパスに書く
+        if is_blob(audio_file):
+            audio_file = f"audio/t{item['id']}.wav"
+            updates.setdefault(item["id"], {})["audio"] = audio_file
         
         # 保存パスの正規化（audio/t1.wav のような形式に対応）
         if audio_file.startswith("audio/"):
             audio_full_path = os.path.join(BASE_DIR, "video", "public", audio_file)
         else:
             audio_full_path = os.path.join(AUDIO_DIR, audio_file)
-            item["audio"] = f"audio/{audio_file}"
+            updates.setdefault(item["id"], {})["audio"] = f"audio/{audio_file}"
 
         speaker_id = SPEAKER_IDS.get(speaker, 10)
         
         log(f"Generating [{speaker}]: {text[:20]}...")
         if generate_voice(text, audio_full_path, speaker_id):
             duration = get_audio_duration(audio_full_path)
-            item["duration"] = round(duration + 0.6, 2)
+            updates.setdefault(item["id"], {}).update({"duration": round(duration, 2), "padding": 0.6})
             log(f"  ✓ Success ({duration:.2f}s)")
         else:
             log(f"  ✗ Failed")
-        
-        updated_data.append(item)
 
-    with open(JSON_PATH, 'w', encoding='utf-8') as f:
-        json.dump(updated_data, f, ensure_ascii=False, indent=2)
+    def apply(scenes):
+        for scene in scenes:
+            scene.update(updates.get(scene.get("id"), {}))
+
+    update_scenes(JSON_PATH, apply)
     
     log("--- すべての音声生成とdurationの更新が完了しました ---")
 
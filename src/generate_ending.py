@@ -1,10 +1,10 @@
 import os
-import json
 import requests
 import wave
 import contextlib
 import sys
 import re
+from scene_store import update_scenes
 
 # 標準出力をUTF-8に強制設定（Windows環境の文字化け対策）
 if sys.platform == "win32":
@@ -71,21 +71,17 @@ def create_ending_data():
         {"speaker": "kanon", "speaker_id": KANON_ID, "emotion": "happy", "text": "チャンネル登録と高評価も、忘れないでちょうだいね。それじゃあ、またね！", "id_suffix": "end_3"},
     ]
 
-    # 既存データの読み込み
-    with open(CAT_DATA_PATH, 'r', encoding='utf-8') as f:
-        data = json.load(f)
-
-    last_id = data[-1]["id"] if data else 0
     bg_image = "images/bg_ending_neon.jpg"
 
+    # 音声生成には時間がかかるので、先に生成してから追記する（生成中はファイルをロックしない）
+    ending_scenes = []
     for i, item in enumerate(script):
         log(f"エンディング音声生成中 ({item['speaker']}): {item['text'][:15]}...")
         audio_rel = f"audio/ending_{i}.wav"
         audio_full = os.path.join(VIDEO_PUBLIC_DIR, audio_rel)
         
         if generate_voice(item["text"], audio_full, item["speaker_id"]):
-            data.append({
-                "id": last_id + i + 1,
+            ending_scenes.append({
                 "speaker": item["speaker"],
                 "emotion": item["emotion"],
                 "text": item["text"],
@@ -94,8 +90,12 @@ def create_ending_data():
                 "duration": get_audio_duration(audio_full)
             })
 
-    with open(CAT_DATA_PATH, 'w', encoding='utf-8') as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
+    def append(data):
+        last_id = data[-1]["id"] if data else 0
+        for i, scene in enumerate(ending_scenes):
+            data.append({"id": last_id + i + 1, **scene})
+
+    update_scenes(CAT_DATA_PATH, append)
     
     log("\n[完了] エンディング茶番データを追加しました。")
 
@@ -0,0 +1,82 @@
+"""
+アップロード画像の保存とサイズ違いの生成
+内容ハッシュをファイル名にして同じ画像を重複保存しないようにし、
+レンダリング用（長辺1920まで。縦長 1080x1920 の動画にも横長の動画にも使う）と
+エディタ表示用のサムネイル（最大320x180）を作ります。
+どちらも元画像より大きくはしません。
+"""
+
+import os
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+# 縦長の画像が 1080x1920 の縦長動画で縮小されすぎないよう、向きに関係なく長辺で制限する
+RENDER_SIZE = (1920, 1920)
+THUMB_SIZE = (320, 180)
+
+# PIL のフォーマット名 → 保存時の拡張子
+FORMAT_EXTENSIONS = {"JPEG": ".jpg", "PNG": ".png", "WEBP": ".webp", "GIF": ".gif", "BMP": ".bmp"}
+
+def detect_extension(path):
+    """画像として読めるか確認し、拡張子を返します。画像でなければ ValueError。"""
+    try:
+        with Image.open(path) as img:
+            img.verify()
+            fmt = img.format
+    except (UnidentifiedImageError, OSError) as e:
+        raise ValueError(f"画像として読み込めません: {e}")
+    if fmt not in FORMAT_EXTENSIONS:
+        raise ValueError(f"対応していない画像形式です: {fmt}")
+    return FORMAT_EXTENSIONS[fmt]
+
+def _has_alpha(img):
+    return img.mode in ("RGBA", "LA") or (img.mode == "P" and "transparency" in img.info)
+
+def _save_variant(img, size, path_without_ext, quality):
+    variant = img.copy()
+    variant.thumbnail(size, Image.LANCZOS)
+    if _has_alpha(variant):
+        path = path_without_ext + ".png"
+        variant.save(path, optimize=True)
+    else:
+        path = path_without_ext + ".jpg"
+        variant.convert("RGB").save(path, quality=quality, optimize=True)
+    return path
+
+def _find_variant(path_without_ext):
+    for ext in (".jpg", ".png"):
+        if os.path.exists(path_without_ext + ext):
+            return path_without_ext + ext
+    return None
+
+def build_variants(src_path, out_dir, key):
+    """レンダリング用とサムネイルを作り、{"render": パス, "thumbnail": パス} を返します。既にあれば再利用します。"""
+    targets = {
+        "render": (os.path.join(out_dir, f"{key}_render"), RENDER_SIZE, 90),
+        "thumbnail": (os.path.join(out_dir, f"{key}_thumb"), THUMB_SIZE, 80),
+    }
+    result = {name: _find_variant(base) for name, (base, _, _) in targets.items()}
+    missing = [name for name, path in result.items() if path is None]
+    if missing:
+        with Image.open(src_path) as img:
+            # スマホ写真の回転情報を反映してから縮小する
+            img = ImageOps.exif_transpose(img)
+            img.load()
+            for name in missing:
+                base, size, quality = targets[name]
+                result[name] = _save_variant(img, size, base, quality)
+    return result
+
+def ingest_image(tmp_path, out_dir, key):
+    """
+    一時ファイルを <key>.<拡張子> として保存し、サイズ違いを生成します。
+    同じ内容の画像が既にあれば一時ファイルを捨てて既存のものを使います。
+    戻り値: {"original": パス, "render": パス, "thumbnail": パス, "deduplicated": bool}
+    """
+    original = os.path.join(out_dir, key + detect_extension(tmp_path))
+    deduplicated = os.path.exists(original)
+    if deduplicated:
+        os.remove(tmp_path)
+    else:
+        os.replace(tmp_path, original)
+    variants = build_variants(original, out_dir, key)
+    return {"original": original, **variants, "deduplicated": deduplicated}
@@ -0,0 +1,52 @@
+"""
+JSONの読み書き
+orjson がインストールされていればそれを使い、なければ標準の json モジュールで処理します。
+どちらでも UTF-8 のまま（\\uXXXX にエスケープせず）出力します。
+
+- 機械だけが読むファイル（render_props.json、パイプラインの状態など）は compact（改行・空白なし）
+- 人が開いて編集するファイル（台本・シーンJSON）は pretty=True（2スペースのインデント）
+
+    pip install orjson   # 任意。入れると大きなシーンJSONの読み書きが速くなります
+"""
+
+import os
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+BACKEND = "orjson" if orjson else "json"
+
+def dumps(obj, pretty=False):
+    """obj を UTF-8 の bytes にシリアライズします。"""
+    if orjson is not None:
+        option = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+        if pretty:
+            option |= orjson.OPT_INDENT_2
+        try:
+            return orjson.dumps(obj, option=option)
+        except TypeError:
+            # 64bitを超える整数など orjson が扱えない値は標準モジュールに任せる
+            pass
+    if pretty:
+        return json.dumps(obj, ensure_ascii=False, indent=2).encode("utf-8")
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+def loads(data):
+    """bytes / str のJSONを読み込みます。"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+def dump_file(path, obj, pretty=False):
+    """ファイルに書き出します（アトミックに置き換えたい場合は scene_store.atomic_write_json を使う）。"""
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(dumps(obj, pretty=pretty))
+
+def load_file(path):
+    with open(path, "rb") as f:
+        return loads(f.read())
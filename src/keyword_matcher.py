@@ -0,0 +1,138 @@
+"""
+複数キーワードの一括検索（Aho–Corasick法）
+キーワード表から一度だけオートマトンを組み立て、テキストを1回走査するだけで
+全キーワードの出現位置を列挙します。キーワードが数百語に増えても、
+走査にかかる時間はテキストの長さとヒット数だけで決まります。
+
+    matcher = KeywordMatcher({"nod": ["うん", "はい"], "jump": ["やった"]})
+    matcher.best_label("はい、やった！")   # -> "nod"（先に登録したラベルが優先）
+
+キーワードに重みを付けると、全ヒットの重みの合計でラベルを選べます。
+
+    matcher = KeywordMatcher({"jump": {"ジャンプ": 1}, "big_jump": {"大ジャンプ": 2}})
+    matcher.best_scored_label("大ジャンプ！")   # -> "big_jump"
+"""
+
+from collections import deque
+
+class KeywordMatcher:
+    def __init__(self, table):
+        """
+        table: {ラベル: [キーワード, ...]}、{ラベル: {キーワード: 重み, ...}}、
+               またはキーワードのリスト（ラベル=キーワード自身）。
+        ラベルの優先度は登録順で、先に登録したものほど高くなります。重みの省略時は1です。
+        """
+        if not isinstance(table, dict):
+            table = {word: [word] for word in table}
+        self.labels = list(table)
+        self.priority = {label: i for i, label in enumerate(self.labels)}
+        self.keywords = []
+        self._order = {}
+        # トライ木: goto[状態] = {文字: 次の状態}、out[状態] = その状態で終わるキーワード番号
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [[]]
+        for label, words in table.items():
+            weighted = words.items() if isinstance(words, dict) else ((w, 1.0) for w in words)
+            for word, weight in weighted:
+                if word:
+                    self._add(word, label, float(weight))
+        self._build_failure_links()
+
+    def _add(self, word, label, weight):
+        state = 0
+        for ch in word:
+            nxt = self._goto[state].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            state = nxt
+        self._out[state].append(len(self.keywords))
+        self._order.setdefault(word, len(self.keywords))
+        self.keywords.append((word, label, weight))
+
+    def _build_failure_links(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fail = self._fail[state]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[nxt] = self._goto[fail].get(ch, 0)
+                # 接尾辞で終わるキーワードもこの状態で報告する
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def finditer(self, text):
+        """(開始位置, 終了位置, キーワード, ラベル) を出現順に返します。重なったヒットも全て含みます。"""
+        goto, fail, out = self._goto, self._fail, self._out
+        state = 0
+        for i, ch in enumerate(text):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            for index in out[state]:
+                word, label, _ = self.keywords[index]
+                yield i + 1 - len(word), i + 1, word, label
+
+    def longest_matches(self, text):
+        """
+        重ならないヒットを左から順に選び、(開始位置, 終了位置, キーワード, ラベル) で返します。
+        同じ位置から始まるヒットは最も長いものを選びます（「ネコミミ」の中の「ネコ」は含めない）。
+        """
+        hits = sorted(self.finditer(text), key=lambda hit: (hit[0], -hit[1]))
+        matches = []
+        end = 0
+        for hit in hits:
+            if hit[0] >= end:
+                matches.append(hit)
+                end = hit[1]
+        return matches
+
+    def keywords_in(self, text):
+        """
+        テロップの強調ワードを重複なしで返します。左から最長一致で選び、長い順（同じ長さなら登録順）に並べます。
+        テロップ側は先に並んだ語から正規表現でマッチするので、長い語を先にしておきます。
+        """
+        found = {word for _, _, word, _ in self.longest_matches(text)}
+        return sorted(found, key=lambda word: (-len(word), self._order[word]))
+
+    def labels_in(self, text):
+        """ヒットしたラベルを優先度順で返します。"""
+        found = {label for _, _, _, label in self.finditer(text)}
+        return sorted(found, key=self.priority.__getitem__)
+
+    def best_label(self, text, default=None):
+        """ヒットしたラベルのうち最も優先度の高いものを返します。"""
+        best = None
+        for _, _, _, label in self.finditer(text):
+            if best is None or self.priority[label] < self.priority[best]:
+                best = label
+                if self.priority[best] == 0:
+                    break
+        return default if best is None else best
+
+    def scores(self, text):
+        """ラベルごとにヒットしたキーワードの重みを合計して返します（同じ語の複数回出現も加算）。"""
+        totals = {}
+        goto, fail, out = self._goto, self._fail, self._out
+        state = 0
+        for ch in text:
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            for index in out[state]:
+                _, label, weight = self.keywords[index]
+                totals[label] = totals.get(label, 0.0) + weight
+        return totals
+
+    def best_scored_label(self, text, default=None):
+        """合計スコアが最も高いラベルを返します。同点なら優先度の高い方を選びます。"""
+        totals = self.scores(text)
+        if not totals:
+            return default
+        return min(totals, key=lambda label: (-totals[label], self.priority[label]))
@@ -1,29 +1,13 @@
 import os
-from moviepy.editor import ImageClip, AudioFileClip
+from slideshow_render import render_slideshow
 
 def create_simple_video(image_path, audio_path, output_path, duration=10):
     """
     指定された画像と音声からシンプルな動画を作成します。
+    ffmpeg で直接書き出すので、フレームを Python で作りません（音声は動画の長さに合わせて切る／無音で埋める）。
     """
     print(f"動画生成を開始します... (Duration: {duration}s)")
-    
-    # 画像クリップの読み込み
-    clip = ImageClip(image_path).set_duration(duration)
-    
-    # 音声クリップの読み込み
-    audio = AudioFileClip(audio_path)
-    # 動画の長さに合わせて音声を調整（ループまたはカット）
-    if audio.duration > duration:
-        audio = audio.subclip(0, duration)
-    else:
-        # 音声が短い場合はループさせるなどの処理が必要ですが、ここではシンプルに
-        pass
-        
-    # 音声をセット
-    clip = clip.set_audio(audio)
-    
-    # 書き出し
-    clip.write_videofile(output_path, fps=24)
+    render_slideshow([{"image": image_path, "audio": audio_path, "duration": duration}], output_path, fps=24)
     print(f"動画が正常に生成されました: {output_path}")
 
 if __name__ == "__main__":
@@ -0,0 +1,94 @@
+"""
+音声・画像・動画ファイルの配信
+Range リクエスト（206 Partial Content）に対応し、プレビューでシークしても
+ファイル全体をダウンロードしなくて済むようにします。ETag にはファイル内容の
+SHA-256 を使うので、同じ内容ならブラウザのキャッシュがセッションをまたいで効きます。
+"""
+
+import os
+import re
+import mimetypes
+from typing import Optional
+from fastapi import Request
+from fastapi.responses import Response, StreamingResponse
+from content_hash import ContentHasher
+
+STREAM_CHUNK = 256 * 1024
+# URL に内容ハッシュ（?v=...）が付いている場合のキャッシュ期間
+IMMUTABLE_CACHE = "public, max-age=31536000, immutable"
+
+_hasher = ContentHasher()
+_RANGE_PATTERN = re.compile(r"bytes=(\d*)-(\d*)$")
+
+def content_hash(path: str) -> Optional[str]:
+    """ファイル内容のハッシュ（サイズと更新時刻が同じ間はキャッシュ）を返します。"""
+    return _hasher.file_hash(path)
+
+def parse_range(header: str, size: int):
+    """
+    Range ヘッダーを (開始, 終了) に変換します（終了位置を含む）。
+    解釈できない・複数範囲の場合は None（全体を返す）、範囲外なら ValueError。
+    """
+    match = _RANGE_PATTERN.match(header.strip())
+    if not match:
+        return None
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        # bytes=-500 : 末尾500バイト
+        length = int(last)
+        if length == 0 or size == 0:
+            # 0バイトのファイルには返せる範囲がない（RFC 9110 14.1.3）
+            raise ValueError("range not satisfiable")
+        return max(0, size - length), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        raise ValueError("range not satisfiable")
+    return start, end
+
+def _iter_file(path: str, start: int, length: int):
+    with open(path, "rb") as f:
+        f.seek(start)
+        remaining = length
+        while remaining > 0:
+            chunk = f.read(min(STREAM_CHUNK, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+def file_response(request: Request, path: str, media_type: Optional[str] = None,
+                  cache_control: str = "no-cache", filename: Optional[str] = None) -> Response:
+    """ETag・条件付きGET・Range に対応したファイルレスポンスを返します。"""
+    size = os.path.getsize(path)
+    etag = f'"{content_hash(path)}"'
+    media_type = media_type or mimetypes.guess_type(path)[0] or "application/octet-stream"
+    headers = {"ETag": etag, "Cache-Control": cache_control, "Accept-Ranges": "bytes"}
+    if filename:
+        headers["Content-Disposition"] = f'attachment; filename="{filename}"'
+
+    if etag in [t.strip() for t in request.headers.get("if-none-match", "").split(",")]:
+        return Response(status_code=304, headers=headers)
+
+    byte_range = None
+    range_header = request.headers.get("range")
+    # If-Range が現在の ETag と違えば、ファイルが変わっているので全体を返す
+    if range_header and request.headers.get("if-range", etag) == etag:
+        try:
+            byte_range = parse_range(range_header, size)
+        except ValueError:
+            headers["Content-Range"] = f"bytes */{size}"
+            return Response(status_code=416, headers=headers)
+
+    if byte_range is None:
+        headers["Content-Length"] = str(size)
+        return StreamingResponse(_iter_file(path, 0, size), media_type=media_type, headers=headers)
+
+    start, end = byte_range
+    length = end - start + 1
+    headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+    headers["Content-Length"] = str(length)
+    return StreamingResponse(_iter_file(path, start, length), status_code=206,
+                             media_type=media_type, headers=headers)
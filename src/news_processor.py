@@ -1,104 +1,48 @@
 import os
-import json
 import sys
-import feedparser
 import re
 import requests
-import wave
-import contextlib
 from dotenv import load_dotenv
-
-# 標準出力をUTF-8に強制設定（Windows環境の文字化け対策）
-if sys.platform == "win32":
-    import io
-    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+import json_io
+from feed_ingester import FeedIngester
+from reading_dict import load_reading_dict
+from scene_store import load_scenes, save_scenes
+from script_compiler import compile_scenes
+from subtitle_segmenter import SubtitleSegmenter
 
 # .env ファイルから環境変数を読み込む
 load_dotenv()
 
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+VIDEO_PUBLIC_DIR = os.path.join(BASE_DIR, "video", "public")
+NEWS_IMAGE_REL = "images/news_main.jpg"
+# パイプライン実行時の中間ファイル置き場
+WORK_DIR = os.path.join(BASE_DIR, "work", "news")
+
 def log(msg):
     print(msg, flush=True)
 
-def fetch_latest_news():
-    """RSSフィードから最新のゲームニュースを取得します。"""
-    rss_url = "https://www.4gamer.net/rss/index.xml"
-    feed = feedparser.parse(rss_url)
-    news_list = []
-    
-    for entry in feed.entries[:5]: # 上位5件
-        news_list.append({
-            "title": entry.title,
-            "summary": re.sub(r'<.*?>', '', entry.summary)[:120]
-        })
-    return news_list
-
-def get_audio_duration(file_path):
-    """wavファイルの長さを秒単位で取得します。"""
-    try:
-        if not os.path.exists(file_path): return 5.0
-        with contextlib.closing(wave.open(file_path,'r')) as f:
-            frames = f.getnframes()
-            rate = f.getframerate()
-            duration = frames / float(rate)
-            return duration
-    except Exception as e:
-        log(f"  [ERROR] duration取得エラー: {e}")
-        return 5.0
+def fetch_latest_news(ingester=None):
+    """
+    RSSフィードから、まだ動画にしていないゲームニュースを新しい順に取得します（上位5件）。
+    動画にし終えた記事は mark_news_done() で既読にします。
+    """
+    return (ingester or FeedIngester()).fetch_new(limit=5)
 
-def fix_reading_errors(text):
-    """読み間違いを修正し、英語をカタカナに変換します。"""
-    replacements = [
-        ("最新", "さいしん"), ("更新", "こうしん"), ("ｗｗｗ", "わらわらわら"),
-        ("!!", "！"), ("！！", "！"),
-        # 英語の読み調整 (単語として読んでほしいもの)
-        ("ARC", "アーク"), ("Raiders", "レイダース"), ("Headwinds", "ヘッドウィンズ"),
-        ("Game", "ゲーム"), ("News", "ニュース"), ("Solo", "ソロ"), ("Team", "チーム"),
-        ("Update", "アップデート"), ("Review", "レビュー"), ("Play", "プレイ"),
-        ("Pokemon", "ポケモン"), ("Park", "パーク"), ("Kanto", "カントー"),
-        ("Wilds", "ワイルズ"), ("Monster", "モンスター"), ("Hunter", "ハンター")
-    ]
-    # 長い単語から順に置換
-    replacements.sort(key=lambda x: len(x[0]), reverse=True)
-
-    for old, new in replacements:
-        # 単語境界を意識した正規表現
-        text = re.sub(rf'\b{old}\b', new, text, flags=re.IGNORECASE)
-        # 境界がない場合も対応
-        text = text.replace(old, new)
-
-    text = re.sub(r'「(.*?)」', r'\1', text)
-    text = re.sub(r'。+', '。', text)
-    text = re.sub(r'\s+', ' ', text)
-    return text
+def mark_news_done(news, ingester=None):
+    (ingester or FeedIngester()).mark_seen([news])
 
-VOICEVOX_URL = "http://127.0.0.1:50021"
+QUOTE_PATTERN = re.compile(r'「(.*?)」')
+PERIODS_PATTERN = re.compile(r'。+')
+SPACES_PATTERN = re.compile(r'\s+')
 
-def generate_voice(text, output_path, speaker_id=3):
-    """VOICEVOX APIを使用して音声を生成します。"""
-    clean_text = fix_reading_errors(text)
-    try:
-        query_payload = {"text": clean_text, "speaker": speaker_id}
-        query_response = requests.post(f"{VOICEVOX_URL}/audio_query", params=query_payload, timeout=20)
-        if query_response.status_code != 200: 
-            return False
-            
-        query_data = query_response.json()
-        query_data["speedScale"] = 1.25
-
-        synthesis_response = requests.post(
-            f"{VOICEVOX_URL}/synthesis",
-            params={"speaker": speaker_id},
-            json=query_data,
-            timeout=60
-        )
-
-        if synthesis_response.status_code == 200:
-            with open(output_path, "wb") as f:
-                f.write(synthesis_response.content)
-            return True
-    except Exception as e:
-        log(f"  [ERROR] 音声生成エラー: {e}")
-    return False
+def fix_reading_errors(text):
+    """読み間違いを修正し、英語をカタカナに変換します（辞書: dictionaries/news.tsv）。"""
+    text = load_reading_dict("news").apply(text)
+    text = QUOTE_PATTERN.sub(r'\1', text)
+    text = PERIODS_PATTERN.sub('。', text)
+    text = SPACES_PATTERN.sub(' ', text)
+    return text
 
 def download_image_pexels(query, output_path):
     """Pexels APIを使用して画像をダウンロードします。"""
@@ -123,36 +67,48 @@ def download_image_pexels(query, output_path):
     return False
 
 def split_text_into_scenes(text, max_chars=40):
-    """テキストを2行程度（約40文字）ずつに分割します。"""
-    chunks = re.split(r'([、。！？」]+)', text)
-    scenes = []
-    current = ""
-    
-    for i in range(0, len(chunks)-1, 2):
-        sentence = chunks[i] + chunks[i+1]
-        if len(current) + len(sentence) > max_chars:
-            if current: scenes.append(current.strip())
-            current = sentence
-        else:
-            current += sentence
-            
-    if current:
-        scenes.append(current.strip())
-    
-    final_scenes = []
-    for s in scenes:
-        while len(s) > max_chars:
-            final_scenes.append(s[:max_chars])
-            s = s[max_chars:]
-        if s: final_scenes.append(s)
-        
-    return final_scenes
+    """
+    テキストを1シーン2行・全角 max_chars 文字程度ずつに分割します（行は改行でつなぐ）。
+    幅は全角・半角を区別して測り、文末・読点・助詞の後で区切ります（subtitle_segmenter.py）。
+    """
+    return SubtitleSegmenter(line_width=max_chars, max_lines=2).scenes(text)
+
+def build_news_script(news):
+    """ニュース1件から (感情, セリフ) のシーン単位の原稿を作ります。"""
+    # 原稿定義 (KANONソロスタイル)
+    raw_script = [
+        ("happy", "みなさん、こんにちは！ゲームナビゲーターのカノンです！"),
+        ("surprised", f"今日の注目ニュースはこちら！{news['title']}が話題になっています！"),
+        ("panic", "ええっ！？これ、予想以上の急展開じゃないですか！？"),
+        ("normal", f"内容を詳しく見ていきましょう。{news['summary']}...とのことですよ。"),
+        ("happy", "これ、個人的にもエンジニア心がくすぐられるというか、すごくワクワクしますね！"),
+        ("normal", "デザインも洗練されていますし、実際に体験できる日が待ち遠しいです！"),
+        ("happy", "みなさんはどう思いましたか？ぜひコメントで教えてくださいね！それじゃあ、またね！"),
+    ]
+
+    lines = []
+    for emotion, text in raw_script:
+        for sub_text in split_text_into_scenes(text):
+            lines.append({"emotion": emotion, "text": sub_text})
+    return lines
+
+def synthesize_news_script(lines, public_dir=VIDEO_PUBLIC_DIR, img_rel=NEWS_IMAGE_REL, asset_dir="", client=None):
+    """
+    原稿の各行を台本コンパイラの共通ステージ（音声合成・尺・音量計算）に通し、シーンデータのリストを返します。
+    asset_dir を指定すると、音声を public_dir/<asset_dir>/audio に分けて保存します。
+    client は VoicevoxClient（省略時は呼び出しごとに作る）。
+    """
+    script = {
+        "name": "kanon_scene",
+        "speed_scale": 1.25,
+        "default_image": img_rel,
+        # 雨晴はう (ノーマル: 10) に固定
+        "scenes": [{"speaker": "kanon", "emotion": line["emotion"], "text": line["text"]} for line in lines],
+    }
+    return compile_scenes(script, public_dir, client=client, asset_dir=asset_dir, speech_filter=fix_reading_errors)
 
 def create_news_data():
     """KANONソロスタイルのニュース動画データを生成します。"""
-    BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-    VIDEO_PUBLIC_DIR = os.path.join(BASE_DIR, "video", "public")
-    
     for sub in ["audio", "images"]:
         path = os.path.join(VIDEO_PUBLIC_DIR, sub)
         if not os.path.exists(path): os.makedirs(path)
@@ -160,57 +116,80 @@ def create_news_data():
     log("ニュースを収集中...")
     news_list = fetch_latest_news()
     if not news_list:
-        log("ニュースの取得に失敗しました。")
+        log("新しいニュースはありません。")
         return
 
     news = news_list[0]
     log(f"\n--- 特集ニュース: {news['title']} ---")
 
-    img_rel = "images/news_main.jpg"
-    img_full = os.path.join(VIDEO_PUBLIC_DIR, img_rel)
+    img_full = os.path.join(VIDEO_PUBLIC_DIR, NEWS_IMAGE_REL)
     download_image_pexels(f"{news['title']}", img_full)
 
-    # 原稿定義 (KANONソロスタイル)
-    raw_script = [
-        ("happy", "みなさん、こんにちは！ゲームナビゲーターのカノンです！"),
-        ("surprised", f"今日の注目ニュースはこちら！{news['title']}が話題になっています！"),
-        ("panic", "ええっ！？これ、予想以上の急展開じゃないですか！？"),
-        ("normal", f"内容を詳しく見ていきましょう。{news['summary']}...とのことですよ。"),
-        ("happy", "これ、個人的にもエンジニア心がくすぐられるというか、すごくワクワクしますね！"),
-        ("normal", "デザインも洗練されていますし、実際に体験できる日が待ち遠しいです！"),
-        ("happy", "みなさんはどう思いましたか？ぜひコメントで教えてくださいね！それじゃあ、またね！"),
-    ]
-
-    video_script = []
-    # 雨晴はう (ノーマル: 10) に固定
-    KANON_SPEAKER_ID = 10
-    scene_id = 0
-
-    for emotion, text in raw_script:
-        sub_texts = split_text_into_scenes(text)
-        for sub_text in sub_texts:
-            log(f"音声生成中 (Scene {scene_id}): {sub_text[:20]}...")
-            audio_rel = f"audio/kanon_scene_{scene_id}.wav"
-            audio_full = os.path.join(VIDEO_PUBLIC_DIR, audio_rel)
-            
-            # 雨晴はうの声で生成
-            if generate_voice(sub_text, audio_full, speaker_id=KANON_SPEAKER_ID):
-                video_script.append({
-                    "id": scene_id,
-                    "speaker": "kanon",
-                    "emotion": emotion,
-                    "text": sub_text,
-                    "audio": audio_rel,
-                    "image": img_rel,
-                    "duration": get_audio_duration(audio_full)
-                })
-                scene_id += 1
+    video_script = synthesize_news_script(build_news_script(news))
 
     json_path = os.path.join(VIDEO_PUBLIC_DIR, "news_data.json")
-    with open(json_path, 'w', encoding='utf-8') as f:
-        json.dump(video_script, f, ensure_ascii=False, indent=2)
+    save_scenes(json_path, video_script)
+    mark_news_done(news)
     
     log(f"\n[完了] データを生成しました: {json_path}")
 
+def build_news_pipeline():
+    """
+    ニュース取得 → 原稿 → 音声 / 画像（並列） → レンダリング のパイプラインを定義します。
+    pipeline_runner.py から実行すると、入力が変わっていないステージはスキップされます。
+    """
+    from pipeline_runner import Stage
+    from remotion_render import render_composition
+
+    news_item_path = os.path.join(WORK_DIR, "news_item.json")
+    script_path = os.path.join(WORK_DIR, "news_script.json")
+    props_path = os.path.join(WORK_DIR, "render_props.json")
+    news_data_path = os.path.join(VIDEO_PUBLIC_DIR, "news_data.json")
+    image_path = os.path.join(VIDEO_PUBLIC_DIR, NEWS_IMAGE_REL)
+    output_path = os.path.join(BASE_DIR, "video", "out", "news.mp4")
+
+    # 中間ファイルは機械だけが読むので compact で書き出す
+    read_json = json_io.load_file
+    write_json = json_io.dump_file
+
+    def fetch():
+        # 既読にするのはレンダリングが終わってから。途中で失敗した記事は次回も同じものを選ぶので、
+        # 記事が変わらない限り後続のステージはスキップされる
+        news_list = fetch_latest_news()
+        if not news_list:
+            raise RuntimeError("新しいニュースはありません。")
+        write_json(news_item_path, news_list[0])
+
+    def script():
+        write_json(script_path, build_news_script(read_json(news_item_path)))
+
+    def images():
+        os.makedirs(os.path.dirname(image_path), exist_ok=True)
+        title = read_json(news_item_path)["title"]
+        if not download_image_pexels(title, image_path):
+            raise RuntimeError(f"画像を取得できませんでした: {title}")
+
+    def audio():
+        os.makedirs(os.path.join(VIDEO_PUBLIC_DIR, "audio"), exist_ok=True)
+        save_scenes(news_data_path, synthesize_news_script(read_json(script_path)))
+
+    def render():
+        write_json(props_path, {"scenes": load_scenes(news_data_path)})
+        render_composition("VisionForgeLong", output_path, props_path)
+        mark_news_done(read_json(news_item_path))
+
+    return [
+        Stage("news", fetch, outputs=[news_item_path], always=True),
+        Stage("script", script, inputs=[news_item_path], outputs=[script_path], deps=["news"]),
+        Stage("images", images, inputs=[news_item_path], outputs=[image_path], deps=["news"]),
+        Stage("audio", audio, inputs=[script_path], outputs=[news_data_path], deps=["script"]),
+        Stage("render", render,
+              inputs=[news_data_path, image_path, os.path.join(BASE_DIR, "video", "src")],
+              outputs=[output_path], deps=["audio", "images"]),
+    ]
+
 if __name__ == "__main__":
+    # 標準出力をUTF-8に（Windows環境の文字化け対策。reconfigure は何度呼んでも安全）
+    if sys.platform == "win32":
+        sys.stdout.reconfigure(encoding='utf-8')
     create_news_data()
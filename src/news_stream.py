@@ -0,0 +1,224 @@
+"""
+ニュース動画の常駐生成
+フィードを定期的に確認し、新しい記事が出るたびに 原稿 → 音声・画像（並列） → レンダリング を
+記事ごとの独立したジョブとして流します。手動でまとめて実行しなくても、記事が出て数分で動画になります。
+
+- 記事ごとに素材を video/public/news/<記事キー>/ に、動画を video/out/news/<記事キー>.mp4 に出力する
+  （news_data.json は上書きしない）
+- レンダリング待ちのキューがいっぱいの間は素材生成が止まり、素材生成のキューがいっぱいの間は
+  新しい記事を取り込まない（取り込まなかった記事は未読のまま次回の確認で拾う）
+- 記事はレンダリングが終わってから既読にする。MAX_ATTEMPTS 回失敗した記事は諦めて既読にする
+- レンダリングは常駐ワーカー（render_pool.py）で行う。--renderer=slideshow なら Remotion を使わず
+  ffmpeg で静止画＋音声だけの縦長ショートを書き出す（slideshow_render.py、字幕・演出なし）
+
+    python src/news_stream.py                    # フィードを監視し続ける（Ctrl+C で終了）
+    python src/news_stream.py --once             # 今ある未読記事を処理して終了
+    python src/news_stream.py --interval=120     # 確認間隔（秒）
+    python src/news_stream.py --profile=draft    # レンダリング品質
+    python src/news_stream.py --renderer=slideshow
+"""
+
+import os
+import sys
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dotenv import load_dotenv
+import json_io
+from feed_ingester import FeedIngester
+from news_processor import (
+    VIDEO_PUBLIC_DIR, BASE_DIR, build_news_script, synthesize_news_script, download_image_pexels,
+)
+from remotion_render import render_composition
+from render_pool import RenderPool
+from scene_store import save_scenes
+from slideshow_render import render_scenes
+from voicevox_client import VoicevoxClient
+
+load_dotenv()
+
+NEWS_ASSET_DIR = "news"
+NEWS_OUTPUT_DIR = os.path.join(BASE_DIR, "video", "out", "news")
+POLL_INTERVAL = 300
+PREPARE_WORKERS = 2
+RENDER_WORKERS = 1
+# レンダリング待ちの上限（これを超えると素材生成が待つ）
+RENDER_QUEUE_SIZE = 2
+MAX_ATTEMPTS = 3
+# 1記事の音声合成の並列数
+VOICEVOX_WORKERS = 4
+RENDERERS = ("remotion", "slideshow")
+# Pexels から画像を取れなかった記事に使う背景
+FALLBACK_IMAGE = "images/bg_kanon_room.png"
+
+def log(msg):
+    print(msg, flush=True)
+
+def prepare_news_item(item, client=None):
+    """
+    記事1件分の素材を生成し、レンダリング用のprops JSONのパスを返します。
+    client は VoicevoxClient。常駐中は NewsStream が1つ作って全記事で使い回します。
+    """
+    asset_dir = f"{NEWS_ASSET_DIR}/{item['key']}"
+    item_dir = os.path.join(VIDEO_PUBLIC_DIR, asset_dir)
+    os.makedirs(os.path.join(item_dir, "audio"), exist_ok=True)
+    img_rel = f"{asset_dir}/news_main.jpg"
+
+    lines = build_news_script(item)
+    # 画像の取得と音声合成は互いに待たずに進める
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        image = pool.submit(download_image_pexels, item["title"], os.path.join(VIDEO_PUBLIC_DIR, img_rel))
+        scenes = synthesize_news_script(lines, VIDEO_PUBLIC_DIR, img_rel, asset_dir, client)
+        image_ok = image.result()
+    if not scenes:
+        raise RuntimeError("音声を1つも生成できませんでした")
+    if not image_ok:
+        # 存在しない画像を参照したままだとレンダリングで失敗するので、共通の背景に差し替える
+        log(f"  [{item['key']}] 画像を取得できなかったため {FALLBACK_IMAGE} を使います")
+        for scene in scenes:
+            if scene.get("image") == img_rel:
+                scene["image"] = FALLBACK_IMAGE
+
+    save_scenes(os.path.join(item_dir, "scenes.json"), scenes)
+    props_path = os.path.join(item_dir, "render_props.json")
+    json_io.dump_file(props_path, {"scenes": scenes})
+    return props_path
+
+class NewsStream:
+    def __init__(self, ingester=None, prepare_workers=PREPARE_WORKERS, render_workers=RENDER_WORKERS,
+                 render_queue_size=RENDER_QUEUE_SIZE, profile=None, renderer="remotion", client=None):
+        if renderer not in RENDERERS:
+            raise ValueError(f"未知のレンダラーです: {renderer}（{', '.join(RENDERERS)}）")
+        self.ingester = ingester or FeedIngester()
+        # HTTPセッション・合成済みセリフのキャッシュ・辞書の同期状態を記事をまたいで使い回す
+        # （素材生成ワーカーが同時に合成するので、接続プールはワーカー数分広げる）
+        self.client = client or VoicevoxClient(max_workers=VOICEVOX_WORKERS,
+                                               pool_size=prepare_workers * VOICEVOX_WORKERS)
+        self.profile = profile
+        self.renderer = renderer
+        self.prepare_workers = prepare_workers
+        self.render_workers = render_workers
+        self.prepare_queue = queue.Queue(maxsize=prepare_workers)
+        self.render_queue = queue.Queue(maxsize=render_queue_size)
+        self.render_pool = RenderPool(size=render_workers)
+        # 取り込んでからレンダリングが終わるまでの記事（同じ記事を二重に流さない）
+        self.in_flight = set()
+        self.failures = {}
+        self.lock = threading.Lock()
+        self.stop_event = threading.Event()
+
+    def poll(self):
+        """未読の記事を取り込みます。取り込んだ件数を返します。"""
+        added = 0
+        for item in self.ingester.fetch_new():
+            with self.lock:
+                if item["key"] in self.in_flight:
+                    continue
+                if self.prepare_queue.full():
+                    break
+                self.in_flight.add(item["key"])
+            log(f"📰 新着: {item['title']}")
+            self.prepare_queue.put(item)
+            added += 1
+        return added
+
+    def _failed(self, item, stage, error):
+        key = item["key"]
+        with self.lock:
+            self.in_flight.discard(key)
+            self.failures[key] = self.failures.get(key, 0) + 1
+            attempts = self.failures[key]
+        log(f"✗ [{key}] {stage}に失敗 ({attempts}/{MAX_ATTEMPTS}): {error}")
+        if attempts >= MAX_ATTEMPTS:
+            log(f"  [{key}] 諦めて既読にします: {item['title']}")
+            self.ingester.mark_seen([item])
+
+    def _prepare_loop(self):
+        while True:
+            item = self.prepare_queue.get()
+            if item is None:
+                break
+            try:
+                props_path = prepare_news_item(item, self.client)
+            except Exception as e:
+                self._failed(item, "素材生成", e)
+                continue
+            # レンダリングが詰まっている間はここで待つ
+            self.render_queue.put((item, props_path))
+
+    def _render_loop(self):
+        while True:
+            job = self.render_queue.get()
+            if job is None:
+                break
+            item, props_path = job
+            output_path = os.path.join(NEWS_OUTPUT_DIR, f"{item['key']}.mp4")
+            try:
+                if self.renderer == "slideshow":
+                    render_scenes(props_path, output_path)
+                else:
+                    render_composition("VisionForgeLong", output_path, props_path,
+                                       profile=self.profile, pool=self.render_pool)
+            except Exception as e:
+                self._failed(item, "レンダリング", e)
+                continue
+            self.ingester.mark_seen([item])
+            with self.lock:
+                self.in_flight.discard(item["key"])
+                self.failures.pop(item["key"], None)
+            log(f"🎬 [{item['key']}] 完了: {output_path}")
+
+    def idle(self):
+        with self.lock:
+            return not self.in_flight
+
+    def run(self, interval=POLL_INTERVAL, once=False):
+        os.makedirs(NEWS_OUTPUT_DIR, exist_ok=True)
+        threads = [threading.Thread(target=self._prepare_loop, daemon=True) for _ in range(self.prepare_workers)]
+        threads += [threading.Thread(target=self._render_loop, daemon=True) for _ in range(self.render_workers)]
+        for t in threads:
+            t.start()
+        log(f"📡 ニュース監視開始: {len(self.ingester.feeds)}フィード, {interval}秒ごと")
+        try:
+            while not self.stop_event.is_set():
+                try:
+                    added = self.poll()
+                except Exception as e:
+                    log(f"[Feed] 確認に失敗: {e}")
+                    added = 0
+                if once and not added and self.idle():
+                    break
+                # --once でも、取り込みきれなかった記事は処理が進んでから拾う
+                self.stop_event.wait(5 if once else interval)
+        except KeyboardInterrupt:
+            # 処理中の記事は既読になっていないので、次回の起動でやり直される。
+            # レンダリングワーカーは親プロセスが終わると自分で終了する
+            log("停止します（処理中の記事は次回やり直します）")
+            return
+        self._drain(threads)
+
+    def _drain(self, threads):
+        """キューに残っている記事を処理し終えてからスレッドとワーカーを止めます。"""
+        for _ in range(self.prepare_workers):
+            self.prepare_queue.put(None)
+        for t in threads[:self.prepare_workers]:
+            t.join()
+        for _ in range(self.render_workers):
+            self.render_queue.put(None)
+        for t in threads[self.prepare_workers:]:
+            t.join()
+        self.render_pool.close()
+
+    def stop(self):
+        self.stop_event.set()
+
+if __name__ == "__main__":
+    # 標準出力をUTF-8に（Windows環境の文字化け対策。reconfigure は何度呼んでも安全）
+    if sys.platform == "win32":
+        sys.stdout.reconfigure(encoding='utf-8')
+    options = dict(arg[2:].split("=", 1) if "=" in arg else (arg[2:], True)
+                   for arg in sys.argv[1:] if arg.startswith("--"))
+    NewsStream(profile=options.get("profile"), renderer=options.get("renderer", "remotion")).run(
+        interval=float(options.get("interval", POLL_INTERVAL)),
+        once=bool(options.get("once")),
+    )
@@ -0,0 +1,66 @@
+"""
+Pexels 画像クライアント
+HTTPセッションと検索結果を使い回し、同じクエリでAPIを何度も叩かないようにします。
+"""
+
+import os
+import threading
+import requests
+
+def log(msg):
+    print(msg, flush=True)
+
+class PexelsClient:
+    def __init__(self, api_key=None):
+        self.api_key = api_key or os.getenv("PEXELS_API_KEY")
+        self.session = requests.Session()
+        # クエリ → 画像URL のキャッシュ（バッチ全体で共有）
+        self.url_cache = {}
+        self.lock = threading.Lock()
+
+    def search(self, query, size="large"):
+        """クエリに合う最初の画像URLを返します。見つからなければNone。"""
+        key = (query, size)
+        with self.lock:
+            if key in self.url_cache:
+                return self.url_cache[key]
+        if not self.api_key:
+            log("  [WARNING] Pexels APIキーが設定されていません")
+            return None
+        try:
+            response = self.session.get(
+                "https://api.pexels.com/v1/search",
+                headers={"Authorization": self.api_key},
+                params={"query": query, "per_page": 1, "orientation": "landscape"},
+                timeout=15
+            )
+            if response.status_code != 200:
+                return None
+            photos = response.json().get("photos")
+            url = photos[0]["src"][size] if photos else None
+        except Exception as e:
+            log(f"  [ERROR] 画像検索エラー: {e}")
+            return None
+        with self.lock:
+            self.url_cache[key] = url
+        return url
+
+    def download(self, query, output_path, size="large"):
+        """画像をダウンロードして保存します。既にファイルがあれば何もしません。"""
+        if os.path.exists(output_path):
+            return True
+        url = self.search(query, size)
+        if not url:
+            return False
+        try:
+            response = self.session.get(url, timeout=20)
+            if response.status_code != 200:
+                return False
+            os.makedirs(os.path.dirname(output_path), exist_ok=True)
+            with open(output_path, "wb") as f:
+                f.write(response.content)
+            log(f"  [OK] 画像保存: {os.path.basename(output_path)} (クエリ: {query})")
+            return True
+        except Exception as e:
+            log(f"  [ERROR] 画像取得エラー: {e}")
+        return False
@@ -0,0 +1,147 @@
+"""
+依存関係つきパイプラインランナー
+各ステージは入力ファイルと出力ファイルを宣言し、入力の内容ハッシュが前回と
+同じで出力も残っていればスキップします。依存関係のないステージは並列に実行します。
+
+    python src/pipeline_runner.py            # ニュース動画パイプライン
+    python src/pipeline_runner.py --force    # 全ステージを強制再実行
+"""
+
+import os
+import sys
+import json
+import hashlib
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+import json_io
+from content_hash import ContentHasher
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STATE_PATH = os.path.join(BASE_DIR, ".pipeline_state.json")
+
+def log(msg):
+    print(msg, flush=True)
+
+class Stage:
+    """
+    name:    ステージ名
+    func:    実行する関数（引数なし）
+    inputs:  入力ファイル/ディレクトリのパス（内容ハッシュをキャッシュキーに使う）
+    outputs: 出力ファイルのパス（消えていたら再実行）
+    deps:    先に完了している必要があるステージ名
+    params:  キャッシュキーに含める設定値（台本やスピードなど）
+    always:  True なら毎回実行（RSS取得など外部入力のステージ用）
+    """
+    def __init__(self, name, func, inputs=(), outputs=(), deps=(), params=None, always=False):
+        self.name = name
+        self.func = func
+        self.inputs = list(inputs)
+        self.outputs = list(outputs)
+        self.deps = list(deps)
+        self.params = params
+        self.always = always
+
+def _load_state(state_path):
+    if not os.path.exists(state_path):
+        return {"stages": {}, "files": {}}
+    try:
+        return json_io.load_file(state_path)
+    except Exception:
+        return {"stages": {}, "files": {}}
+
+def _save_state(state_path, state):
+    tmp_path = state_path + ".tmp"
+    json_io.dump_file(tmp_path, state)
+    os.replace(tmp_path, state_path)
+
+def _stage_key(stage, hasher):
+    digest = hashlib.sha256(stage.name.encode("utf-8"))
+    digest.update(json.dumps(stage.params, sort_keys=True, ensure_ascii=False, default=str).encode("utf-8"))
+    for path in stage.inputs:
+        digest.update(path.encode("utf-8"))
+        digest.update((hasher.path_hash(path) or "missing").encode("ascii"))
+    return digest.hexdigest()
+
+def _run_stage(stage, record, hasher, force):
+    """ステージを実行（またはスキップ）し、新しい記録を返します。"""
+    key = _stage_key(stage, hasher)
+    if not force and not stage.always and record and record.get("key") == key:
+        outputs = record.get("outputs", {})
+        current = {p: hasher.path_hash(p) for p in stage.outputs}
+        # 以前の版で「出力なし」のまま記録されたステージもスキップしない
+        if all(current[p] is not None and current[p] == outputs.get(p) for p in stage.outputs):
+            log(f"⏭  [{stage.name}] 入力に変更なし、スキップ")
+            return record, False
+
+    log(f"▶  [{stage.name}] 実行中...")
+    stage.func()
+    # 出力を書き換えた直後なのでハッシュを取り直す
+    new_outputs = {p: hasher.path_hash(p) for p in stage.outputs}
+    # 出力がないまま記録すると、次回は「なし == なし」で永久にスキップされてしまう
+    missing = [p for p, digest in new_outputs.items() if digest is None]
+    if missing:
+        raise RuntimeError(f"出力が作られませんでした: {', '.join(missing)}")
+    log(f"✓  [{stage.name}] 完了")
+    return {"key": key, "outputs": new_outputs}, True
+
+def run_pipeline(stages, state_path=STATE_PATH, max_workers=4, force=False):
+    """
+    ステージを依存関係の順に実行します。
+    戻り値: 実際に実行したステージ名のリスト
+    """
+    by_name = {s.name: s for s in stages}
+    for stage in stages:
+        for dep in stage.deps:
+            if dep not in by_name:
+                raise ValueError(f"ステージ {stage.name} の依存先 {dep} が存在しません")
+
+    state = _load_state(state_path)
+    hasher = ContentHasher(state.get("files"))
+    pending = dict(by_name)
+    finished = set()
+    executed = []
+    running = {}
+    error = None
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        while (pending or running) and error is None:
+            for name, stage in list(pending.items()):
+                if all(dep in finished for dep in stage.deps):
+                    record = state["stages"].get(name)
+                    running[executor.submit(_run_stage, stage, record, hasher, force)] = name
+                    del pending[name]
+            if not running:
+                raise ValueError(f"依存関係が循環しています: {', '.join(pending)}")
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = running.pop(future)
+                try:
+                    record, ran = future.result()
+                except Exception as e:
+                    log(f"✗  [{name}] 失敗: {e}")
+                    error = e
+                    continue
+                state["stages"][name] = record
+                finished.add(name)
+                if ran:
+                    executed.append(name)
+
+        # 失敗時も、実行中だった並列ステージの結果は記録しておく
+        for future in running:
+            try:
+                state["stages"][running[future]] = future.result()[0]
+            except Exception:
+                pass
+
+    state["files"] = hasher.cache
+    _save_state(state_path, state)
+    if error is not None:
+        raise error
+    return executed
+
+if __name__ == "__main__":
+    # 標準出力をUTF-8に（Windows環境の文字化け対策。reconfigure は何度呼んでも安全）
+    if sys.platform == "win32":
+        sys.stdout.reconfigure(encoding='utf-8')
+    from news_processor import build_news_pipeline
+    run_pipeline(build_news_pipeline(), force="--force" in sys.argv)
@@ -0,0 +1,108 @@
+"""
+読み上げ用の置換辞書
+全エントリを1本の正規表現（長い語を優先する選択）にまとめてコンパイルし、
+テキストを1回走査するだけで全置換を行います。
+英数字で始まる・終わる語は、前後が英数字でない位置でだけ置換します
+（"Team" は "Steam" の中では置換しない。日本語に続く "Gameで" は置換する）。
+
+辞書ファイルは src/dictionaries/ に置きます。
+    *.tsv  : 1行1エントリ「置換前<TAB>置換後」、# から始まる行はコメント
+    *.json : {"置換前": "置換後", ...}
+"""
+
+import os
+import re
+import json
+import threading
+
+DICT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "dictionaries")
+
+_ASCII_WORD = re.compile(r"[A-Za-z0-9]")
+
+def _word_pattern(word):
+    """英数字の語は、英単語の途中にマッチしないよう前後を英数字以外に限定します。"""
+    pattern = re.escape(word)
+    # \b は日本語も単語の文字として扱う（"Gameで" にマッチしない）ので、英数字だけで境界を判定する
+    if _ASCII_WORD.match(word[0]):
+        pattern = r"(?<![A-Za-z0-9])" + pattern
+    if _ASCII_WORD.match(word[-1]):
+        pattern += r"(?![A-Za-z0-9])"
+    return pattern
+
+class ReadingDict:
+    def __init__(self, entries, ignore_case=True):
+        """entries: {置換前: 置換後} または (置換前, 置換後) のリスト。後のエントリが優先されます。"""
+        items = entries.items() if isinstance(entries, dict) else entries
+        self.ignore_case = ignore_case
+        self.table = {}
+        for old, new in items:
+            if old:
+                self.table[self._key(old)] = new
+        self.entries = dict(items)
+        if self.table:
+            # 長い語から順に並べると、先頭から最長一致で置換される
+            words = sorted(self.entries, key=len, reverse=True)
+            flags = re.IGNORECASE if ignore_case else 0
+            self.pattern = re.compile("|".join(_word_pattern(w) for w in words if w), flags)
+        else:
+            self.pattern = None
+
+    def _key(self, word):
+        return word.lower() if self.ignore_case else word
+
+    def apply(self, text):
+        if self.pattern is None or not text:
+            return text
+        return self.pattern.sub(lambda m: self.table[self._key(m.group(0))], text)
+
+    def merged(self, other):
+        """other のエントリで上書きした新しい辞書を返します。"""
+        entries = dict(self.entries)
+        entries.update(other.entries if isinstance(other, ReadingDict) else other)
+        return ReadingDict(entries, self.ignore_case)
+
+def _read_entries(path):
+    with open(path, "r", encoding="utf-8") as f:
+        if path.endswith(".json"):
+            return json.load(f)
+        entries = {}
+        for line in f:
+            line = line.rstrip("\r\n")
+            if not line.strip() or line.lstrip().startswith("#"):
+                continue
+            old, _, new = line.partition("\t")
+            entries[old] = new
+        return entries
+
+_cache = {}
+_cache_lock = threading.Lock()
+
+def load_reading_dict(*names):
+    """
+    辞書ファイルを読み込み、後に指定したものが優先になるよう合成します。
+    名前だけ（例: "news"）なら src/dictionaries/news.tsv を探します。
+    ファイルが更新されない限り、コンパイル済みの辞書を使い回します。
+    """
+    paths = tuple(_resolve(name) for name in names)
+    mtimes = tuple(os.path.getmtime(p) for p in paths)
+    with _cache_lock:
+        cached = _cache.get(paths)
+        if cached and cached[0] == mtimes:
+            return cached[1]
+    entries = {}
+    for path in paths:
+        entries.update(_read_entries(path))
+    reading_dict = ReadingDict(entries)
+    with _cache_lock:
+        # 組み合わせごとに最新の1つだけを持つ（更新前の辞書は置き換えて捨てる）
+        _cache[paths] = (mtimes, reading_dict)
+    return reading_dict
+
+def _resolve(name):
+    if os.path.exists(name):
+        return name
+    for ext in (".tsv", ".json"):
+        path = os.path.join(DICT_DIR, name + ext)
+        if os.path.exists(path):
+            return path
+    raise FileNotFoundError(f"読み辞書が見つかりません: {name}")
@@ -6,9 +6,10 @@
 """
 
 import requests
-import json
 import wave
 import contextlib
+from scene_store import update_scenes
+from voicevox_dict import sync_user_dict
 
 VOICEVOX_URL = "http://127.0.0.1:50021"
 
@@ -27,10 +28,6 @@ def get_audio_duration(file_path):
 def generate_voice(text, output_path, speaker_id=3):
     """VOICEVOX APIを使用して音声を生成します。"""
     try:
-        # 読み調整
-        text = text.replace("SUUMO", "スーモ").replace("ＳＵＵＭＯ", "スーモ")
-        text = text.replace("ネルギガンテ", "ねるぎがんて")
-        
         print(f"生成中: {text[:30]}...")
         
         query_payload = {"text": text, "speaker": speaker_id}
@@ -60,22 +57,19 @@ def generate_voice(text, output_path, speaker_id=3):
         print(f"エラー: {e}")
     return False
 
-def update_cat_data_duration(scene_id, new_duration, cat_data_path="video/public/cat_data.json"):
-    """cat_data.jsonの指定されたシーンのdurationを更新します。"""
-    try:
-        with open(cat_data_path, "r", encoding="utf-8") as f:
-            data = json.load(f)
-        
+def update_cat_data_duration(scene_id, new_duration, padding=0.0, cat_data_path="video/public/cat_data.json"):
+    """cat_data.jsonの指定されたシーンのdurationと末尾余白(padding)を更新します。"""
+    def update(data):
         for scene in data:
             if scene.get("id") == scene_id:
                 old_duration = scene.get("duration", 0)
                 scene["duration"] = new_duration
+                scene["padding"] = padding
                 print(f"Duration更新: ID {scene_id}: {old_duration:.2f}秒 -> {new_duration:.2f}秒")
                 break
-        
-        with open(cat_data_path, "w", encoding="utf-8") as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
-        
+
+    try:
+        update_scenes(cat_data_path, update)
         return True
     except Exception as e:
         print(f"エラー: cat_data.json更新失敗: {e}")
@@ -98,6 +92,12 @@ if __name__ == "__main__":
     print(f"余白: {buffer_seconds}秒")
     print("=" * 50)
     
+    # 読み調整はVOICEVOXのユーザー辞書で行う（dictionaries/voicevox_user_dict.tsv）
+    try:
+        sync_user_dict(VOICEVOX_URL)
+    except Exception as e:
+        print(f"警告: ユーザー辞書の同期に失敗しました: {e}")
+
     # 音声生成
     success = generate_voice(text, output_path, speaker_id=3)
     
@@ -105,10 +105,9 @@ if __name__ == "__main__":
         # 音声ファイルの長さを取得
         audio_duration = get_audio_duration(output_path)
         if audio_duration:
-            # 余白を追加したdurationでcat_data.jsonを更新
-            new_duration = audio_duration + buffer_seconds
-            print(f"音声長: {audio_duration:.2f}秒 + 余白{buffer_seconds}秒 = {new_duration:.2f}秒")
-            update_cat_data_duration(scene_id, new_duration)
+            # 余白はdurationに足さずpaddingとして記録
+            print(f"音声長: {audio_duration:.2f}秒 + 余白{buffer_seconds}秒 = {audio_duration + buffer_seconds:.2f}秒")
+            update_cat_data_duration(scene_id, audio_duration, padding=buffer_seconds)
             print("\n[OK] 音声再生成とduration更新が完了しました！")
         else:
             print("\n[NG] 音声ファイルの長さを取得できませんでした。")
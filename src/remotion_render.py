@@ -0,0 +1,115 @@
+"""
+Remotion でのレンダリング
+video/scripts/render.mjs（Remotion の Node API）を起動し、1行1JSONで届く進捗
+（バンドル → フレーム描画 → エンコード のフェーズ、描画fps、残り時間）を読み取ります。
+ログの正規表現解析は行わないので、ログ中の日付やパスの数字で進捗が飛ぶことはありません。
+
+render_composition はコマンドラインツール用に完了まで待つだけの簡易版、
+ジョブの状態を更新したい場合は render_with_progress に関数を渡します。
+複数本を続けて書き出す場合（app_server.py・batch_runner.py）は、Chromium を起動したままにする
+常駐ワーカー（render_pool.py）を使います。
+バンドルは render.mjs が work/remotion-bundle/ にキャッシュし、video/src が
+変わらない限り再利用します。
+"""
+
+import os
+import json
+import subprocess
+from render_profiles import profile_args, profile_options
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+VIDEO_DIR = os.path.join(BASE_DIR, "video")
+RENDER_SCRIPT = os.path.join("scripts", "render.mjs")
+
+def log(msg):
+    print(msg, flush=True)
+
+def render_with_progress(composition, output_path, props_path=None, extra_args=(), on_event=None):
+    """
+    レンダリングを実行し、進捗イベント（dict）ごとに on_event を呼びます。
+    イベントの形式は video/scripts/render.mjs の先頭を参照。失敗時は RuntimeError を送出します。
+    """
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    cmd = ["node", RENDER_SCRIPT, f"--composition={composition}", f"--output={output_path}"]
+    if props_path:
+        cmd.append(f"--props={props_path}")
+    cmd.extend(extra_args)
+    log(f"[Render] Starting: {' '.join(cmd)}")
+
+    process = subprocess.Popen(
+        cmd,
+        cwd=VIDEO_DIR,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        text=True,
+        encoding="utf-8",
+        errors="replace",
+    )
+    error = None
+    for line in iter(process.stdout.readline, ""):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            event = json.loads(line)
+        except ValueError:
+            # Remotion 自身の警告などはそのままログに流す
+            log(f"[Render] {line}")
+            continue
+        if event.get("type") == "error":
+            error = event.get("message")
+        if on_event:
+            on_event(event)
+    process.wait()
+
+    if process.returncode != 0 or not os.path.exists(output_path):
+        raise RuntimeError(error or f"Render failed with exit code {process.returncode}")
+    return output_path
+
+def prebuild_bundle():
+    """
+    webpack のバンドルを作っておきます（ソースが変わっていなければ何もしません）。
+    サーバー起動時に呼んでおくと、最初のエクスポートからバンドル待ちがなくなります。
+    """
+    result = subprocess.run(
+        ["node", RENDER_SCRIPT, "--bundle-only"],
+        cwd=VIDEO_DIR, capture_output=True, text=True, encoding="utf-8", errors="replace",
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stdout.strip().splitlines()[-1] if result.stdout.strip() else result.stderr)
+
+def _args_to_options(args):
+    """--key=value 形式の引数を常駐ワーカーに渡すオプションの dict に変換します。"""
+    options = {}
+    for arg in args:
+        key, _, value = arg.lstrip("-").partition("=")
+        options[key] = value or True
+    return options
+
+def render_composition(composition, output_path, props_path=None, extra_args=(), profile=None, pool=None):
+    """
+    コンポジションを mp4 に書き出します。失敗時は RuntimeError を送出します。
+    profile（draft / proxy / final）を指定すると解像度・並列数などを切り替えます。
+    pool（render_pool.RenderPool）を渡すと、1回ごとに Node を起動せず常駐ワーカーで書き出します。
+    """
+    last_step = [-1]
+
+    def report(event):
+        if event["type"] == "phase":
+            log(f"[Render] {event['phase']}...")
+        elif event["type"] == "progress" and event.get("totalFrames"):
+            # 10%刻みで表示する
+            step = int(event["progress"] * 10)
+            if step > last_step[0]:
+                last_step[0] = step
+                log(f"[Render] {event['progress']:.0%} ({event['renderedFrames']}/{event['totalFrames']}フレーム, "
+                    f"{event['fps']}fps, 残り約{event['eta'] if event['eta'] is not None else '?'}秒)")
+
+    if pool is not None:
+        options = profile_options(profile) if profile else {}
+        options.update(_args_to_options(extra_args))
+        return pool.submit(composition, output_path, props_path, options, report).wait()
+
+    args = list(profile_args(profile)) if profile else []
+    args.extend(extra_args)
+    return render_with_progress(composition, output_path, props_path, args, report)
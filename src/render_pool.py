@@ -0,0 +1,306 @@
+"""
+常駐レンダリングワーカーのプール
+video/scripts/render_worker.mjs を起動したままにしておき、標準入出力の1行1JSONでジョブを渡します。
+Node の起動・モジュール読み込み・Chromium の起動はワーカー1つにつき1回で済み、
+2本目以降のレンダリングはすぐに描画から始まります。
+
+    pool = RenderPool(size=1)
+    job = pool.submit("EditorExport", output_path, props_path, options, on_event)
+    job.wait()      # 完了まで待つ（失敗時は RuntimeError、キャンセル時は RenderCancelled）
+    job.cancel()    # 別スレッドから中断できる
+
+- ジョブはワーカーごとに1本ずつ順番に処理します（size がそのまま同時レンダリング数）
+- timeout 秒を超えたジョブはキャンセルし、応答がなければワーカーごと強制終了します
+- Chromium のメモリが膨らみ続けないよう、max_jobs 本処理したワーカーは作り直します
+"""
+
+import os
+import json
+import queue
+import threading
+import subprocess
+import time
+import uuid
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+VIDEO_DIR = os.path.join(BASE_DIR, "video")
+WORKER_SCRIPT = os.path.join("scripts", "render_worker.mjs")
+
+# ワーカーの起動（Chromium の起動を含む）を待つ秒数
+STARTUP_TIMEOUT = 120
+# キャンセルを送ってから強制終了するまでの猶予（秒）
+CANCEL_GRACE = 15
+DEFAULT_TIMEOUT = 3600
+DEFAULT_MAX_JOBS = 20
+
+def log(msg):
+    print(msg, flush=True)
+
+class RenderCancelled(RuntimeError):
+    """ジョブがキャンセルされた（またはタイムアウトした）"""
+
+class RenderJob:
+    """投入したレンダリング1本分。wait() で結果を受け取り、cancel() で中断します。"""
+
+    def __init__(self, composition, output_path, props, options, on_event, timeout):
+        self.id = uuid.uuid4().hex[:12]
+        self.composition = composition
+        self.output_path = output_path
+        self.props = props
+        self.options = options or {}
+        self.on_event = on_event
+        self.timeout = timeout
+        self.error = None
+        self.cancel_requested = False
+        self.timed_out = False
+        self._done = threading.Event()
+
+    def message(self):
+        return {
+            "type": "render",
+            "id": self.id,
+            "composition": self.composition,
+            "output": self.output_path,
+            "props": self.props,
+            "options": self.options,
+        }
+
+    def done(self):
+        return self._done.is_set()
+
+    def cancel(self):
+        """中断を要求します。実行前なら実行されず、実行中ならワーカーに中断を送ります。"""
+        self.cancel_requested = True
+
+    def wait(self, timeout=None):
+        if not self._done.wait(timeout):
+            raise TimeoutError(f"Render job {self.id} is still running")
+        if self.error:
+            raise self.error
+        return self.output_path
+
+    def _event(self, event):
+        if self.on_event:
+            try:
+                self.on_event(event)
+            except Exception as e:
+                log(f"[RenderPool] on_event failed: {e}")
+
+    def _finish(self, error=None):
+        if self._done.is_set():
+            return
+        if isinstance(error, RenderCancelled) and self.timed_out:
+            error = RenderCancelled(f"Render timed out after {self.timeout}s")
+        self.error = error
+        self._done.set()
+
+class RenderWorker:
+    """render_worker.mjs のプロセス1つ。標準出力は専用スレッドで読み、実行中のジョブに渡します。"""
+
+    def __init__(self):
+        self.jobs_done = 0
+        self.job = None
+        self._ready = threading.Event()
+        os.makedirs(os.path.join(VIDEO_DIR, "out"), exist_ok=True)
+        self.process = subprocess.Popen(
+            ["node", WORKER_SCRIPT],
+            cwd=VIDEO_DIR,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            text=True,
+            encoding="utf-8",
+            errors="replace",
+        )
+        self._reader = threading.Thread(target=self._read, daemon=True)
+        self._reader.start()
+        if not self._ready.wait(STARTUP_TIMEOUT) or not self.alive():
+            self.kill()
+            raise RuntimeError("Render worker failed to start")
+        log(f"[RenderPool] Worker started (pid {self.process.pid})")
+
+    def alive(self):
+        return self.process.poll() is None
+
+    def send(self, message):
+        try:
+            self.process.stdin.write(json.dumps(message, ensure_ascii=False) + "\n")
+            self.process.stdin.flush()
+        except (OSError, ValueError):
+            # すでに終了している。結果は読み取りスレッド側で失敗として扱う
+            pass
+
+    def _read(self):
+        for line in iter(self.process.stdout.readline, ""):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                event = json.loads(line)
+            except ValueError:
+                # Remotion や Chromium 自身の警告などはそのままログに流す
+                log(f"[Render] {line}")
+                continue
+            if event.get("type") == "ready":
+                self._ready.set()
+                continue
+            job = self.job
+            if job is None or event.get("id") != job.id:
+                continue
+            job._event(event)
+            kind = event.get("type")
+            if kind == "done":
+                if os.path.exists(job.output_path):
+                    job._finish()
+                else:
+                    job._finish(RuntimeError(f"Render finished but output is missing: {job.output_path}"))
+            elif kind == "cancelled":
+                job._finish(RenderCancelled("Render cancelled"))
+            elif kind == "error":
+                job._finish(RuntimeError(event.get("message") or "Render failed"))
+        # プロセスが終了した。起動待ちと実行中のジョブを解放する
+        self.process.wait()
+        self._ready.set()
+        if self.job:
+            self.job._finish(RuntimeError(f"Render worker exited with code {self.process.returncode}"))
+
+    def run(self, job):
+        """ジョブを実行し、終わるまで待ちます。タイムアウト・キャンセルもここで処理します。"""
+        self.job = job
+        self.send(job.message())
+        deadline = time.monotonic() + job.timeout if job.timeout else None
+        cancel_sent_at = None
+        while not job._done.wait(0.5):
+            if deadline and not job.timed_out and time.monotonic() > deadline:
+                job.timed_out = True
+                job.cancel()
+            if job.cancel_requested and cancel_sent_at is None:
+                self.send({"type": "cancel", "id": job.id})
+                cancel_sent_at = time.monotonic()
+            if cancel_sent_at and time.monotonic() - cancel_sent_at > CANCEL_GRACE:
+                # キャンセルに応答しない。ワーカーごと止める
+                log(f"[RenderPool] Worker {self.process.pid} did not stop, killing")
+                self.kill()
+                job._finish(RenderCancelled("Render cancelled"))
+                break
+        self.job = None
+        self.jobs_done += 1
+
+    def stop(self, timeout=10):
+        if self.alive():
+            self.send({"type": "shutdown"})
+            try:
+                self.process.wait(timeout)
+            except subprocess.TimeoutExpired:
+                self.kill()
+
+    def kill(self):
+        if self.alive():
+            self.process.kill()
+            self.process.wait()
+
+class RenderPool:
+    """
+    常駐ワーカーのプール。submit したジョブは空いたワーカーから順に処理されます。
+    ワーカーは最初のジョブ（または warm()）で起動し、落ちていれば次のジョブで作り直します。
+    """
+
+    def __init__(self, size=1, max_jobs=DEFAULT_MAX_JOBS, timeout=DEFAULT_TIMEOUT):
+        self.size = max(1, size)
+        self.max_jobs = max_jobs
+        self.timeout = timeout
+        self._queue = queue.Queue()
+        self._workers = [None] * self.size
+        self._slot_locks = [threading.Lock() for _ in range(self.size)]
+        self._lock = threading.Lock()
+        self._threads = []
+        self._closed = False
+
+    def _start(self):
+        with self._lock:
+            if self._threads:
+                return
+            for slot in range(self.size):
+                thread = threading.Thread(target=self._dispatch, args=(slot,), daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def _worker(self, slot):
+        with self._slot_locks[slot]:
+            return self._ensure_worker(slot)
+
+    def _ensure_worker(self, slot):
+        worker = self._workers[slot]
+        if worker and (not worker.alive() or worker.jobs_done >= self.max_jobs):
+            if worker.alive():
+                log(f"[RenderPool] Recycling worker {worker.process.pid} after {worker.jobs_done} jobs")
+            worker.stop()
+            worker = None
+        if worker is None:
+            worker = RenderWorker()
+            self._workers[slot] = worker
+        return worker
+
+    def _dispatch(self, slot):
+        while True:
+            job = self._queue.get()
+            if job is None:
+                break
+            if job.cancel_requested:
+                job._finish(RenderCancelled("Render cancelled"))
+                continue
+            try:
+                worker = self._worker(slot)
+            except Exception as e:
+                job._finish(RuntimeError(f"Render worker unavailable: {e}"))
+                continue
+            worker.run(job)
+        worker = self._workers[slot]
+        if worker:
+            worker.stop()
+
+    def warm(self):
+        """ワーカーを先に起動しておきます（Chromium の起動待ちを最初のジョブから外す）。"""
+        self._start()
+        for slot in range(self.size):
+            self._worker(slot)
+
+    def submit(self, composition, output_path, props=None, options=None, on_event=None, timeout=None):
+        """
+        ジョブを投入して RenderJob を返します。
+        props は JSON ファイルのパスか dict、options は remotion render と同じ名前のオプション
+        （render_profiles.profile_options の戻り値）。イベントの形式は render.mjs の先頭を参照。
+        """
+        if self._closed:
+            raise RuntimeError("RenderPool is closed")
+        os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+        job = RenderJob(composition, os.path.abspath(output_path), props, options, on_event,
+                        timeout if timeout is not None else self.timeout)
+        self._start()
+        self._queue.put(job)
+        return job
+
+    def close(self):
+        """待機中のジョブを処理し終えてからワーカーを止めます。"""
+        self._closed = True
+        for _ in self._threads:
+            self._queue.put(None)
+        for thread in self._threads:
+            thread.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+_pool = None
+_pool_lock = threading.Lock()
+
+def get_pool():
+    """プロセス内で共有するプール（app_server.py 用）を返します。"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = RenderPool()
+        return _pool
@@ -0,0 +1,56 @@
+"""
+レンダリングの品質プロファイル
+draft（確認用・約半分の解像度）/ proxy（3/4）/ final（本番）で解像度・fps・並列数・コーデック・
+フレーム画像の形式をまとめて切り替えます。解像度は --scale で縮小するので、
+コンポジション側のレイアウトはそのままです（倍率は縦横とも偶数ピクセルになる値にする）。
+fps は --fps としてレンダリングスクリプトに渡し、props.fps 経由でコンポジション
+（VisionForgeLong / EditorExport の calculateMetadata）のフレームレートになります。
+"""
+
+import os
+
+RENDER_PROFILES = {
+    # 原稿・タイミング確認用。1080x1920 → 540x960、15fps
+    "draft": {"scale": 0.5, "fps": 15, "codec": "h264", "crf": 30,
+              "image_format": "jpeg", "jpeg_quality": 60, "concurrency_ratio": 1.0},
+    # 見た目の確認用。1080x1920 → 810x1440、24fps
+    "proxy": {"scale": 0.75, "fps": 24, "codec": "h264", "crf": 25,
+              "image_format": "jpeg", "jpeg_quality": 80, "concurrency_ratio": 1.0},
+    # 本番。等倍、30fps
+    "final": {"scale": 1.0, "fps": 30, "codec": "h264", "crf": 18,
+              "image_format": "jpeg", "jpeg_quality": 95, "concurrency_ratio": 0.75},
+}
+DEFAULT_PROFILE = "final"
+
+def default_concurrency(ratio=1.0):
+    """CPUコア数から並列レンダリング数を決めます（OSや他の処理用に1コア残す）。"""
+    cores = os.cpu_count() or 2
+    return max(1, int((cores - 1) * ratio))
+
+def get_profile(name=None):
+    name = name or DEFAULT_PROFILE
+    if name not in RENDER_PROFILES:
+        raise ValueError(f"不明なレンダリングプロファイルです: {name}（{', '.join(RENDER_PROFILES)}）")
+    return RENDER_PROFILES[name]
+
+def profile_options(name=None, concurrency=None):
+    """
+    プロファイルに対応するレンダリングオプションを remotion render と同じ名前の dict で返します。
+    常駐ワーカー（render_pool.py）にはこの dict をそのまま渡します。
+    """
+    profile = get_profile(name)
+    options = {
+        "scale": profile["scale"],
+        "fps": profile["fps"],
+        "codec": profile["codec"],
+        "crf": profile["crf"],
+        "image-format": profile["image_format"],
+        "concurrency": concurrency or default_concurrency(profile["concurrency_ratio"]),
+    }
+    if profile["image_format"] == "jpeg":
+        options["jpeg-quality"] = profile["jpeg_quality"]
+    return options
+
+def profile_args(name=None, concurrency=None):
+    """プロファイルに対応する remotion render の追加引数を返します。"""
+    return [f"--{key}={value}" for key, value in profile_options(name, concurrency).items()]
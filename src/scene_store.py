@@ -0,0 +1,317 @@
+"""
+シーンJSON（cat_data.json / news_data.json など）の読み書き
+app_server や各生成スクリプトが同じファイルを同時に書き換えても壊れないように、
+全ての書き込みをここに集めます。
+
+- 書き込みは一時ファイルに書いてから置き換える（途中で落ちても元のファイルが残る）
+- プロセス間のファイルロックで、読み込み→変更→書き込みの間に他の書き込みを割り込ませない
+- 書き込むたびにリビジョン番号が1つ増える（revision() で変更の有無を安く確認できる）
+- 変更前との差分（変わったシーンだけ）を保存しておき、undo() で1つずつ戻せる
+
+履歴とロックファイルは work/scene_history/ に置きます（video/public には置かない）。
+
+    python src/scene_store.py video/public/cat_data.json          # リビジョンを表示
+    python src/scene_store.py video/public/cat_data.json undo     # 直前の書き込みを取り消す
+"""
+
+import os
+import sys
+import tempfile
+import threading
+import json_io
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HISTORY_ROOT = os.path.join(BASE_DIR, "work", "scene_history")
+# 取り消せる書き込みの数
+MAX_HISTORY = 50
+
+def log(msg):
+    print(msg, flush=True)
+
+class RevisionConflict(Exception):
+    """expected_revision を指定した書き込みで、他の書き込みが先に行われていた場合"""
+
+class FileLock:
+    """プロセス間の排他ロック。同じプロセス内では入れ子で取得できます。"""
+    def __init__(self, path):
+        self.path = path
+        self._thread_lock = threading.RLock()
+        self._depth = 0
+        self._handle = None
+
+    def __enter__(self):
+        self._thread_lock.acquire()
+        if self._depth == 0:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            self._handle = open(self.path, "a+b")
+            if os.name == "nt":
+                import msvcrt
+                self._handle.seek(0)
+                while True:
+                    try:
+                        msvcrt.locking(self._handle.fileno(), msvcrt.LK_LOCK, 1)
+                        break
+                    except OSError:
+                        # LK_LOCK は約10秒で諦めるので、取れるまで待ち続ける
+                        continue
+            else:
+                import fcntl
+                fcntl.flock(self._handle.fileno(), fcntl.LOCK_EX)
+        self._depth += 1
+        return self
+
+    def __exit__(self, *exc):
+        self._depth -= 1
+        if self._depth == 0:
+            if os.name == "nt":
+                import msvcrt
+                self._handle.seek(0)
+                msvcrt.locking(self._handle.fileno(), msvcrt.LK_UNLCK, 1)
+            else:
+                import fcntl
+                fcntl.flock(self._handle.fileno(), fcntl.LOCK_UN)
+            self._handle.close()
+            self._handle = None
+        self._thread_lock.release()
+
+def atomic_write_json(path, data, indent=2):
+    """一時ファイルに書き出してから置き換えます。"""
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(prefix=".tmp_", suffix=".json", dir=directory)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            # indent=None は機械向けの compact、それ以外は人が読む用の整形出力
+            f.write(json_io.dumps(data, pretty=indent is not None))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+def _history_key(path):
+    rel = os.path.relpath(os.path.abspath(path), BASE_DIR)
+    return rel.replace(os.sep, "__").replace("/", "__").replace(":", "")
+
+def _scene_ids(scenes):
+    """全シーンに重複のない id があれば id のリストを、なければ None を返します。"""
+    ids = [s.get("id") for s in scenes if isinstance(s, dict)]
+    if len(ids) != len(scenes) or None in ids or len(set(ids)) != len(ids):
+        return None
+    return ids
+
+def _reverse_delta(old, new):
+    """new から old に戻すための差分を作ります。"""
+    old_ids, new_ids = _scene_ids(old), _scene_ids(new)
+    if old_ids is None or new_ids is None:
+        return {"full": old}
+    new_by_id = dict(zip(new_ids, new))
+    changed = {str(i): s for i, s in zip(old_ids, old) if new_by_id.get(i) != s}
+    return {"order": old_ids, "scenes": changed}
+
+def scene_delta(old, new):
+    """
+    old → new の変化を、変わったシーンだけの差分として返します（変更通知用）。
+    {"order": 新しいIDの並び, "changed": [追加・変更されたシーン], "removed": [削除されたID]}
+    ID で対応が取れない場合は {"scenes": new} を返します。
+    """
+    old_ids, new_ids = _scene_ids(old), _scene_ids(new)
+    if old_ids is None or new_ids is None:
+        return {"scenes": new}
+    old_by_id = dict(zip(old_ids, old))
+    new_set = set(new_ids)
+    return {
+        "order": new_ids,
+        "changed": [s for i, s in zip(new_ids, new) if old_by_id.get(i) != s],
+        "removed": [i for i in old_ids if i not in new_set],
+    }
+
+def _apply_delta(current, delta):
+    if "full" in delta:
+        return delta["full"]
+    by_id = {str(s["id"]): s for s in current}
+    by_id.update(delta["scenes"])
+    return [by_id[str(i)] for i in delta["order"]]
+
+class SceneStore:
+    def __init__(self, path):
+        self.path = os.path.abspath(path)
+        self.history_dir = os.path.join(HISTORY_ROOT, _history_key(self.path))
+        self.meta_path = os.path.join(self.history_dir, "meta.json")
+        self.lock = FileLock(os.path.join(self.history_dir, "lock"))
+
+    def _stamp(self):
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return [stat.st_mtime_ns, stat.st_size]
+
+    def _read_meta(self):
+        try:
+            return json_io.load_file(self.meta_path)
+        except (FileNotFoundError, ValueError):
+            return {"revision": 0, "stamp": None, "undo": []}
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return []
+        return json_io.load_file(self.path)
+
+    def revision(self):
+        """
+        現在のリビジョン番号を返します（ファイルの stat とメタ情報を見るだけ）。
+        ストアを通さずに書き換えられていた場合は、その変更も1リビジョンとして数えます。
+        """
+        meta = self._read_meta()
+        if meta["stamp"] == self._stamp():
+            return meta["revision"]
+        with self.lock:
+            meta = self._read_meta()
+            stamp = self._stamp()
+            if meta["stamp"] != stamp:
+                meta["revision"] += 1
+                meta["stamp"] = stamp
+                atomic_write_json(self.meta_path, meta, indent=None)
+            return meta["revision"]
+
+    def etag(self, revision=None):
+        """
+        HTTP の ETag に使える文字列（リビジョンとファイルの更新時刻から作る）。
+        読み込んだ内容に対応する ETag が必要な場合は、read() が返したリビジョンを渡します。
+        """
+        if revision is None:
+            revision = self.revision()
+        stamp = self._stamp() or [0, 0]
+        return f'"{revision}-{stamp[0]:x}"'
+
+    def read(self):
+        """(シーンのリスト, リビジョン) を返します。"""
+        with self.lock:
+            return self._load(), self.revision()
+
+    def write(self, scenes, expected_revision=None, indent=2):
+        """
+        シーンを書き込み、新しいリビジョンを返します。
+        expected_revision を指定した場合、読み込み後に他の書き込みがあれば RevisionConflict を送出します。
+        """
+        with self.lock:
+            revision = self.revision()
+            if expected_revision is not None and expected_revision != revision:
+                raise RevisionConflict(
+                    f"{os.path.basename(self.path)} は他の処理で更新されています "
+                    f"(期待: r{expected_revision}, 現在: r{revision})")
+            return self._commit(self._load(), scenes, indent, record=True)
+
+    def update(self, func, indent=2):
+        """
+        ロックを保持したまま読み込み→func(scenes)→書き込みを行います。
+        func はリストをその場で変更するか、新しいリストを返します。戻り値は新しいリビジョン。
+        内容が変わらなかった場合は書き込まず、現在のリビジョンを返します。
+        """
+        with self.lock:
+            revision = self.revision()
+            old = self._load()
+            scenes = json_io.loads(json_io.dumps(old))
+            result = func(scenes)
+            scenes = scenes if result is None else result
+            if scenes == old:
+                return revision
+            return self._commit(old, scenes, indent, record=True)
+
+    def undo(self, indent=2):
+        """直前の書き込みを取り消します（取り消し自体も新しいリビジョンになります）。"""
+        with self.lock:
+            self.revision()
+            meta = self._read_meta()
+            if not meta["undo"]:
+                raise IndexError("取り消せる履歴がありません")
+            delta_path = os.path.join(self.history_dir, f"{meta['undo'][-1]}.json")
+            delta = json_io.load_file(delta_path)
+            current = self._load()
+            return self._commit(current, _apply_delta(current, delta), indent, record=False)
+
+    def rewrite(self, func, indent=2):
+        """
+        現在の内容と、取り消し用の全差分の両方に func を適用します（アセットのパスの付け替えなど）。
+        func は JSON の値を受け取って新しい値を返します。取り消しの対象にはなりませんが、
+        内容が変われば新しいリビジョンとして通知されます。戻り値は現在のリビジョン。
+        """
+        with self.lock:
+            revision = self.revision()
+            meta = self._read_meta()
+            for rev in meta["undo"]:
+                delta_path = os.path.join(self.history_dir, f"{rev}.json")
+                try:
+                    delta = json_io.load_file(delta_path)
+                except FileNotFoundError:
+                    continue
+                new_delta = func(delta)
+                if new_delta != delta:
+                    atomic_write_json(delta_path, new_delta, indent=None)
+            old = self._load()
+            scenes = func(old)
+            if scenes == old:
+                return revision
+            atomic_write_json(self.path, scenes, indent=indent)
+            meta["revision"] = revision + 1
+            meta["stamp"] = self._stamp()
+            atomic_write_json(self.meta_path, meta, indent=None)
+            return meta["revision"]
+
+    def _commit(self, old, scenes, indent, record):
+        meta = self._read_meta()
+        revision = meta["revision"] + 1
+        if record:
+            atomic_write_json(os.path.join(self.history_dir, f"{revision}.json"),
+                              _reverse_delta(old, scenes), indent=None)
+            meta["undo"].append(revision)
+            for expired in meta["undo"][:-MAX_HISTORY]:
+                try:
+                    os.remove(os.path.join(self.history_dir, f"{expired}.json"))
+                except FileNotFoundError:
+                    pass
+            meta["undo"] = meta["undo"][-MAX_HISTORY:]
+        else:
+            undone = meta["undo"].pop()
+            try:
+                os.remove(os.path.join(self.history_dir, f"{undone}.json"))
+            except FileNotFoundError:
+                pass
+        atomic_write_json(self.path, scenes, indent=indent)
+        meta["revision"] = revision
+        meta["stamp"] = self._stamp()
+        atomic_write_json(self.meta_path, meta, indent=None)
+        return revision
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+def get_store(path):
+    """パスごとに1つの SceneStore を返します（同じプロセス内でロックを共有するため）。"""
+    key = os.path.abspath(path)
+    with _stores_lock:
+        if key not in _stores:
+            _stores[key] = SceneStore(key)
+        return _stores[key]
+
+def load_scenes(path):
+    return get_store(path).read()[0]
+
+def save_scenes(path, scenes, indent=2):
+    return get_store(path).write(scenes, indent=indent)
+
+def update_scenes(path, func, indent=2):
+    return get_store(path).update(func, indent=indent)
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("使い方: python src/scene_store.py <シーンJSON> [undo]")
+        sys.exit(1)
+    store = get_store(sys.argv[1])
+    if len(sys.argv) > 2 and sys.argv[2] == "undo":
+        log(f"[OK] 取り消しました: r{store.undo()}")
+    else:
+        log(f"r{store.revision()} (取り消し可能: {len(store._read_meta()['undo'])}件)")
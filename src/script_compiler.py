@@ -0,0 +1,275 @@
+"""
+台本コンパイラ
+YAML/JSON形式の台本を読み込み、共通のステージ（読み修正・アクション推論・
+カットイン挿入・並列音声合成・尺計算・音量計算）を順に通して cat_data.json を出力します。
+
+    python src/script_compiler.py src/scripts/isekai.yaml [出力先JSON]
+
+台本フォーマット:
+    name: isekai                 # 音声ファイル名の接頭辞 (audio/isekai_0.wav ...)
+    output: cat_data.json        # video/public からの相対パス
+    speed_scale: 1.2
+    padding: 0.0                 # セリフ末尾の余白（秒）
+    skip_existing_audio: false   # 既存の音声ファイルを再利用するか
+    cut_in: false                # タイトルが変わる箇所に無音のカットインを挟むか
+    cut_in_duration: 1.2
+    default_image: images/bg_thread.jpg
+    image_queries:               # 事前にPexelsから取得する画像（既存ならスキップ）
+      - [modern apartment interior, images/bg_ending_property.jpg]
+    dictionaries: [news]         # src/dictionaries/ の置換辞書（後のものが優先）
+    speaker_dictionaries: {zundamon: [zundamon]}   # 話者ごとの追加辞書
+    readings: {"!!": "！"}      # 台本固有の置換（辞書より優先）
+    固有名詞の読みは dictionaries/voicevox_user_dict.tsv に追加すればエンジン側で反映されます。
+    emphasis_words: [...]        # テロップで強調する語
+    direction: {section: main}   # 全シーン共通の演出（各シーンの direction で上書き）
+    camera: {preset: center}     # 全シーン共通のカメラ（各シーンの camera で上書き）
+    scenes:
+      - {speaker: kanon, emotion: happy, action: nod, image: ..., title: ..., bgm: ..., text: ...}
+    action / emotion を省略したシーンはセリフから推論します（dictionaries/inference_rules.json）。
+    シーンには次の項目も書けます。それ以外の項目（type, comment_text など）はそのまま出力します。
+      direction: {isTopicChange: true}   # 演出の上書き
+      camera: {preset: zoom_in}          # カメラの上書き
+      audio: ending_0                    # 音声ファイル名（省略時は <name>_<連番>）
+      cut_in: false                      # タイトルが変わってもカットインを挟まない
+"""
+
+import os
+import sys
+import json
+from dotenv import load_dotenv
+from action_inference import infer_action, infer_emotion
+from keyword_matcher import KeywordMatcher
+from audio_mastering import master_scenes
+from pexels_client import PexelsClient
+from reading_dict import load_reading_dict
+from scene_store import save_scenes
+from timeline import get_audio_duration
+from voicevox_client import VoicevoxClient, SPEAKER_IDS
+
+load_dotenv()
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PUBLIC_DIR = os.path.join(BASE_DIR, "video", "public")
+SCRIPTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "scripts")
+
+def log(msg):
+    print(msg, flush=True)
+
+def load_script(path):
+    """台本ファイル（.yaml / .yml / .json）を読み込みます。"""
+    with open(path, "r", encoding="utf-8") as f:
+        if path.endswith((".yaml", ".yml")):
+            try:
+                import yaml
+            except ImportError:
+                raise RuntimeError("YAML台本の読み込みには PyYAML が必要です (pip install pyyaml)")
+            return yaml.safe_load(f)
+        return json.load(f)
+
+# ============================================================
+# ステージ定義（ctx を受け取り、ctx["scenes"] を更新する）
+# ============================================================
+
+# stage_build_scenes が解釈する項目（これ以外はそのままシーンに引き継ぐ）
+LINE_KEYS = {"speaker", "emotion", "action", "text", "title", "image", "bgm",
+             "direction", "camera", "audio", "cut_in"}
+
+def stage_build_scenes(ctx):
+    """台本の各行をシーン辞書に変換します。"""
+    script = ctx["script"]
+    default_image = script.get("default_image", "images/bg_thread.jpg")
+    scenes = []
+    for line in script["scenes"]:
+        image = line.get("image") or default_image
+        emotion = line.get("emotion") or infer_emotion(line["text"])
+        scene = {
+            "speaker": line.get("speaker", "kanon"),
+            "emotion": emotion,
+            "action": line.get("action"),
+            "text": line["text"],
+            "title": line.get("title"),
+            "audio": "",
+            "bg_image": image,
+            "image": image,
+            "direction": {
+                "mood": "happy" if emotion == "happy" else "normal",
+                "importance": "normal",
+                "isTopicChange": False,
+                **(script.get("direction") or {}),
+                **(line.get("direction") or {}),
+            },
+            "telop": {"emphasisWords": []},
+        }
+        camera = line.get("camera") or script.get("camera")
+        if camera:
+            scene["camera"] = camera
+        if line.get("bgm"):
+            scene["bgm"] = line["bgm"]
+        scene.update((k, v) for k, v in line.items() if k not in LINE_KEYS)
+        # 後のステージだけが使う値（出力前に取り除く）
+        scene["_audio_name"] = line.get("audio")
+        scene["_cut_in"] = line.get("cut_in", True)
+        scenes.append(scene)
+    ctx["scenes"] = scenes
+
+def stage_sync_dictionary(ctx):
+    """発音辞書をVOICEVOXのユーザー辞書に反映します（テキスト側の書き換えは不要）。"""
+    ctx["client"].sync_user_dict()
+
+def stage_fetch_images(ctx):
+    """image_queries に指定された画像を取得します。"""
+    for query, img_rel in ctx["script"].get("image_queries") or []:
+        ctx["image_client"].download(query, os.path.join(ctx["public_dir"], img_rel))
+
+def stage_fix_readings(ctx):
+    """読み上げ用テキストを作ります（表示テキストは変更しない）。"""
+    script = ctx["script"]
+    dictionaries = script.get("dictionaries") or []
+    readings = script.get("readings") or {}
+    # 優先順位: 共通辞書 < 話者別辞書 < 台本の readings
+    base = load_reading_dict(*dictionaries).merged(readings)
+    speaker_dicts = {}
+    for speaker, names in (script.get("speaker_dictionaries") or {}).items():
+        speaker_dicts[speaker] = load_reading_dict(*dictionaries, *names).merged(readings)
+    speech_filter = ctx.get("speech_filter")
+    for scene in ctx["scenes"]:
+        speech = speaker_dicts.get(scene["speaker"], base).apply(scene["text"])
+        scene["_speech"] = speech_filter(speech) if speech_filter else speech
+
+def stage_infer_actions(ctx):
+    """アクション未指定のシーンをセリフから推論し、強調ワードを抽出します。"""
+    emphasis = KeywordMatcher(ctx["script"].get("emphasis_words") or [])
+    for scene in ctx["scenes"]:
+        if not scene["action"]:
+            scene["action"] = infer_action(scene["text"])
+        scene["telop"]["emphasisWords"] = emphasis.keywords_in(scene["text"])
+
+def stage_insert_cut_ins(ctx):
+    """タイトルが切り替わる箇所に、音声なしのカットインシーンを挿入します。"""
+    script = ctx["script"]
+    enabled = script.get("cut_in")
+    result = []
+    last_title = None
+    for scene in ctx["scenes"]:
+        if scene.pop("_cut_in") and enabled and scene["title"] != last_title:
+            direction = {"mood": "normal", "importance": "climax", "isTopicChange": True}
+            if "section" in scene["direction"]:
+                direction["section"] = scene["direction"]["section"]
+            result.append({
+                "speaker": "system",
+                "emotion": "normal",
+                "action": "none",
+                "text": "",
+                "title": scene["title"],
+                "audio": "",
+                "bg_image": scene["bg_image"],
+                "image": scene["image"],
+                "duration": script.get("cut_in_duration", 1.2),
+                "direction": direction,
+                "telop": {"emphasisWords": []},
+                "camera": {"preset": "zoom_in"},
+            })
+        last_title = scene["title"]
+        result.append(scene)
+    ctx["scenes"] = result
+
+def stage_synthesize(ctx):
+    """セリフのあるシーンをまとめて並列に音声合成します。"""
+    script = ctx["script"]
+    name = script.get("name", "scene")
+    skip_existing = script.get("skip_existing_audio", False)
+    audio_dir = "/".join(filter(None, [ctx["asset_dir"], "audio"]))
+    os.makedirs(os.path.join(ctx["public_dir"], audio_dir), exist_ok=True)
+
+    jobs = []
+    voiced = []
+    for scene in ctx["scenes"]:
+        audio_name = scene.pop("_audio_name", None)
+        if "_speech" not in scene:
+            continue
+        audio_rel = f"{audio_dir}/{audio_name or f'{name}_{len(voiced)}'}.wav"
+        audio_full = os.path.join(ctx["public_dir"], audio_rel)
+        scene["audio"] = audio_rel
+        voiced.append(scene)
+        if skip_existing and os.path.exists(audio_full):
+            continue
+        jobs.append((scene, {
+            "text": scene["_speech"],
+            "output_path": audio_full,
+            "speaker_id": SPEAKER_IDS.get(scene["speaker"], 10),
+            "speed_scale": script.get("speed_scale", 1.0),
+        }))
+
+    log(f"🎤 音声生成中... ({len(jobs)}/{len(voiced)} セリフ)")
+    results = ctx["client"].synthesize_many([job for _, job in jobs])
+    failed = {id(scene) for (scene, _), ok in zip(jobs, results) if not ok}
+    for scene in voiced:
+        if id(scene) in failed:
+            log(f"  ✗ 音声生成失敗: {scene['text'][:20]}...")
+    ctx["scenes"] = [s for s in ctx["scenes"] if id(s) not in failed]
+
+def stage_durations(ctx):
+    """音声ファイルから尺を計算し、IDを振り直します。"""
+    padding = ctx["script"].get("padding", 0.0)
+    for i, scene in enumerate(ctx["scenes"]):
+        scene["id"] = i + 1
+        if scene.pop("_speech", None) is not None:
+            scene["duration"] = get_audio_duration(os.path.join(ctx["public_dir"], scene["audio"]))
+            scene["padding"] = padding
+
+def stage_master(ctx):
+    """ラウドネス正規化とBGMダッキング値を計算します。"""
+    master_scenes(ctx["scenes"], ctx["public_dir"])
+
+PIPELINE = [
+    stage_sync_dictionary,
+    stage_fetch_images,
+    stage_build_scenes,
+    stage_fix_readings,
+    stage_infer_actions,
+    stage_insert_cut_ins,
+    stage_synthesize,
+    stage_durations,
+    stage_master,
+]
+
+def compile_scenes(script, public_dir=PUBLIC_DIR, client=None, image_client=None, asset_dir="",
+                   speech_filter=None):
+    """
+    台本（読み込み済みの辞書）を全ステージに通し、シーンのリストを返します（ファイルには書き出さない）。
+    asset_dir を指定すると、音声を public_dir/<asset_dir>/audio に分けて保存します（バッチ用）。
+    speech_filter は辞書を適用した後の読み上げテキストに対して呼ばれます。
+    """
+    ctx = {
+        "script": script,
+        "public_dir": public_dir,
+        "asset_dir": asset_dir,
+        "client": client or VoicevoxClient(),
+        "image_client": image_client or PexelsClient(),
+        "speech_filter": speech_filter,
+        "scenes": [],
+    }
+    for stage in PIPELINE:
+        stage(ctx)
+    return ctx["scenes"]
+
+def compile_script(script_path, output_path=None, public_dir=PUBLIC_DIR, client=None,
+                   image_client=None, asset_dir=""):
+    """台本ファイルをコンパイルしてシーンJSONを書き出し、シーンのリストを返します。"""
+    script = load_script(script_path)
+    log(f"📜 台本コンパイル開始: {os.path.basename(script_path)}")
+    scenes = compile_scenes(script, public_dir, client, image_client, asset_dir)
+
+    output_path = output_path or os.path.join(public_dir, script.get("output", "cat_data.json"))
+    save_scenes(output_path, scenes)
+    log(f"✅ 完了！ {len(scenes)}シーン 保存先: {output_path}")
+    return scenes
+
+if __name__ == "__main__":
+    # 標準出力をUTF-8に（Windows環境の文字化け対策。reconfigure は何度呼んでも安全）
+    if sys.platform == "win32":
+        sys.stdout.reconfigure(encoding='utf-8')
+    if len(sys.argv) < 2:
+        print("使い方: python src/script_compiler.py <台本ファイル> [出力先JSON]")
+        sys.exit(1)
+    compile_script(sys.argv[1], sys.argv[2] if len(sys.argv) > 2 else None)
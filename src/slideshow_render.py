@@ -0,0 +1,176 @@
+"""
+FFmpeg による静止画スライドショーの書き出し
+静止画＋音声だけの動画（1枚絵の動画や、1シーン1枚のニュースショート）を、Remotion や Chromium を
+起動せずに1回の ffmpeg 実行で書き出します。フレームを Python で作らないので、moviepy よりずっと速く動きます。
+
+- 静止画は1秒に1フレームだけ読み込んで縮小し、ffmpeg の fps フィルタで複製する
+- 各スライドの音声は無音で埋めてスライドの長さにそろえ、音声のないスライドは anullsrc で無音にする
+- 映像と音声は concat フィルタでつなぎ、ffmpeg の -progress から進捗を読む
+  （イベントの形式は remotion_render.render_with_progress と同じ）
+- フィルタグラフはファイル経由で渡す（スライドが多くてもコマンドラインの長さ制限にかからない）
+
+    python src/slideshow_render.py video/public/news_data.json video/out/news_short.mp4
+    python src/slideshow_render.py video/public/cat_data.json out.mp4 video/public/images/bg.jpg   # 画像のないシーン用
+
+ffmpeg は imageio-ffmpeg 同梱のもの、なければパスの通ったものを使います（ffmpeg_bin.py）。
+"""
+
+import os
+import sys
+import tempfile
+import subprocess
+from PIL import Image
+import json_io
+from ffmpeg_bin import ffmpeg_exe
+from timeline import scene_length
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PUBLIC_DIR = os.path.join(BASE_DIR, "video", "public")
+# ショート動画（縦長）の標準サイズ
+SHORT_SIZE = (1080, 1920)
+DEFAULT_FPS = 30
+AUDIO_RATE = 48000
+
+def log(msg):
+    print(msg, flush=True)
+
+def _even(value):
+    return max(2, int(value) // 2 * 2)
+
+def image_size(path):
+    """画像のサイズを偶数ピクセルにそろえて返します（H.264 は奇数サイズを扱えない）。"""
+    with Image.open(path) as img:
+        return _even(img.width), _even(img.height)
+
+def build_command(slides, output_path, size, fps=DEFAULT_FPS, crf=23):
+    """
+    ffmpeg のコマンドとフィルタグラフを返します。
+    slides: [{"image": 画像パス, "duration": 秒, "audio": 音声パス or None}, ...]
+    """
+    width, height = size
+    has_audio = any(s.get("audio") for s in slides)
+
+    cmd = [ffmpeg_exe(), "-y", "-v", "error", "-nostats", "-progress", "pipe:1"]
+    graph = []
+    # 画像: 入力は1秒に1フレームだけ読み込んで縮小し、fps フィルタで複製して目的のfpsにする
+    # （split で1枚を使い回すと、後のスライド用のフレームが concat 待ちの間メモリに溜まる）
+    for i, slide in enumerate(slides):
+        duration = f"{slide['duration']:.3f}"
+        cmd += ["-loop", "1", "-framerate", "1", "-t", duration, "-i", slide["image"]]
+        graph.append(
+            f"[{i}:v]scale={width}:{height}:force_original_aspect_ratio=decrease,"
+            f"pad={width}:{height}:(ow-iw)/2:(oh-ih)/2:color=black,setsar=1,format=yuv420p,"
+            f"fps={fps},tpad=stop_mode=clone:stop_duration=1,trim=duration={duration},"
+            f"setpts=PTS-STARTPTS[v{i}]")
+
+    # 音声: スライドの長さにそろえる（足りない分は無音、長い分は切る）
+    audio_index = len(slides)
+    for i, slide in enumerate(slides):
+        if not has_audio:
+            break
+        duration = f"{slide['duration']:.3f}"
+        if slide.get("audio"):
+            cmd += ["-i", slide["audio"]]
+            graph.append(
+                f"[{audio_index}:a]aformat=sample_rates={AUDIO_RATE}:channel_layouts=stereo,"
+                f"apad,atrim=0:{duration},asetpts=PTS-STARTPTS[a{i}]")
+            audio_index += 1
+        else:
+            graph.append(f"anullsrc=r={AUDIO_RATE}:cl=stereo,atrim=0:{duration}[a{i}]")
+
+    streams = "".join(f"[v{i}][a{i}]" if has_audio else f"[v{i}]" for i in range(len(slides)))
+    graph.append(f"{streams}concat=n={len(slides)}:v=1:a={1 if has_audio else 0}"
+                 + ("[v][a]" if has_audio else "[v]"))
+
+    cmd += ["-map", "[v]"]
+    if has_audio:
+        cmd += ["-map", "[a]", "-c:a", "aac", "-b:a", "192k"]
+    cmd += ["-c:v", "libx264", "-preset", "veryfast", "-tune", "stillimage", "-crf", str(crf),
+            "-r", str(fps), "-pix_fmt", "yuv420p", "-movflags", "+faststart", output_path]
+    return cmd, ";\n".join(graph)
+
+def render_slideshow(slides, output_path, size=None, fps=DEFAULT_FPS, crf=23, on_event=None):
+    """
+    スライドショーを mp4 に書き出します。失敗時は RuntimeError を送出します。
+    size を省略すると最初の画像のサイズを使います。on_event には進捗イベント（dict）が渡されます。
+    """
+    if not slides:
+        raise ValueError("スライドがありません")
+    for slide in slides:
+        if not os.path.exists(slide["image"]):
+            raise FileNotFoundError(f"画像が見つかりません: {slide['image']}")
+        if slide.get("audio") and not os.path.exists(slide["audio"]):
+            raise FileNotFoundError(f"音声が見つかりません: {slide['audio']}")
+    size = size or image_size(slides[0]["image"])
+    total = sum(s["duration"] for s in slides)
+    os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+
+    cmd, graph = build_command(slides, output_path, size, fps, crf)
+    fd, graph_path = tempfile.mkstemp(prefix="slideshow_", suffix=".txt")
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        f.write(graph)
+    # -filter_complex_script は出力オプションより前に置く
+    cmd[cmd.index("-map"):cmd.index("-map")] = ["-filter_complex_script", graph_path]
+    log(f"[Slideshow] {len(slides)}枚, {total:.1f}秒 → {output_path}")
+    if on_event:
+        on_event({"type": "phase", "phase": "encoding"})
+
+    try:
+        process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                                   text=True, encoding="utf-8", errors="replace")
+        for line in process.stdout:
+            key, _, value = line.strip().partition("=")
+            # out_time_us（古い版は out_time_ms も同じくマイクロ秒）
+            if key in ("out_time_us", "out_time_ms") and value.isdigit() and on_event:
+                seconds = int(value) / 1_000_000
+                on_event({"type": "progress", "phase": "encoding",
+                          "progress": min(1.0, seconds / total) if total else 1.0,
+                          "renderedFrames": int(seconds * fps), "totalFrames": int(total * fps)})
+        stderr = process.stderr.read()
+        process.wait()
+    finally:
+        os.remove(graph_path)
+
+    if process.returncode != 0 or not os.path.exists(output_path):
+        raise RuntimeError(stderr.strip() or f"ffmpeg failed with exit code {process.returncode}")
+    if on_event:
+        on_event({"type": "done", "output": output_path})
+    return output_path
+
+def scenes_to_slides(scenes, public_dir=PUBLIC_DIR, default_image=None):
+    """
+    シーンデータ（cat_data.json などの形式）をスライドに変換します。
+    画像のないシーンは直前のシーンの画像（最初なら default_image）を使います。
+    """
+    slides = []
+    image = default_image
+    for scene in scenes:
+        if scene.get("image"):
+            image = os.path.join(public_dir, scene["image"])
+        if image is None:
+            raise ValueError(f"シーン {scene.get('id')} の画像がありません（default_image を指定してください）")
+        audio = os.path.join(public_dir, scene["audio"]) if scene.get("audio") else None
+        slides.append({"image": image, "audio": audio, "duration": scene_length(scene)})
+    return slides
+
+def render_scenes(scenes_path, output_path, size=SHORT_SIZE, fps=DEFAULT_FPS, default_image=None, on_event=None):
+    """シーンJSON（または {"scenes": [...]} の props）から動画を書き出します。"""
+    data = json_io.load_file(scenes_path)
+    scenes = data["scenes"] if isinstance(data, dict) else data
+    return render_slideshow(scenes_to_slides(scenes, default_image=default_image), output_path, size=size, fps=fps, on_event=on_event)
+
+if __name__ == "__main__":
+    if len(sys.argv) < 3:
+        print("使い方: python src/slideshow_render.py <シーンJSON> <出力mp4> [画像のないシーンの画像]")
+        sys.exit(1)
+    last_step = [-1]
+
+    def report(event):
+        if event["type"] == "progress":
+            step = int(event["progress"] * 10)
+            if step > last_step[0]:
+                last_step[0] = step
+                log(f"[Slideshow] {event['progress']:.0%}")
+
+    render_scenes(sys.argv[1], sys.argv[2], default_image=sys.argv[3] if len(sys.argv) > 3 else None,
+                  on_event=report)
@@ -0,0 +1,138 @@
+"""
+字幕の分割
+テキストを表示幅（全角=2、半角=1）で測り、1行の幅と1シーンの行数に収まるように分割します。
+文末（。！？…、半角の ...）→ 読点・閉じ括弧・空白 → 助詞の後 の順に区切りやすい位置を選び、
+どこにも区切れない場合だけ幅ちょうどで切ります（行頭に 、。」ー や小書きの仮名が来ないようにする）。
+シーンは行に分割してから max_lines 行ずつまとめ、最後に短い1行だけが残る場合は前のシーンとならします。
+
+表示幅の累積と区切り候補の位置は正規表現・組み込み関数でまとめて求め、各行の区切りは二分探索で
+決めるので、長い記事本文でも文字数に比例した時間（Python のループは行数分だけ）で終わります。
+
+    segmenter = SubtitleSegmenter(line_width=40, max_lines=2)   # 1行 全角20文字 × 2行
+    segmenter.scenes(text)    # ["1行目\\n2行目", ...]
+    segmenter.lines(text)     # ["1行目", "2行目", ...]
+"""
+
+import re
+import unicodedata
+from bisect import bisect_left, bisect_right
+from itertools import accumulate
+
+SENTENCE_END = "。！？!?．…\n"
+CLOSING = "」』）)】〕］]〉》”’"
+OPENING = "「『（(【〔［[〈《“‘"
+CLAUSE_END = "、，," + CLOSING
+# 行頭に置かない文字（この直前では区切らない）
+NO_LINE_START = set("、。，．,.！？!?ー～ぁぃぅぇぉっゃゅょゎァィゥェォッャュョヮヵヶ々ゝゞ・：；:;" + CLOSING)
+# この後で区切ってよい助詞（次の文字がひらがなでない場合だけ）
+PARTICLES = "はがをにでともへやの"
+# 行末に来たときは幅を超えても同じ行に残す文字（ぶら下げ）
+HANGING = set("、。，．,.」』）)")
+# 区切り位置がこれより前になる場合は、区切り候補を使わず幅ちょうどで切る
+# （最後のシーンの幅がこれに満たない場合も、単独のシーンにしない）
+MIN_FILL = 0.5
+
+def _chars(chars):
+    return "[" + "".join(re.escape(c) for c in chars) + "]"
+
+_NOT_LINE_START = "(?!" + _chars(NO_LINE_START) + ")"
+# 区切り候補（優先度の高い順）: 文末（直後の閉じ括弧を含む）→ 読点・閉じ括弧・空白・開き括弧の前 → 助詞の後
+BREAK_PATTERNS = [
+    re.compile("(?:" + _chars(SENTENCE_END) + r"|\.{2,})+" + _chars(CLOSING) + "*" + _NOT_LINE_START),
+    re.compile("(?:" + _chars(CLAUSE_END) + r"|\s)+" + _NOT_LINE_START + "|(?=" + _chars(OPENING) + ")"),
+    re.compile(_chars(PARTICLES) + r"(?=[^\sぁ-ゟ])" + _NOT_LINE_START),
+]
+
+class SubtitleSegmenter:
+    """
+    line_width:      1行の表示幅（半角1文字 = 1）
+    max_lines:       1シーンの最大行数
+    ambiguous_width: 幅が曖昧な文字（…、○ など）の幅。日本語フォントでは全角で表示されるので 2
+    """
+
+    def __init__(self, line_width=40, max_lines=2, ambiguous_width=2):
+        if line_width < 2:
+            raise ValueError("line_width は2以上にしてください")
+        self.line_width = line_width
+        self.max_lines = max_lines
+        self.ambiguous_width = ambiguous_width
+        self._widths = {}
+
+    def char_width(self, ch):
+        width = self._widths.get(ch)
+        if width is None:
+            if unicodedata.combining(ch) or ch in "\u200b\u200d\ufe0f":
+                width = 0
+            else:
+                eaw = unicodedata.east_asian_width(ch)
+                width = 2 if eaw in ("F", "W") else self.ambiguous_width if eaw == "A" else 1
+            self._widths[ch] = width
+        return width
+
+    def display_width(self, text):
+        return sum(self.char_width(ch) for ch in text)
+
+    def _split(self, text, limit):
+        """text を表示幅 limit 以内の断片に分割します。"""
+        for ch in set(text).difference(self._widths):
+            self.char_width(ch)
+        cum = [0]
+        cum.extend(accumulate(map(self._widths.__getitem__, text)))
+        n = len(text)
+        # 優先度ごとの区切り位置（その位置の直前で切る）。正規表現で一度に求めておく
+        candidates = [[m.end() for m in pattern.finditer(text)] for pattern in BREAK_PATTERNS]
+
+        pieces = []
+        start = 0
+        while cum[n] - cum[start] > limit:
+            # 幅に収まる最後の位置（句読点1文字だけは幅を超えても前の行に残す）
+            end = max(bisect_right(cum, cum[start] + limit) - 1, start + 1)
+            if end < n and text[end] in HANGING:
+                end += 1
+            lowest = max(bisect_left(cum, cum[start] + limit * MIN_FILL), start + 1)
+            cut = -1
+            for positions in candidates:
+                j = bisect_right(positions, end) - 1
+                if j >= 0 and positions[j] >= lowest:
+                    cut = positions[j]
+                    break
+            if cut < 0:
+                # 区切れる位置がないので幅ちょうどで切る（行頭禁則の文字は前の行に入れる）
+                cut = end
+                while cut > start + 1 and cut < n and text[cut] in NO_LINE_START:
+                    cut -= 1
+            piece = text[start:cut].strip()
+            if piece:
+                pieces.append(piece)
+            start = cut
+        piece = text[start:].strip()
+        if piece:
+            pieces.append(piece)
+        return pieces
+
+    def lines(self, text):
+        """1行の幅に収まるように分割した行のリストを返します。"""
+        return self._split(text, self.line_width)
+
+    def scene_lines(self, text):
+        """シーンごとの行のリスト（[[1行目, 2行目], ...]）を返します。"""
+        lines = self.lines(text)
+        scenes = [lines[i:i + self.max_lines] for i in range(0, len(lines), self.max_lines)]
+        # 最後のシーンが短い1行だけ（"よ。" など）なら、それだけを読み上げるシーンにしない
+        if len(scenes) > 1 and self.display_width("".join(scenes[-1])) < self.line_width * MIN_FILL:
+            previous = scenes[-2]
+            if len(previous) < self.max_lines:
+                previous.extend(scenes.pop())
+            elif self.max_lines > 1:
+                scenes[-1].insert(0, previous.pop())
+        return scenes
+
+    def scenes(self, text, separator="\n"):
+        """シーンごとのテキスト（行は separator でつなぐ）のリストを返します。"""
+        return [separator.join(lines) for lines in self.scene_lines(text)]
+
+_default = SubtitleSegmenter()
+
+def display_width(text):
+    """表示幅（全角=2、半角=1）を返します。"""
+    return _default.display_width(text)
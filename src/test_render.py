@@ -1,5 +1,5 @@
 import os
-from moviepy.editor import ImageClip
+from slideshow_render import render_slideshow
 
 def test_video_generation():
     BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -15,10 +15,7 @@ def test_video_generation():
 
     # 3秒間の動画を作成
     duration = 3
-    clip = ImageClip(IMAGE_PATH).set_duration(duration)
-    
-    # 書き出し（デフォルトのエンコーダーを使用）
-    clip.write_videofile(OUTPUT_PATH, fps=24, codec="libx264")
+    render_slideshow([{"image": IMAGE_PATH, "duration": duration}], OUTPUT_PATH, fps=24)
     print(f"テスト動画が生成されました: {OUTPUT_PATH}")
 
 if __name__ == "__main__":
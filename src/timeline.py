@@ -0,0 +1,28 @@
+"""
+タイムライン上の無音・余白の扱い
+シーンの末尾余白は duration に足し込まず "padding" フィールドで表現し、
+カットイン等の無音区間は audio なしのシーン（ギャップ）として表現します。
+Remotion側（types/index.ts）は duration + padding をシーン長として扱い、
+audio が空のシーンでは音声を再生しません。
+"""
+
+import wave
+import contextlib
+
+# セリフ末尾の標準余白（秒）
+DEFAULT_PADDING = 0.5
+
+def scene_length(scene, default=5.0):
+    """余白を含めたシーンの長さ（秒）を返します。"""
+    duration = scene.get("duration")
+    if duration is None:
+        duration = default
+    return duration + (scene.get("padding") or 0)
+
+def get_audio_duration(file_path, default=5.0):
+    """wavファイルの長さを秒単位で取得します。"""
+    try:
+        with contextlib.closing(wave.open(file_path, 'r')) as f:
+            return f.getnframes() / float(f.getframerate())
+    except Exception:
+        return default
@@ -0,0 +1,109 @@
+"""
+VOICEVOX クライアント
+HTTPセッションを使い回し、複数セリフの音声合成を並列に実行します。
+"""
+
+import os
+import json
+import shutil
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from concurrent.futures import ThreadPoolExecutor
+from voicevox_dict import sync_user_dict
+
+VOICEVOX_URL = os.getenv("VOICEVOX_URL", "http://127.0.0.1:50021")
+
+# 話者とSpeaker IDのマッピング
+SPEAKER_IDS = {
+    "metan": 2,      # 四国めたん
+    "zundamon": 3,   # ずんだもん
+    "zunda": 3,      # ずんだもん（エディタ用の短縮名）
+    "kanon": 10      # 雨晴はう（カノン用）
+}
+
+def log(msg):
+    print(msg, flush=True)
+
+class VoicevoxClient:
+    def __init__(self, base_url=VOICEVOX_URL, max_workers=4, pool_size=None):
+        self.base_url = base_url
+        self.max_workers = max_workers
+        self.session = requests.Session()
+        # 並列実行時にコネクションを取り合わないようプールを広げる
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size or max_workers)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        # (テキスト, 話者, 設定) → 生成済みファイル。同じセリフはコピーで済ませる
+        self.cache = {}
+        self.lock = threading.Lock()
+        # 辞書の同期中に他のスレッドが合成を始めないよう、同期は専用のロックで1つずつ行う
+        self.user_dict_lock = threading.Lock()
+        self.user_dict_synced = False
+
+    def sync_user_dict(self):
+        """
+        プロジェクトの発音辞書をエンジンに登録します（成功するまでは呼ばれるたびに試す）。
+        同期できたら True を返します。失敗しても例外は出さず、警告だけ出して合成は続けます。
+        """
+        with self.user_dict_lock:
+            if self.user_dict_synced:
+                return True
+            try:
+                stats = sync_user_dict(self.base_url, session=self.session)
+            except Exception as e:
+                log(f"  [WARNING] ユーザー辞書の同期に失敗しました: {e}")
+                return False
+            self.user_dict_synced = True
+            log(f"  [OK] ユーザー辞書同期: 追加{stats['added']} / 更新{stats['updated']}")
+            return True
+
+    def synthesize(self, text, output_path, speaker_id, speed_scale=1.0, query_overrides=None):
+        """テキストを音声合成してWAVを書き出します。成功したらTrueを返します。"""
+        key = (text, speaker_id, speed_scale, json.dumps(query_overrides, sort_keys=True))
+        with self.lock:
+            cached_path = self.cache.get(key)
+        if cached_path and os.path.exists(cached_path):
+            if os.path.abspath(cached_path) != os.path.abspath(output_path):
+                shutil.copyfile(cached_path, output_path)
+            return True
+
+        try:
+            query_response = self.session.post(
+                f"{self.base_url}/audio_query",
+                params={"text": text, "speaker": speaker_id},
+                timeout=20
+            )
+            if query_response.status_code != 200:
+                return False
+
+            query_data = query_response.json()
+            query_data["speedScale"] = speed_scale
+            if query_overrides:
+                query_data.update(query_overrides)
+
+            synthesis_response = self.session.post(
+                f"{self.base_url}/synthesis",
+                params={"speaker": speaker_id},
+                json=query_data,
+                timeout=60
+            )
+            if synthesis_response.status_code == 200:
+                with open(output_path, "wb") as f:
+                    f.write(synthesis_response.content)
+                with self.lock:
+                    self.cache[key] = output_path
+                return True
+        except Exception as e:
+            log(f"  [ERROR] 音声生成エラー: {e}")
+        return False
+
+    def synthesize_many(self, jobs):
+        """
+        jobs: synthesize() のキーワード引数の辞書リスト
+        結果（True/False）を jobs と同じ順序で返します。
+        """
+        if not jobs:
+            return []
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            return list(executor.map(lambda job: self.synthesize(**job), jobs))
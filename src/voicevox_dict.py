@@ -0,0 +1,87 @@
+"""
+VOICEVOX ユーザー辞書の同期
+プロジェクトの発音辞書（dictionaries/voicevox_user_dict.tsv）をエンジンの
+ユーザー辞書APIへ登録します。エンジン側の登録内容と比較し、追加・変更が
+あった語だけを送るので、毎回起動時に呼んでも通信はほとんど発生しません。
+登録後はテキストを書き換えなくても、以後の全ての合成に読みが反映されます。
+
+    python src/voicevox_dict.py          # 同期して結果を表示
+
+辞書ファイル: 1行1語「表記<TAB>読み(カタカナ)<TAB>アクセント型(省略時0)」
+"""
+
+import os
+import sys
+import unicodedata
+import requests
+
+DICT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "dictionaries")
+USER_DICT_PATH = os.path.join(DICT_DIR, "voicevox_user_dict.tsv")
+VOICEVOX_URL = os.getenv("VOICEVOX_URL", "http://127.0.0.1:50021")
+
+def log(msg):
+    print(msg, flush=True)
+
+def _to_katakana(text):
+    # ひらがなで書かれた読みもエンジンが受け付けるカタカナに揃える
+    return "".join(chr(ord(c) + 0x60) if "ぁ" <= c <= "ゖ" else c for c in text)
+
+def _normalize_surface(surface):
+    # エンジンは表記を全角に変換して保存するので、比較時はNFKCで揃える
+    return unicodedata.normalize("NFKC", surface)
+
+def load_user_dict(path=USER_DICT_PATH):
+    """辞書ファイルを {正規化した表記: (表記, 読み, アクセント型)} で返します。"""
+    entries = {}
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.rstrip("\r\n")
+            if not line.strip() or line.lstrip().startswith("#"):
+                continue
+            cols = line.split("\t")
+            surface = cols[0]
+            pronunciation = _to_katakana(cols[1])
+            accent_type = int(cols[2]) if len(cols) > 2 and cols[2] else 0
+            entries[_normalize_surface(surface)] = (surface, pronunciation, accent_type)
+    return entries
+
+def sync_user_dict(base_url=VOICEVOX_URL, path=USER_DICT_PATH, session=None, prune=False):
+    """
+    エンジンのユーザー辞書をプロジェクト辞書に合わせます。
+    prune=True の場合、プロジェクト辞書にない語をエンジンから削除します。
+    戻り値: {"added": n, "updated": n, "deleted": n, "unchanged": n}
+    """
+    session = session or requests.Session()
+    desired = load_user_dict(path)
+    response = session.get(f"{base_url}/user_dict", timeout=10)
+    response.raise_for_status()
+
+    current = {}
+    for word_uuid, word in response.json().items():
+        current[_normalize_surface(word["surface"])] = (word_uuid, word)
+
+    stats = {"added": 0, "updated": 0, "deleted": 0, "unchanged": 0}
+    for key, (surface, pronunciation, accent_type) in desired.items():
+        params = {"surface": surface, "pronunciation": pronunciation, "accent_type": accent_type}
+        if key not in current:
+            session.post(f"{base_url}/user_dict_word", params=params, timeout=10).raise_for_status()
+            stats["added"] += 1
+            continue
+        word_uuid, word = current[key]
+        if word.get("pronunciation") == pronunciation and word.get("accent_type") == accent_type:
+            stats["unchanged"] += 1
+            continue
+        session.put(f"{base_url}/user_dict_word/{word_uuid}", params=params, timeout=10).raise_for_status()
+        stats["updated"] += 1
+
+    if prune:
+        for key, (word_uuid, _) in current.items():
+            if key not in desired:
+                session.delete(f"{base_url}/user_dict_word/{word_uuid}", timeout=10).raise_for_status()
+                stats["deleted"] += 1
+    return stats
+
+if __name__ == "__main__":
+    result = sync_user_dict(prune="--prune" in sys.argv)
+    log(f"[OK] ユーザー辞書を同期しました: 追加{result['added']} / 更新{result['updated']} / "
+        f"削除{result['deleted']} / 変更なし{result['unchanged']}")
@@ -0,0 +1,73 @@
+"""アクション・感情の推論（action_inference.py）のテスト"""
+
+import json
+import os
+
+import pytest
+
+import action_inference
+from action_inference import infer_action, infer_emotion
+
+
+@pytest.fixture
+def rules_path(tmp_path, monkeypatch):
+    path = tmp_path / "inference_rules.json"
+    monkeypatch.setattr(action_inference, "RULES_PATH", str(path))
+    return path
+
+
+def _write_rules(path, action_rules, mtime=None):
+    rules = {
+        "_comment": "テスト用",
+        "action": {"default": "none", "rules": action_rules},
+        "emotion": {"default": "normal", "rules": {"happy": {"うれしい": 1}}},
+    }
+    path.write_text(json.dumps(rules, ensure_ascii=False), encoding="utf-8")
+    if mtime is not None:
+        os.utime(path, (mtime, mtime))
+
+
+def test_project_rules_pick_specific_rule_over_generic_word():
+    # 「すごい」だけなら big_jump だが、より重みのある語があればそちらを採用する
+    assert infer_action("すごい") == "big_jump"
+    assert infer_action("すごい、なるほど") == "nod"
+    assert infer_action("雨が降っている") == "none"
+
+
+def test_project_rules_break_ties_by_rule_order():
+    # fly_away と run_left はどちらも2点。ファイルで上に書いた fly_away を選ぶ
+    assert infer_action("うわあ、逃げろ") == "fly_away"
+
+
+def test_equal_scores_prefer_earlier_rule(rules_path):
+    _write_rules(rules_path, {"nod": {"はい": 1}, "jump": {"やった": 1}})
+    assert infer_action("やった、はい") == "nod"
+    _write_rules(rules_path, {"jump": {"やった": 1}, "nod": {"はい": 1}}, mtime=2_000_000_000)
+    assert infer_action("やった、はい") == "jump"
+
+
+def test_weights_add_up_across_hits(rules_path):
+    _write_rules(rules_path, {"nod": {"うん": 0.5}, "jump": {"やった": 1}})
+    assert infer_action("うん、やった") == "jump"
+    assert infer_action("うん、うん、うん、やった") == "nod"
+
+
+def test_edited_rules_file_is_reloaded(rules_path):
+    _write_rules(rules_path, {"nod": {"はい": 1}}, mtime=1_000_000_000)
+    assert infer_action("はい") == "nod"
+    assert infer_emotion("うれしい") == "happy"
+
+    # サーバーを再起動しなくても、保存し直したルールが次の推論から使われる
+    _write_rules(rules_path, {"shake_head": {"はい": 1}}, mtime=1_000_000_100)
+    assert infer_action("はい") == "shake_head"
+
+
+def test_unchanged_rules_file_is_not_reloaded(rules_path, monkeypatch):
+    _write_rules(rules_path, {"nod": {"はい": 1}})
+    first = action_inference._load_rules()
+
+    def fail_open(*args, **kwargs):
+        raise AssertionError("変わっていないルールを読み直した")
+
+    monkeypatch.setattr(action_inference, "open", fail_open, raising=False)
+    assert action_inference._load_rules() is first
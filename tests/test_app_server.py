@@ -0,0 +1,156 @@
+"""スタジオ用APIサーバー（app_server.py）のテスト"""
+
+import asyncio
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+import app_server
+import scene_store
+
+
+SCENES = [
+    {"id": 1, "speaker": "kanon", "emotion": "normal", "action": "nod", "text": "こんにちは", "audio": "audio/1.wav", "duration": 1.5, "padding": 0.3},
+    {"id": 2, "speaker": "zundamon", "emotion": "happy", "action": "jump", "text": "なのだ", "audio": "audio/2.wav", "duration": 2.0, "padding": 0.3},
+    # カットインなど、text を持たないシーン
+    {"id": 3, "speaker": "kanon", "emotion": "normal", "action": "none", "image": "images/cut.png", "audio": "", "duration": 1.0},
+]
+
+
+@pytest.fixture
+def scenes_path(tmp_path, monkeypatch):
+    public = tmp_path / "public"
+    (public / "audio").mkdir(parents=True)
+    path = public / "cat_data.json"
+    path.write_text(json.dumps(SCENES, ensure_ascii=False, indent=2), encoding="utf-8")
+
+    def fake_voice(text, speaker_id, filename, speaker_name="kanon", speed_scale=1.0):
+        (public / filename).write_bytes(text.encode("utf-8"))
+        return 3.0
+
+    monkeypatch.setattr(scene_store, "HISTORY_ROOT", str(tmp_path / "history"))
+    monkeypatch.setattr(app_server, "PUBLIC_DIR", str(public))
+    monkeypatch.setattr(app_server, "generate_voice", fake_voice)
+    monkeypatch.setattr(app_server, "scene_index", app_server.SceneIndex(str(path)))
+    return path
+
+
+@pytest.fixture
+def client(scenes_path):
+    # with を使わず、起動時の処理（バンドルの事前ビルド・辞書同期）は走らせない
+    return TestClient(app_server.app)
+
+
+def _load(path):
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def test_patch_one_scene_rewrites_only_that_scene(client, scenes_path):
+    res = client.patch("/api/scenes/2", json={**SCENES[1], "text": "おはようなのだ"})
+    assert res.status_code == 200
+    assert res.json()["scene"]["duration"] == 3.0
+
+    first, second, third = _load(scenes_path)
+    assert first == SCENES[0]
+    assert third == SCENES[2]
+    assert second["text"] == "おはようなのだ"
+    assert (scenes_path.parent / second["audio"]).read_bytes() == "おはようなのだ".encode("utf-8")
+
+
+def test_patch_unknown_scene_is_404(client, scenes_path):
+    before = scenes_path.read_bytes()
+    res = client.patch("/api/scenes/99", json={**SCENES[0], "id": 99})
+    assert res.status_code == 404
+    assert scenes_path.read_bytes() == before
+
+
+def test_patch_scene_without_stored_text(client, scenes_path):
+    edited = {**SCENES[2], "text": "カットイン"}
+    res = client.patch("/api/scenes", params={"generate_audio": "false"}, json={"scenes": [edited]})
+    assert res.status_code == 200
+    assert res.json()["updated"] == 1
+
+    scenes = _load(scenes_path)
+    assert scenes[:2] == SCENES[:2]
+    assert scenes[2]["text"] == "カットイン"
+
+
+def test_get_script_revalidates_with_etag(client):
+    res = client.get("/api/script")
+    assert res.status_code == 200
+    assert res.json() == SCENES
+    etag = res.headers["etag"]
+
+    res = client.get("/api/script", headers={"If-None-Match": etag})
+    assert res.status_code == 304
+    assert res.content == b""
+    assert res.headers["etag"] == etag
+
+
+def test_etag_changes_after_patch_and_undo(client):
+    original = client.get("/api/script").headers["etag"]
+    client.patch("/api/scenes/1", params={"generate_audio": "false"}, json={**SCENES[0], "text": "こんばんは"})
+
+    res = client.get("/api/script", headers={"If-None-Match": original})
+    assert res.status_code == 200
+    assert res.json()[0]["text"] == "こんばんは"
+    patched = res.headers["etag"]
+    assert patched != original
+
+    assert client.post("/api/script/undo").status_code == 200
+    res = client.get("/api/script", headers={"If-None-Match": patched})
+    assert res.status_code == 200
+    assert res.json() == SCENES
+    assert res.headers["etag"] not in (original, patched)
+
+    # 取り消す履歴が残っていなければ 409
+    assert client.post("/api/script/undo").status_code == 409
+
+
+def _parse_event(chunk):
+    event = {}
+    for line in chunk.splitlines():
+        if line and not line.startswith(":"):
+            key, _, value = line.partition(": ")
+            event[key] = value
+    return event
+
+
+class _ConnectedRequest:
+    async def is_disconnected(self):
+        return False
+
+
+def test_events_stream_sends_new_revision(scenes_path, monkeypatch):
+    # TestClient はレスポンスを最後まで読んでから返すので、終わらない SSE はジェネレーターを直接読む
+    feed = app_server.SceneFeed(app_server.scene_index, interval=0.05)
+    monkeypatch.setattr(app_server, "scene_feed", feed)
+    store = app_server.scene_index.store
+
+    async def scenario():
+        response = await app_server.script_events(_ConnectedRequest())
+        assert response.media_type == "text/event-stream"
+        events = response.body_iterator
+        try:
+            ready = _parse_event(await events.__anext__())
+            # CLIの生成スクリプトと同じく、ストア経由で直接書き換える
+            scenes, _ = await asyncio.to_thread(store.read)
+            scenes[1] = {**scenes[1], "text": "書き換えたのだ"}
+            revision = await asyncio.to_thread(store.write, scenes)
+            changed = _parse_event(await asyncio.wait_for(events.__anext__(), timeout=5))
+        finally:
+            await events.aclose()
+        return ready, revision, changed
+
+    ready, revision, event = asyncio.run(scenario())
+    assert ready["event"] == "ready"
+    assert json.loads(ready["data"])["revision"] != revision
+    assert event["event"] == "scenes"
+    assert event["id"] == str(revision)
+    data = json.loads(event["data"])
+    assert data["revision"] == revision
+    assert data["order"] == [1, 2, 3]
+    assert [s["text"] for s in data["changed"]] == ["書き換えたのだ"]
+    assert data["removed"] == []
+    assert not feed.subscribers
@@ -0,0 +1,81 @@
+"""重複メディアのまとめ（dedup_assets.py）のテスト"""
+
+import json
+
+import pytest
+
+import clean_assets
+import dedup_assets
+import scene_store
+
+
+@pytest.fixture
+def public(tmp_path, monkeypatch):
+    public = tmp_path / "public"
+    (public / "audio").mkdir(parents=True)
+    monkeypatch.setattr(clean_assets, "PROJECT_DIR", str(public))
+    monkeypatch.setattr(dedup_assets, "PROJECT_DIR", str(public))
+    monkeypatch.setattr(clean_assets, "EXTRA_REFERENCE_FILES", [])
+    monkeypatch.setattr(clean_assets, "HISTORY_DIR", str(tmp_path / "history"))
+    monkeypatch.setattr(scene_store, "HISTORY_ROOT", str(tmp_path / "history"))
+    monkeypatch.setattr(dedup_assets, "CACHE_PATH", str(tmp_path / "hash_cache.json"))
+    return public
+
+
+def test_rewrites_only_scene_files_and_keeps_format(public, tmp_path):
+    for name in ("a.wav", "b.wav", "c.wav"):
+        (public / "audio" / name).write_bytes(b"same audio")
+    pretty = public / "cat_data.json"
+    pretty.write_text(json.dumps([{"id": 1, "audio": "audio/a.wav"}], indent=2))
+    compact = public / "news_data.json"
+    compact.write_text(json.dumps([{"id": 1, "audio": "audio/b.wav"}], separators=(",", ":")))
+    manifest = public / "manifest.json"
+    manifest.write_text(json.dumps({"icon": "audio/c.wav"}))
+    unrelated = public / "settings.json"
+    unrelated.write_text(json.dumps({"volume": 1}))
+
+    removed, _ = dedup_assets.dedup_assets(dry_run=False, min_age=0)
+
+    blob = json.loads(pretty.read_text())[0]["audio"]
+    assert blob.startswith("blobs/")
+    assert json.loads(compact.read_text())[0]["audio"] == blob
+    assert pretty.read_text().startswith("[\n")
+    assert "\n" not in compact.read_text().strip()
+    # シーンJSON以外は書き換えず、そこから参照されているファイルは残す
+    assert json.loads(manifest.read_text()) == {"icon": "audio/c.wav"}
+    assert (public / "audio" / "c.wav").exists()
+    assert not (public / "audio" / "a.wav").exists()
+    assert not (public / "audio" / "b.wav").exists()
+    assert removed == 2
+    # 書き換えていないファイルの履歴は作らない
+    history = tmp_path / "history"
+    assert not any("manifest" in p.name or "settings" in p.name for p in history.iterdir())
+
+
+def test_regenerating_one_scene_keeps_shared_blob(public, monkeypatch):
+    import app_server
+
+    for name in ("a.wav", "b.wav"):
+        (public / "audio" / name).write_bytes(b"same audio")
+    scenes_path = public / "cat_data.json"
+    scenes_path.write_text(json.dumps([
+        {"id": 1, "speaker": "kanon", "emotion": "normal", "action": "nod", "text": "同じセリフ", "audio": "audio/a.wav"},
+        {"id": 2, "speaker": "kanon", "emotion": "normal", "action": "nod", "text": "同じセリフ", "audio": "audio/b.wav"},
+    ], indent=2))
+    dedup_assets.dedup_assets(dry_run=False, min_age=0)
+    first, second = json.loads(scenes_path.read_text())
+    assert first["audio"] == second["audio"]
+
+    def fake_voice(text, speaker_id, filename, speaker_name="kanon", speed_scale=1.0):
+        (public / filename).write_bytes(text.encode("utf-8"))
+        return 1.0
+
+    monkeypatch.setattr(app_server, "PUBLIC_DIR", str(public))
+    monkeypatch.setattr(app_server, "generate_voice", fake_voice)
+    edited = app_server.Scene(**{**first, "text": "別のセリフ"})
+    new_first = app_server.process_scene(edited, first, generate_audio=True, speed_scale=1.0)
+
+    # 編集したシーンは自分専用のパスに書き出され、もう一方のシーンの音声は変わらない
+    assert new_first["audio"] != second["audio"]
+    assert (public / new_first["audio"]).read_bytes() == "別のセリフ".encode("utf-8")
+    assert (public / second["audio"]).read_bytes() == b"same audio"
@@ -0,0 +1,145 @@
+"""
+RSSフィードの取得（feed_ingester.py）のテスト
+ローカルのフィードファイルと、ETag を返すローカルの HTTP サーバーで確認します。
+"""
+
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import feed_ingester
+from feed_ingester import FeedIngester
+
+RSS = """<?xml version="1.0" encoding="UTF-8"?>
+<rss version="2.0"><channel><title>test</title>
+{items}
+</channel></rss>
+"""
+ITEM = """<item><guid>{guid}</guid><title>{title}</title><link>https://example.com/{guid}</link>
+<description>&lt;p&gt;{title}の概要&lt;/p&gt;</description><pubDate>{date}</pubDate></item>"""
+
+
+def _rss(*entries):
+    return RSS.format(items="\n".join(
+        ITEM.format(guid=guid, title=title, date=f"Mon, {day:02d} Jun 2025 10:00:00 GMT")
+        for guid, title, day in entries))
+
+
+class FeedServer:
+    """If-None-Match が現在の ETag と一致すれば 304 を返すフィードサーバー"""
+    def __init__(self, body):
+        self.body = body
+        self.etag = '"v1"'
+        self.statuses = []
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                if self.headers.get("If-None-Match") == server.etag:
+                    server.statuses.append(304)
+                    self.send_response(304)
+                    self.end_headers()
+                    return
+                data = server.body.encode("utf-8")
+                server.statuses.append(200)
+                self.send_response(200)
+                self.send_header("Content-Type", "application/rss+xml")
+                self.send_header("Content-Length", str(len(data)))
+                self.send_header("ETag", server.etag)
+                self.end_headers()
+                self.wfile.write(data)
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/rss.xml"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+
+@pytest.fixture
+def feed_server():
+    server = FeedServer(_rss(("a", "記事A", 1), ("b", "記事B", 2)))
+    yield server
+    server.server.shutdown()
+    server.server.server_close()
+
+
+def _titles(items):
+    return [item["title"] for item in items]
+
+
+def test_local_file_newest_first_and_mark_seen(tmp_path):
+    feed = tmp_path / "feed.xml"
+    feed.write_text(_rss(("a", "記事A", 1), ("b", "記事B", 2)), encoding="utf-8")
+    state = str(tmp_path / "state.json")
+
+    items = FeedIngester([str(feed)], state_path=state).fetch_new()
+    assert _titles(items) == ["記事B", "記事A"]
+    assert items[0]["summary"] == "記事Bの概要"
+
+    FeedIngester([str(feed)], state_path=state).mark_seen([items[0]])
+    # 既読は状態ファイルに残るので、別のインスタンスからも返らない
+    assert _titles(FeedIngester([str(feed)], state_path=state).fetch_new()) == ["記事A"]
+
+
+def test_local_file_unchanged_mtime_is_not_reread(tmp_path):
+    feed = tmp_path / "feed.xml"
+    feed.write_text(_rss(("a", "記事A", 1)), encoding="utf-8")
+    state = str(tmp_path / "state.json")
+    ingester = FeedIngester([str(feed)], state_path=state)
+    assert _titles(ingester.fetch_new()) == ["記事A"]
+
+    stat = os.stat(feed)
+    feed.write_text(_rss(("a", "記事A", 1), ("c", "記事C", 3)), encoding="utf-8")
+    os.utime(feed, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    assert _titles(ingester.fetch_new()) == ["記事A"]
+
+    os.utime(feed, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1))
+    assert _titles(ingester.fetch_new()) == ["記事C", "記事A"]
+
+
+def test_http_304_reuses_previous_items(tmp_path, feed_server):
+    state = str(tmp_path / "state.json")
+    assert _titles(FeedIngester([feed_server.url], state_path=state).fetch_new()) == ["記事B", "記事A"]
+    # 2回目は ETag を送り、304 でも前回解析した記事を返す
+    assert _titles(FeedIngester([feed_server.url], state_path=state).fetch_new()) == ["記事B", "記事A"]
+    assert feed_server.statuses == [200, 304]
+
+    feed_server.body = _rss(("a", "記事A", 1), ("b", "記事B", 2), ("c", "記事C", 3))
+    feed_server.etag = '"v2"'
+    assert _titles(FeedIngester([feed_server.url], state_path=state).fetch_new(limit=2)) == ["記事C", "記事B"]
+    assert feed_server.statuses == [200, 304, 200]
+
+
+def test_unparsable_response_keeps_previous_validators(tmp_path, feed_server):
+    state = str(tmp_path / "state.json")
+    ingester = FeedIngester([feed_server.url], state_path=state)
+    ingester.fetch_new()
+
+    feed_server.body = "<html>メンテナンス中</html>"
+    feed_server.etag = '"broken"'
+    assert _titles(ingester.fetch_new()) == ["記事B", "記事A"]
+    # 壊れた版の ETag を覚えていれば、直った後も 304 で古い記事を使い続けてしまう
+    feed_server.body = _rss(("c", "記事C", 3))
+    feed_server.etag = '"v2"'
+    assert _titles(ingester.fetch_new()) == ["記事C"]
+
+
+def test_seen_entries_expire(tmp_path, monkeypatch):
+    feed = tmp_path / "feed.xml"
+    feed.write_text(_rss(("a", "記事A", 1), ("b", "記事B", 2)), encoding="utf-8")
+    ingester = FeedIngester([str(feed)], state_path=str(tmp_path / "state.json"))
+    items = ingester.fetch_new()
+
+    now = 1_700_000_000
+    monkeypatch.setattr(feed_ingester.time, "time", lambda: now)
+    ingester.mark_seen([items[0]])
+    assert _titles(ingester.fetch_new()) == ["記事A"]
+
+    # SEEN_DAYS を過ぎた既読は、次に既読を書き込むときに忘れる
+    now += feed_ingester.SEEN_DAYS * 86400 + 1
+    ingester.mark_seen([items[1]])
+    assert _titles(ingester.fetch_new()) == ["記事B"]
@@ -0,0 +1,61 @@
+"""複数キーワードの一括検索（keyword_matcher.py）のテスト"""
+
+from keyword_matcher import KeywordMatcher
+
+
+def test_finditer_reports_nested_and_overlapping_hits():
+    matcher = KeywordMatcher(["ネコ", "ネコミミ", "ミミ", "コミ"])
+    hits = sorted((start, end, word) for start, end, word, _ in matcher.finditer("ネコミミだ"))
+    assert hits == [(0, 2, "ネコ"), (0, 4, "ネコミミ"), (1, 3, "コミ"), (2, 4, "ミミ")]
+
+
+def test_finditer_reports_repeated_hits():
+    matcher = KeywordMatcher(["ああ"])
+    assert [start for start, _, _, _ in matcher.finditer("あああ")] == [0, 1]
+
+
+def test_longest_matches_picks_leftmost_longest():
+    matcher = KeywordMatcher(["ネコ", "ネコミミ", "ミミ", "コミ"])
+    matches = matcher.longest_matches("ネコミミとネコとミミ")
+    assert [(start, word) for start, _, word, _ in matches] == [(0, "ネコミミ"), (5, "ネコ"), (8, "ミミ")]
+
+
+def test_longest_matches_prefers_earlier_start_over_longer_overlap():
+    matcher = KeywordMatcher(["ABC", "BCDEF"])
+    assert [word for _, _, word, _ in matcher.longest_matches("ABCDEF")] == ["ABC"]
+
+
+def test_keywords_in_drops_nested_words_and_lists_longest_first():
+    matcher = KeywordMatcher(["ネコ", "ミミ", "ネコミミ"])
+    # 「ネコミミ」の中の「ネコ」「ミミ」は強調ワードにしない
+    assert matcher.keywords_in("ネコミミが好き") == ["ネコミミ"]
+    # 単独で出てくれば含める。テロップ側の正規表現が長い語を先に試すよう、長い順に並べる
+    assert matcher.keywords_in("ミミとネコとネコミミ") == ["ネコミミ", "ネコ", "ミミ"]
+    assert matcher.keywords_in("イヌ") == []
+
+
+def test_best_label_uses_registration_priority():
+    matcher = KeywordMatcher({"nod": ["うん", "はい"], "jump": ["やった"]})
+    assert matcher.best_label("やった、はい！") == "nod"
+    assert matcher.labels_in("やった、はい！") == ["nod", "jump"]
+    assert matcher.best_label("いいえ", default="none") == "none"
+
+
+def test_scores_add_weights_of_every_hit():
+    matcher = KeywordMatcher({"jump": {"ジャンプ": 1}, "big_jump": {"大ジャンプ": 2}})
+    # 「大ジャンプ」の中の「ジャンプ」も jump のヒットとして数える
+    assert matcher.scores("大ジャンプ！ジャンプ！") == {"big_jump": 2.0, "jump": 2.0}
+
+
+def test_best_scored_label_prefers_higher_score():
+    matcher = KeywordMatcher({"jump": {"ジャンプ": 1}, "big_jump": {"大ジャンプ": 2}})
+    assert matcher.best_scored_label("大ジャンプ！") == "big_jump"
+    assert matcher.best_scored_label("ジャンプ！ジャンプ！ジャンプ！") == "jump"
+    assert matcher.best_scored_label("歩く", default="none") == "none"
+
+
+def test_best_scored_label_breaks_ties_by_registration_order():
+    table = {"first": {"あ": 1}, "second": {"い": 1}}
+    assert KeywordMatcher(table).best_scored_label("いあ") == "first"
+    reversed_table = {"second": {"い": 1}, "first": {"あ": 1}}
+    assert KeywordMatcher(reversed_table).best_scored_label("いあ") == "second"
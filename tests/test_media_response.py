@@ -0,0 +1,26 @@
+"""Range ヘッダーの解釈（media_response.py）のテスト"""
+
+import pytest
+
+from media_response import parse_range
+
+
+def test_parse_range():
+    assert parse_range("bytes=0-99", 1000) == (0, 99)
+    assert parse_range("bytes=900-", 1000) == (900, 999)
+    assert parse_range("bytes=-100", 1000) == (900, 999)
+    assert parse_range("bytes=-5000", 1000) == (0, 999)
+    assert parse_range("bytes=0-5000", 1000) == (0, 999)
+    assert parse_range("bytes=0-1,5-6", 1000) is None
+
+
+@pytest.mark.parametrize("header", ["bytes=1000-", "bytes=-0", "bytes=5-2"])
+def test_unsatisfiable_range(header):
+    with pytest.raises(ValueError):
+        parse_range(header, 1000)
+
+
+@pytest.mark.parametrize("header", ["bytes=-100", "bytes=0-", "bytes=0-0"])
+def test_empty_file_is_unsatisfiable(header):
+    with pytest.raises(ValueError):
+        parse_range(header, 0)
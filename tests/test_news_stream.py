@@ -0,0 +1,79 @@
+"""ニュース動画の常駐生成（news_stream.py）のテスト"""
+
+import json
+import wave
+
+import pytest
+
+import news_stream
+import scene_store
+
+
+class FakeVoicevox:
+    """音声合成の代わりに1秒の無音WAVを書き出すクライアント"""
+    def __init__(self):
+        self.jobs = []
+
+    def sync_user_dict(self):
+        pass
+
+    def synthesize_many(self, jobs):
+        for job in jobs:
+            self.jobs.append(job)
+            with wave.open(job["output_path"], "wb") as f:
+                f.setnchannels(1)
+                f.setsampwidth(2)
+                f.setframerate(24000)
+                f.writeframes(b"\0\0" * 24000)
+        return [True] * len(jobs)
+
+
+ITEM = {"key": "abc123", "title": "新作ゲーム発表", "summary": "発売日が決まりました"}
+
+
+@pytest.fixture
+def public(tmp_path, monkeypatch):
+    monkeypatch.setattr(scene_store, "HISTORY_ROOT", str(tmp_path / "history"))
+    monkeypatch.setattr(news_stream, "VIDEO_PUBLIC_DIR", str(tmp_path))
+    return tmp_path
+
+
+def _prepare(public, monkeypatch, image_ok, client):
+    def fake_download(query, output_path):
+        if image_ok:
+            with open(output_path, "wb") as f:
+                f.write(b"jpeg")
+        return image_ok
+
+    monkeypatch.setattr(news_stream, "download_image_pexels", fake_download)
+    props_path = news_stream.prepare_news_item(ITEM, client)
+    with open(props_path, encoding="utf-8") as f:
+        return json.load(f)["scenes"]
+
+
+def test_prepare_uses_downloaded_image(public, monkeypatch):
+    client = FakeVoicevox()
+    scenes = _prepare(public, monkeypatch, True, client)
+    assert {scene["image"] for scene in scenes} == {"news/abc123/news_main.jpg"}
+    assert all(scene["audio"].startswith("news/abc123/audio/") for scene in scenes)
+    assert len(client.jobs) == len(scenes)
+
+
+def test_prepare_falls_back_when_image_download_fails(public, monkeypatch, capsys):
+    scenes = _prepare(public, monkeypatch, False, FakeVoicevox())
+    assert scenes
+    assert {scene["image"] for scene in scenes} == {news_stream.FALLBACK_IMAGE}
+    assert "画像を取得できなかった" in capsys.readouterr().out
+
+
+def test_stream_shares_one_voicevox_client(public, monkeypatch):
+    client = FakeVoicevox()
+    stream = news_stream.NewsStream(ingester=object(), prepare_workers=3, client=client)
+    used = []
+    monkeypatch.setattr(news_stream, "prepare_news_item", lambda item, c: used.append(c) or "props.json")
+    stream.render_queue = news_stream.queue.Queue()
+    for key in ("a", "b"):
+        stream.prepare_queue.put({"key": key, "title": key})
+    stream.prepare_queue.put(None)
+    stream._prepare_loop()
+    assert used == [client, client]
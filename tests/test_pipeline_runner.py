@@ -0,0 +1,40 @@
+"""パイプラインランナー（pipeline_runner.py）のテスト"""
+
+import pytest
+
+from pipeline_runner import Stage, run_pipeline
+
+
+def test_unchanged_stage_is_skipped(tmp_path):
+    src = tmp_path / "in.txt"
+    out = tmp_path / "out.txt"
+    src.write_text("a")
+    state = str(tmp_path / "state.json")
+
+    def build():
+        out.write_text(src.read_text().upper())
+
+    stages = [Stage("build", build, inputs=[str(src)], outputs=[str(out)])]
+    assert run_pipeline(stages, state_path=state) == ["build"]
+    assert run_pipeline(stages, state_path=state) == []
+    src.write_text("b")
+    assert run_pipeline(stages, state_path=state) == ["build"]
+    assert out.read_text() == "B"
+
+
+def test_missing_output_fails_and_is_retried(tmp_path):
+    out = tmp_path / "out.txt"
+    state = str(tmp_path / "state.json")
+    calls = []
+
+    def build():
+        calls.append(1)
+        if len(calls) > 1:
+            out.write_text("ok")
+
+    stages = [Stage("build", build, outputs=[str(out)])]
+    with pytest.raises(RuntimeError):
+        run_pipeline(stages, state_path=state)
+    # 失敗したステージは記録されないので、次回は再実行される
+    assert run_pipeline(stages, state_path=state) == ["build"]
+    assert run_pipeline(stages, state_path=state) == []
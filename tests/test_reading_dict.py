@@ -0,0 +1,47 @@
+"""読み辞書（reading_dict.py）のテスト"""
+
+import os
+
+import reading_dict
+from reading_dict import ReadingDict, load_reading_dict
+from news_processor import fix_reading_errors
+
+
+def test_ascii_entries_do_not_match_inside_words():
+    text = "Steamで配信中のゲーム。displayとgameplayとPlayStation"
+    assert fix_reading_errors(text) == text
+
+
+def test_ascii_entries_match_next_to_japanese_and_ignore_case():
+    assert fix_reading_errors("新作Gameの最新Update情報") == "新作ゲームのさいしんアップデート情報"
+    assert fix_reading_errors("game review") == "ゲーム レビュー"
+
+
+def test_longest_entry_wins():
+    reading = ReadingDict({"Monster": "モンスター", "Monster Hunter": "モンハン"})
+    assert reading.apply("Monster Hunter Wilds") == "モンハン Wilds"
+
+
+def test_non_ascii_entries_match_anywhere():
+    reading = ReadingDict({"！！": "！", "ｗｗｗ": "わらわらわら"})
+    assert reading.apply("まじか！！ｗｗｗ") == "まじか！わらわらわら"
+
+
+def test_case_sensitive_dict():
+    reading = ReadingDict({"Play": "プレイ"}, ignore_case=False)
+    assert reading.apply("Play play") == "プレイ play"
+
+
+def test_edited_dict_file_replaces_cached_entry(tmp_path):
+    path = tmp_path / "words.tsv"
+    path.write_text("猫\tねこ\n", encoding="utf-8")
+    os.utime(path, (1_000_000_000, 1_000_000_000))
+    first = load_reading_dict(str(path))
+    assert first.apply("猫") == "ねこ"
+    assert load_reading_dict(str(path)) is first
+
+    path.write_text("猫\tにゃんこ\n", encoding="utf-8")
+    os.utime(path, (1_000_000_100, 1_000_000_100))
+    assert load_reading_dict(str(path)).apply("猫") == "にゃんこ"
+    # 更新前の辞書は残さず、同じファイルの組み合わせにつき1つだけ持つ
+    assert [key for key in reading_dict._cache if str(path) in key] == [(str(path),)]
@@ -0,0 +1,166 @@
+"""シーンJSONの読み書き（scene_store.py）のテスト"""
+
+import json
+import os
+import threading
+
+import pytest
+
+import json_io
+import scene_store
+from scene_store import SceneStore, atomic_write_json
+
+
+@pytest.fixture
+def path(tmp_path, monkeypatch):
+    monkeypatch.setattr(scene_store, "HISTORY_ROOT", str(tmp_path / "history"))
+    return str(tmp_path / "cat_data.json")
+
+
+def _scenes(*texts):
+    return [{"id": i + 1, "text": text} for i, text in enumerate(texts)]
+
+
+def test_atomic_write_keeps_old_file_on_failure(tmp_path, monkeypatch):
+    target = tmp_path / "data.json"
+    atomic_write_json(str(target), {"v": 1})
+
+    def broken_dumps(data, pretty=False):
+        raise RuntimeError("書き込み中に失敗")
+
+    monkeypatch.setattr(json_io, "dumps", broken_dumps)
+    with pytest.raises(RuntimeError):
+        atomic_write_json(str(target), {"v": 2})
+    assert json.loads(target.read_text()) == {"v": 1}
+    assert os.listdir(tmp_path) == ["data.json"]
+
+
+def test_atomic_write_keeps_old_file_when_replace_fails(tmp_path, monkeypatch):
+    target = tmp_path / "data.json"
+    atomic_write_json(str(target), {"v": 1})
+
+    def broken_replace(src, dst):
+        raise OSError("replace に失敗")
+
+    monkeypatch.setattr(scene_store.os, "replace", broken_replace)
+    with pytest.raises(OSError):
+        atomic_write_json(str(target), {"v": 2})
+    assert json.loads(target.read_text()) == {"v": 1}
+    assert os.listdir(tmp_path) == ["data.json"]
+
+
+def test_revision_increases_on_each_write(path):
+    store = SceneStore(path)
+    assert store.revision() == 0
+    assert store.write(_scenes("a")) == 1
+    assert store.update(lambda scenes: scenes.append({"id": 2, "text": "b"})) == 2
+    # 内容が変わらない update は書き込まない
+    assert store.update(lambda scenes: None) == 2
+    assert store.read() == (_scenes("a", "b"), 2)
+
+
+def test_revision_counts_writes_outside_the_store(path):
+    store = SceneStore(path)
+    store.write(_scenes("a"))
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(_scenes("手で編集"), f)
+    os.utime(path, ns=(0, os.stat(path).st_mtime_ns + 1))
+    assert store.revision() == 2
+
+
+def test_write_with_stale_revision_conflicts(path):
+    store = SceneStore(path)
+    _, revision = store.read()
+    store.write(_scenes("a"))
+    with pytest.raises(scene_store.RevisionConflict):
+        store.write(_scenes("b"), expected_revision=revision)
+
+
+def test_undo_restores_previous_states_exactly(path):
+    store = SceneStore(path)
+    states = [_scenes("a", "b", "c")]
+    store.write(states[0])
+
+    def edit(scenes):
+        scenes[1]["text"] = "B"
+
+    def remove_first(scenes):
+        return scenes[1:]
+
+    def reorder(scenes):
+        scenes.reverse()
+        scenes.append({"id": 9, "text": "new"})
+
+    for func in (edit, remove_first, reorder):
+        store.update(func)
+        states.append(store.read()[0])
+
+    for expected in reversed(states[:-1]):
+        store.undo()
+        assert store.read()[0] == expected
+    # 最初の書き込みも取り消せる（ファイルがなかった状態 = 空のリスト）
+    store.undo()
+    assert store.read()[0] == []
+    with pytest.raises(IndexError):
+        store.undo()
+    # 取り消しも1リビジョンとして数える
+    assert store.revision() == 8
+
+
+def test_undo_without_ids_restores_full_content(path):
+    store = SceneStore(path)
+    store.write([{"text": "id なし"}])
+    store.write([{"text": "変更後"}])
+    store.undo()
+    assert store.read()[0] == [{"text": "id なし"}]
+
+
+def test_history_is_capped(path, monkeypatch):
+    monkeypatch.setattr(scene_store, "MAX_HISTORY", 3)
+    store = SceneStore(path)
+    for i in range(6):
+        store.write(_scenes(str(i)))
+
+    deltas = [name for name in os.listdir(store.history_dir) if name[0].isdigit()]
+    assert len(deltas) == 3
+    for expected in ("4", "3", "2"):
+        store.undo()
+        assert store.read()[0] == _scenes(expected)
+    with pytest.raises(IndexError):
+        store.undo()
+
+
+def test_concurrent_updates_do_not_lose_writes(path):
+    SceneStore(path).write([{"id": 1, "count": 0}])
+    # 別々の SceneStore（別々のファイルハンドルのロック）でプロセス間の競合を模す
+    stores = [SceneStore(path) for _ in range(4)]
+
+    def increment(scenes):
+        scenes[0]["count"] += 1
+
+    def worker(store):
+        for _ in range(25):
+            store.update(increment)
+
+    threads = [threading.Thread(target=worker, args=(store,)) for store in stores]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    scenes, revision = SceneStore(path).read()
+    assert scenes[0]["count"] == 100
+    assert revision == 101
+
+
+def test_rewrite_applies_to_history(path):
+    store = SceneStore(path)
+    store.write([{"id": 1, "audio": "audio/a.wav"}])
+    store.write([{"id": 1, "audio": "audio/a.wav", "text": "x"}])
+
+    def move(obj):
+        return json.loads(json.dumps(obj).replace("audio/a.wav", "blobs/a.wav"))
+
+    store.rewrite(move)
+    assert store.read()[0] == [{"id": 1, "audio": "blobs/a.wav", "text": "x"}]
+    store.undo()
+    assert store.read()[0] == [{"id": 1, "audio": "blobs/a.wav"}]
@@ -0,0 +1,85 @@
+"""台本コンパイラ（script_compiler.py）のテスト"""
+
+import os
+import wave
+
+import pytest
+
+from script_compiler import SCRIPTS_DIR, compile_scenes, load_script
+
+
+class FakeVoicevox:
+    """音声合成の代わりに1秒の無音WAVを書き出すクライアント"""
+    def __init__(self):
+        self.jobs = []
+
+    def sync_user_dict(self):
+        pass
+
+    def synthesize_many(self, jobs):
+        for job in jobs:
+            self.jobs.append(job)
+            with wave.open(job["output_path"], "wb") as f:
+                f.setnchannels(1)
+                f.setsampwidth(2)
+                f.setframerate(24000)
+                f.writeframes(b"\0\0" * 24000)
+        return [True] * len(jobs)
+
+
+class FakePexels:
+    def __init__(self):
+        self.queries = []
+
+    def download(self, query, output_path):
+        self.queries.append(query)
+        return True
+
+
+def _compile(script, tmp_path, **kwargs):
+    client = FakeVoicevox()
+    scenes = compile_scenes(script, str(tmp_path), client=client, image_client=FakePexels(), **kwargs)
+    return scenes, client
+
+
+def test_cut_in_audio_name_and_passthrough(tmp_path):
+    script = {
+        "name": "demo",
+        "cut_in": True,
+        "direction": {"section": "main"},
+        "camera": {"preset": "center"},
+        "scenes": [
+            {"speaker": "kanon", "emotion": "happy", "action": "nod", "title": "A", "text": "こんにちは"},
+            {"speaker": "zundamon", "emotion": "normal", "action": "none", "title": "B", "text": "なのだ",
+             "type": "comment", "comment_text": "コメント"},
+            {"speaker": "kanon", "emotion": "happy", "action": "wave", "title": "C", "text": "またね",
+             "cut_in": False, "audio": "ending_0", "direction": {"section": "ending_fixed"}},
+        ],
+    }
+    scenes, _ = _compile(script, tmp_path)
+
+    assert [s["speaker"] for s in scenes] == ["system", "kanon", "system", "zundamon", "kanon"]
+    assert [s["id"] for s in scenes] == [1, 2, 3, 4, 5]
+    assert [s["audio"] for s in scenes] == ["", "audio/demo_0.wav", "", "audio/demo_1.wav", "audio/ending_0.wav"]
+    assert scenes[0]["direction"]["section"] == "main"
+    assert scenes[0]["camera"] == {"preset": "zoom_in"}
+    assert scenes[1]["camera"] == {"preset": "center"}
+    assert scenes[3]["comment_text"] == "コメント"
+    assert scenes[4]["direction"]["section"] == "ending_fixed"
+    assert scenes[4]["duration"] == pytest.approx(1.0)
+    assert not any(key.startswith("_") for s in scenes for key in s)
+
+
+def test_speech_filter_applies_to_spoken_text_only(tmp_path):
+    script = {"scenes": [{"speaker": "kanon", "emotion": "normal", "action": "none", "text": "「やあ」"}]}
+    scenes, client = _compile(script, tmp_path, speech_filter=lambda t: t.strip("「」"))
+    assert client.jobs[0]["text"] == "やあ"
+    assert scenes[0]["text"] == "「やあ」"
+
+
+@pytest.mark.parametrize("name", ["cat.yaml", "lionlop.yaml", "mh_suumo.yaml", "thread.yaml", "isekai.yaml"])
+def test_bundled_scripts_compile(tmp_path, name):
+    script = load_script(os.path.join(SCRIPTS_DIR, name))
+    scenes, client = _compile(script, tmp_path)
+    assert len(client.jobs) == len(script["scenes"])
+    assert all(s["duration"] > 0 for s in scenes)
@@ -0,0 +1,83 @@
+"""字幕の分割（subtitle_segmenter.py）のテスト"""
+
+import pytest
+
+from subtitle_segmenter import SubtitleSegmenter, NO_LINE_START, display_width
+from news_processor import split_text_into_scenes
+
+SUMMARY = ("内容を詳しく見ていきましょう。これは長い要約の文章で、いろいろな情報が含まれているので"
+           "読むのが大変な感じのテキストになっていますよ...とのことですよ。")
+TEXTS = [
+    SUMMARY,
+    "みなさん、こんにちは！ゲームナビゲーターのカノンです！今日の注目ニュースはこちら！",
+    "あ" * 97,
+    "RTX2060で60fps出すのにフレーム生成必須なんて、ずんだもんは認めないのだ！" * 3,
+    "『長いロード時間』に『コンテンツ不足』、挙句の果てには『スマホの暖房器具』なんて言われてたわ。",
+]
+
+
+def test_display_width():
+    assert display_width("あいう") == 6
+    assert display_width("abc") == 3
+    assert display_width("…") == 2
+
+
+@pytest.mark.parametrize("text", TEXTS)
+@pytest.mark.parametrize("line_width,max_lines", [(40, 2), (20, 2), (30, 3), (16, 1)])
+def test_lines_fit_width_and_scenes_fit_max_lines(text, line_width, max_lines):
+    segmenter = SubtitleSegmenter(line_width=line_width, max_lines=max_lines)
+    scenes = segmenter.scene_lines(text)
+    assert "".join(line for scene in scenes for line in scene) == text.replace(" ", "")
+    for scene in scenes:
+        assert 1 <= len(scene) <= max_lines
+        for line in scene:
+            # 行末の句読点1文字だけはぶら下げを許す
+            assert segmenter.display_width(line.rstrip("、。，．,.」』）)")) <= line_width
+            assert line[0] not in NO_LINE_START
+
+
+@pytest.mark.parametrize("text", TEXTS)
+def test_no_short_tail_scene(text):
+    segmenter = SubtitleSegmenter(line_width=40, max_lines=2)
+    scenes = segmenter.scenes(text)
+    if len(scenes) > 1:
+        assert segmenter.display_width(scenes[-1].replace("\n", "")) >= 20
+
+
+def test_news_summary_does_not_end_with_orphan():
+    scenes = split_text_into_scenes(SUMMARY)
+    assert scenes[-1] != "よ。"
+    assert all(len(scene.split("\n")) <= 2 for scene in scenes)
+
+
+def test_short_tail_is_merged_when_it_fits():
+    segmenter = SubtitleSegmenter(line_width=20, max_lines=3)
+    # 2行ずつに収まらない場合でも、前のシーンに空きがあれば1つにまとめる
+    assert segmenter.scene_lines("あいうえおかきくけこ。さしすせそ。") == [["あいうえおかきくけこ。", "さしすせそ。"]]
+
+
+def test_breaks_after_sentence_end_and_ellipsis():
+    segmenter = SubtitleSegmenter(line_width=30)
+    assert segmenter.lines("今日はいい天気ですね。明日も晴れるといいな") == ["今日はいい天気ですね。", "明日も晴れるといいな"]
+    assert segmenter.lines("それはつまりこういう...ことなのだ") == ["それはつまりこういう...", "ことなのだ"]
+    assert segmenter.lines("それはつまりこういう…ことなのだよね") == ["それはつまりこういう…", "ことなのだよね"]
+    # 小数点では区切らない
+    assert segmenter.lines("体重は約1.5キロから3キロほど") == ["体重は約1.5キロから3キロほど"]
+
+
+def test_kinsoku_and_hanging_punctuation():
+    segmenter = SubtitleSegmenter(line_width=10)
+    # 幅ちょうどの位置の次が句点なら、前の行にぶら下げる
+    assert segmenter.lines("あいうえお。かきくけこ") == ["あいうえお。", "かきくけこ"]
+    # 区切り候補がなくても、長音・小書きの仮名を行頭にしない
+    lines = segmenter.lines("アイウエオーカキクケコッサシスセソ")
+    assert all(line[0] not in NO_LINE_START for line in lines)
+    assert lines[0] == "アイウエ"
+
+
+def test_breaks_after_particle_but_not_inside_words():
+    segmenter = SubtitleSegmenter(line_width=24)
+    # 助詞の後（次が漢字）で区切り、ひらがなの途中では切らない
+    assert segmenter.lines("新しいゲーム機本体が発売日に値上げ") == ["新しいゲーム機本体が", "発売日に値上げ"]
+    # 区切り候補が行の半分より前にしかない場合は幅ちょうどで切る
+    assert segmenter.lines("はアイウエオカキクケコサシスセソ")[0] == "はアイウエオカキクケコサ"
@@ -0,0 +1,142 @@
+"""
+VOICEVOX ユーザー辞書の同期（voicevox_dict.py）のテスト
+ユーザー辞書APIだけを持つ代わりのエンジンをローカルに立てて確認します。
+"""
+
+import json
+import socket
+import threading
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+import requests
+
+from voicevox_client import VoicevoxClient
+from voicevox_dict import load_user_dict, sync_user_dict
+
+
+def _to_fullwidth(text):
+    # 本物のエンジンと同じく、表記の英数字を全角にして保存する
+    return "".join(chr(ord(c) + 0xFEE0) if "!" <= c <= "~" else c for c in text)
+
+
+class FakeEngine:
+    def __init__(self):
+        self.words = {}
+        self.requests = []
+        engine = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def _reply(self, status, body=None):
+                data = json.dumps(body).encode("utf-8") if body is not None else b""
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def _word(self):
+                query = {k: v[0] for k, v in parse_qs(urlparse(self.path).query).items()}
+                return {"surface": _to_fullwidth(query["surface"]), "pronunciation": query["pronunciation"],
+                        "accent_type": int(query["accent_type"])}
+
+            def do_GET(self):
+                engine.requests.append(("GET", urlparse(self.path).path))
+                self._reply(200, engine.words)
+
+            def do_POST(self):
+                engine.requests.append(("POST", urlparse(self.path).path))
+                word_uuid = str(uuid.uuid4())
+                engine.words[word_uuid] = self._word()
+                self._reply(200, word_uuid)
+
+            def do_PUT(self):
+                path = urlparse(self.path).path
+                engine.requests.append(("PUT", path))
+                engine.words[path.rsplit("/", 1)[1]] = self._word()
+                self._reply(204)
+
+            def do_DELETE(self):
+                path = urlparse(self.path).path
+                engine.requests.append(("DELETE", path))
+                del engine.words[path.rsplit("/", 1)[1]]
+                self._reply(204)
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def writes(self):
+        return [method for method, _ in self.requests if method != "GET"]
+
+
+@pytest.fixture
+def engine():
+    engine = FakeEngine()
+    yield engine
+    engine.server.shutdown()
+    engine.server.server_close()
+
+
+@pytest.fixture
+def closed_url():
+    # 使われていないポート（接続が拒否される）
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return f"http://127.0.0.1:{s.getsockname()[1]}"
+
+
+def _write_dict(tmp_path, lines):
+    path = tmp_path / "user_dict.tsv"
+    path.write_text("# コメント\n" + "\n".join(lines) + "\n", encoding="utf-8")
+    return str(path)
+
+
+def test_sync_only_sends_differences(engine, tmp_path):
+    path = _write_dict(tmp_path, ["サ終\tサシュウ\t0", "SUUMO\tすーも\t1"])
+    assert sync_user_dict(engine.url, path) == {"added": 2, "updated": 0, "deleted": 0, "unchanged": 0}
+    surfaces = {w["surface"]: w["pronunciation"] for w in engine.words.values()}
+    assert surfaces == {"サ終": "サシュウ", "ＳＵＵＭＯ": "スーモ"}
+
+    # 2回目は全角で保存された表記とも一致するので、何も送らない
+    engine.requests.clear()
+    assert sync_user_dict(engine.url, path)["unchanged"] == 2
+    assert engine.writes() == []
+
+    path = _write_dict(tmp_path, ["サ終\tサシュウ\t1", "SUUMO\tスーモ\t1"])
+    engine.requests.clear()
+    assert sync_user_dict(engine.url, path) == {"added": 0, "updated": 1, "deleted": 0, "unchanged": 1}
+    assert engine.writes() == ["PUT"]
+
+
+def test_prune_deletes_words_not_in_project_dict(engine, tmp_path):
+    sync_user_dict(engine.url, _write_dict(tmp_path, ["サ終\tサシュウ\t0", "釣り人\tツリビト\t0"]))
+    path = _write_dict(tmp_path, ["サ終\tサシュウ\t0"])
+    assert sync_user_dict(engine.url, path)["deleted"] == 0
+    assert sync_user_dict(engine.url, path, prune=True)["deleted"] == 1
+    assert [w["surface"] for w in engine.words.values()] == ["サ終"]
+
+
+def test_engine_down(closed_url, tmp_path):
+    path = _write_dict(tmp_path, ["サ終\tサシュウ\t0"])
+    with pytest.raises(requests.ConnectionError):
+        sync_user_dict(closed_url, path)
+    # 生成スクリプトから使うクライアントは警告だけ出して続行する
+    VoicevoxClient(base_url=closed_url).sync_user_dict()
+
+
+def test_client_retries_until_engine_is_up(engine, closed_url):
+    client = VoicevoxClient(base_url=closed_url)
+    assert client.sync_user_dict() is False
+    # 失敗した後も、エンジンが起動すれば次の呼び出しで同期する（プロジェクトの辞書を登録する）
+    client.base_url = engine.url
+    assert client.sync_user_dict() is True
+    assert len(engine.words) == len(load_user_dict())
+    engine.requests.clear()
+    assert client.sync_user_dict() is True
+    assert engine.requests == []
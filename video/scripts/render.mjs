@@ -0,0 +1,59 @@
+// Remotion のレンダリングを Node API で実行し、進捗を1行1JSONで標準出力に書き出す。
+// Python 側（src/remotion_render.py）がこの出力を読んでジョブの状態を更新する。
+// 常駐させて複数のジョブを処理する場合は render_worker.mjs を使う。
+//
+//   node scripts/render.mjs --composition=EditorExport --output=out/export.mp4 --props=render_props.json
+//   node scripts/render.mjs --bundle-only     # バンドルだけ作っておく（サーバー起動時用）
+//
+// オプションは remotion render と同じ名前（--scale, --codec, --crf, --image-format,
+// --jpeg-quality, --concurrency, --log）を受け付ける。--fps は props.fps としてコンポジションに渡す。
+// バンドルのキャッシュについては render_lib.mjs を参照。
+//
+// 出力する行:
+//   {"type":"phase","phase":"bundling"|"selecting"|"rendering"|"encoding"}
+//   {"type":"progress","phase":...,"progress":0-1,"renderedFrames":n,"encodedFrames":n,
+//    "totalFrames":n,"fps":n,"eta":秒}
+//   {"type":"done","output":パス,"elapsed":秒}
+//   {"type":"error","message":...}
+
+import path from 'node:path';
+import { renderMedia, selectComposition } from '@remotion/renderer';
+import { VIDEO_DIR, emit, parseArgs, getBundle, readProps, renderOptions, progressReporter } from './render_lib.mjs';
+
+const main = async () => {
+    const args = parseArgs(process.argv.slice(2));
+    if (args['bundle-only']) {
+        const serveUrl = await getBundle();
+        emit({ type: 'done', bundle: serveUrl });
+        return;
+    }
+    const compositionId = args.composition || 'VisionForgeLong';
+    const output = path.resolve(VIDEO_DIR, args.output || `out/${compositionId}.mp4`);
+    const inputProps = readProps(args.props, args.fps);
+    const options = renderOptions(args);
+    const startedAt = Date.now();
+
+    const serveUrl = await getBundle();
+
+    emit({ type: 'phase', phase: 'selecting' });
+    const composition = await selectComposition({
+        serveUrl, id: compositionId, inputProps, logLevel: options.logLevel,
+    });
+
+    await renderMedia({
+        ...options,
+        serveUrl,
+        composition,
+        inputProps,
+        outputLocation: output,
+        overwrite: true,
+        onProgress: progressReporter(composition, emit),
+    });
+
+    emit({ type: 'done', output, elapsed: (Date.now() - startedAt) / 1000 });
+};
+
+main().catch((err) => {
+    emit({ type: 'error', message: err && err.message ? err.message : String(err) });
+    process.exit(1);
+});
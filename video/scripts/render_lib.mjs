@@ -0,0 +1,183 @@
+// render.mjs（1回実行）と render_worker.mjs（常駐ワーカー）で共有する処理。
+//
+// webpack のバンドルは video/src・package-lock.json・remotion.config.ts のハッシュをキーに
+// work/remotion-bundle/ にキャッシュし、ソースが変わらない限り再利用する。
+// バンドル内の public はコピーせず video/public へのリンクにするので、
+// 後から生成された音声や画像もそのまま参照できる。
+
+import path from 'node:path';
+import fs from 'node:fs';
+import crypto from 'node:crypto';
+import { fileURLToPath } from 'node:url';
+import { bundle } from '@remotion/bundler';
+
+export const VIDEO_DIR = path.resolve(path.dirname(fileURLToPath(import.meta.url)), '..');
+const BUNDLE_CACHE_DIR = path.resolve(VIDEO_DIR, '..', 'work', 'remotion-bundle');
+// バンドルのキーに含めるファイル・ディレクトリ
+const BUNDLE_INPUTS = ['src', 'package-lock.json', 'remotion.config.ts'];
+// 残しておく古いバンドルの数
+const KEEP_BUNDLES = 2;
+// 進捗行を出す最短間隔（ミリ秒）
+const EMIT_INTERVAL = 250;
+// 全体の進捗のうちバンドルが占める割合
+const BUNDLE_WEIGHT = 0.05;
+
+export const emit = (event) => {
+    process.stdout.write(JSON.stringify(event) + '\n');
+};
+
+export const parseArgs = (argv) => {
+    const args = {};
+    for (const arg of argv) {
+        const match = arg.match(/^--([^=]+)(?:=(.*))?$/);
+        if (match) {
+            args[match[1]] = match[2] === undefined ? true : match[2];
+        }
+    }
+    return args;
+};
+
+const hashInputs = () => {
+    const hash = crypto.createHash('sha256');
+    const visit = (rel) => {
+        const full = path.join(VIDEO_DIR, rel);
+        if (!fs.existsSync(full)) return;
+        if (fs.statSync(full).isDirectory()) {
+            for (const name of fs.readdirSync(full).sort()) {
+                visit(path.join(rel, name));
+            }
+            return;
+        }
+        hash.update(rel.split(path.sep).join('/'));
+        hash.update(fs.readFileSync(full));
+    };
+    BUNDLE_INPUTS.forEach(visit);
+    return hash.digest('hex').slice(0, 16);
+};
+
+const pruneBundles = (keep) => {
+    const entries = fs.readdirSync(BUNDLE_CACHE_DIR)
+        .filter((name) => name !== keep && !name.startsWith('.'))
+        .map((name) => ({ name, mtime: fs.statSync(path.join(BUNDLE_CACHE_DIR, name)).mtimeMs }))
+        .sort((a, b) => b.mtime - a.mtime);
+    for (const entry of entries.slice(KEEP_BUNDLES - 1)) {
+        const dir = path.join(BUNDLE_CACHE_DIR, entry.name);
+        // リンク先の video/public を消さないよう、先にリンクだけ外す
+        const publicLink = path.join(dir, 'public');
+        if (fs.existsSync(publicLink) && fs.lstatSync(publicLink).isSymbolicLink()) {
+            fs.unlinkSync(publicLink);
+        }
+        fs.rmSync(dir, { recursive: true, force: true });
+    }
+};
+
+// ソースが変わっていなければキャッシュ済みのバンドルを返し、変わっていればビルドする
+export const getBundle = async (onEvent = emit) => {
+    const key = hashInputs();
+    const bundleDir = path.join(BUNDLE_CACHE_DIR, key);
+    if (fs.existsSync(path.join(bundleDir, 'index.html'))) {
+        // 使ったバンドルを新しい扱いにして、古い順の削除対象から外す
+        const now = new Date();
+        fs.utimesSync(bundleDir, now, now);
+        onEvent({ type: 'phase', phase: 'bundling', cached: true, bundle: key });
+        return bundleDir;
+    }
+
+    onEvent({ type: 'phase', phase: 'bundling', cached: false, bundle: key });
+    fs.mkdirSync(BUNDLE_CACHE_DIR, { recursive: true });
+    const tmpDir = path.join(BUNDLE_CACHE_DIR, `.tmp-${key}-${process.pid}`);
+    const emptyPublic = path.join(BUNDLE_CACHE_DIR, `.public-${process.pid}`);
+    fs.mkdirSync(emptyPublic, { recursive: true });
+    let lastBundleEmit = 0;
+    try {
+        await bundle({
+            entryPoint: path.join(VIDEO_DIR, 'src', 'index.ts'),
+            outDir: tmpDir,
+            // public は巨大になるのでコピーせず、後でリンクに差し替える
+            publicDir: emptyPublic,
+            onProgress: (percent) => {
+                const now = Date.now();
+                if (now - lastBundleEmit < EMIT_INTERVAL && percent < 100) return;
+                lastBundleEmit = now;
+                onEvent({ type: 'progress', phase: 'bundling', progress: (percent / 100) * BUNDLE_WEIGHT });
+            },
+        });
+        const bundledPublic = path.join(tmpDir, 'public');
+        fs.rmSync(bundledPublic, { recursive: true, force: true });
+        // Windows でも管理者権限なしで作れるようジャンクションを使う
+        fs.symlinkSync(path.join(VIDEO_DIR, 'public'), bundledPublic, 'junction');
+        try {
+            fs.renameSync(tmpDir, bundleDir);
+        } catch (err) {
+            // 同時に別のプロセスが同じバンドルを作り終えていた場合はそちらを使う
+            if (!fs.existsSync(path.join(bundleDir, 'index.html'))) throw err;
+            fs.unlinkSync(bundledPublic);
+            fs.rmSync(tmpDir, { recursive: true, force: true });
+        }
+    } finally {
+        fs.rmSync(emptyPublic, { recursive: true, force: true });
+    }
+    pruneBundles(key);
+    return bundleDir;
+};
+
+// props を省略したレンダリングでも最新の cat_data.json を使う。
+// コンポジションが import している cat_data.json はバンドルに埋め込まれていて、バンドルのキャッシュでは
+// 古いままになるため、実行時に読み直して props として渡す（バンドルのキーには含めない）
+const DEFAULT_SCENES = path.join(VIDEO_DIR, 'public', 'cat_data.json');
+
+const loadProps = (props) => {
+    if (!props) {
+        if (!fs.existsSync(DEFAULT_SCENES)) return {};
+        return { scenes: JSON.parse(fs.readFileSync(DEFAULT_SCENES, 'utf-8')) };
+    }
+    if (typeof props === 'object') return props;
+    return JSON.parse(fs.readFileSync(path.resolve(VIDEO_DIR, props), 'utf-8'));
+};
+
+// --fps（レンダリングプロファイルの fps）は props.fps としてコンポジションの calculateMetadata に渡す。
+// props に fps が書かれていればそちらを優先する
+export const readProps = (props, fps) => {
+    const data = loadProps(props);
+    return fps ? { fps: Number(fps), ...data } : data;
+};
+
+// remotion render と同じ名前のオプション（--scale など）を renderMedia の引数に変換する
+export const renderOptions = (options) => ({
+    codec: options.codec || 'h264',
+    crf: options.crf ? Number(options.crf) : undefined,
+    scale: options.scale ? Number(options.scale) : 1,
+    imageFormat: options['image-format'] || 'jpeg',
+    jpegQuality: options['jpeg-quality'] ? Number(options['jpeg-quality']) : undefined,
+    concurrency: options.concurrency ? Number(options.concurrency) : null,
+    logLevel: options.log || 'warn',
+});
+
+// renderMedia の onProgress を、フェーズ・fps・残り時間つきのイベントに変換する
+export const progressReporter = (composition, onEvent) => {
+    const startedAt = Date.now();
+    let lastEmit = 0;
+    let phase = 'rendering';
+    onEvent({ type: 'phase', phase });
+    return ({ renderedFrames, encodedFrames, renderedDoneIn, progress }) => {
+        if (renderedDoneIn !== null && phase === 'rendering') {
+            phase = 'encoding';
+            onEvent({ type: 'phase', phase });
+        }
+        const now = Date.now();
+        if (now - lastEmit < EMIT_INTERVAL && progress < 1) return;
+        lastEmit = now;
+        const elapsed = (now - startedAt) / 1000;
+        const fps = elapsed > 0 ? renderedFrames / elapsed : 0;
+        onEvent({
+            type: 'progress',
+            phase,
+            progress: BUNDLE_WEIGHT + progress * (1 - BUNDLE_WEIGHT),
+            renderedFrames,
+            encodedFrames,
+            totalFrames: composition.durationInFrames,
+            fps: Math.round(fps * 10) / 10,
+            eta: progress > 0 ? Math.round((elapsed * (1 - progress)) / progress) : null,
+        });
+    };
+};
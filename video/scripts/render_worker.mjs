@@ -0,0 +1,132 @@
+// 常駐レンダリングワーカー。標準入力から1行1JSONのジョブを受け取り、
+// Chromium を起動したまま使い回して順番にレンダリングする。
+// Python 側のスケジューラ（src/render_pool.py）が起動・ジョブ投入・キャンセル・入れ替えを行う。
+//
+// 入力:
+//   {"type":"render","id":ジョブID,"composition":...,"output":...,"props":パスまたはオブジェクト,
+//    "options":{"scale":...,"codec":...,"concurrency":...}}   ※オプション名は render.mjs と同じ
+//   {"type":"cancel","id":ジョブID}
+//   {"type":"shutdown"}
+// 出力（ジョブのイベントには id が付く。形式は render.mjs と同じ）:
+//   {"type":"ready"} / {"type":"phase",...} / {"type":"progress",...}
+//   {"type":"done","id":...,"output":...} / {"type":"cancelled","id":...} / {"type":"error","id":...,"message":...}
+
+import path from 'node:path';
+import readline from 'node:readline';
+import { makeCancelSignal, openBrowser, renderMedia, selectComposition } from '@remotion/renderer';
+import { VIDEO_DIR, emit, getBundle, readProps, renderOptions, progressReporter } from './render_lib.mjs';
+
+let browser = null;
+let queue = Promise.resolve();
+// ジョブID → キャンセル関数（実行中・待機中のジョブ）
+const cancels = new Map();
+
+const ensureBrowser = async () => {
+    if (!browser) {
+        browser = await openBrowser('chrome', { logLevel: 'warn' });
+    }
+    return browser;
+};
+
+const closeBrowser = async () => {
+    if (browser) {
+        const current = browser;
+        browser = null;
+        await current.close({ silent: true }).catch(() => {});
+    }
+};
+
+const runJob = async (job) => {
+    const { id } = job;
+    const send = (event) => emit({ ...event, id });
+    const { cancelSignal, cancel } = makeCancelSignal();
+    let cancelled = false;
+    cancels.set(id, () => {
+        cancelled = true;
+        cancel();
+    });
+    const startedAt = Date.now();
+    try {
+        if (cancelled) throw new Error('cancelled');
+        const options = renderOptions(job.options || {});
+        const inputProps = readProps(job.props, (job.options || {}).fps);
+        const output = path.resolve(VIDEO_DIR, job.output);
+        const serveUrl = await getBundle(send);
+        const puppeteerInstance = await ensureBrowser();
+
+        send({ type: 'phase', phase: 'selecting' });
+        const composition = await selectComposition({
+            serveUrl, id: job.composition, inputProps, puppeteerInstance, logLevel: options.logLevel,
+        });
+        if (cancelled) throw new Error('cancelled');
+
+        await renderMedia({
+            ...options,
+            serveUrl,
+            composition,
+            inputProps,
+            puppeteerInstance,
+            cancelSignal,
+            outputLocation: output,
+            overwrite: true,
+            onProgress: progressReporter(composition, send),
+        });
+        send({ type: 'done', output, elapsed: (Date.now() - startedAt) / 1000 });
+    } catch (err) {
+        if (cancelled) {
+            send({ type: 'cancelled' });
+        } else {
+            send({ type: 'error', message: err && err.message ? err.message : String(err) });
+            // ブラウザが落ちている可能性があるので、次のジョブでは起動し直す
+            await closeBrowser();
+        }
+    } finally {
+        cancels.delete(id);
+    }
+};
+
+const shutdown = async () => {
+    for (const cancel of cancels.values()) cancel();
+    await queue.catch(() => {});
+    await closeBrowser();
+    process.exit(0);
+};
+
+const main = async () => {
+    await ensureBrowser();
+    emit({ type: 'ready', pid: process.pid });
+
+    const rl = readline.createInterface({ input: process.stdin });
+    rl.on('line', (line) => {
+        let message;
+        try {
+            message = JSON.parse(line);
+        } catch {
+            return;
+        }
+        if (message.type === 'render') {
+            // 待機中でもキャンセルできるよう、先に登録しておく
+            cancels.set(message.id, () => cancels.set(message.id, null));
+            queue = queue.then(() => {
+                if (cancels.get(message.id) === null) {
+                    cancels.delete(message.id);
+                    emit({ type: 'cancelled', id: message.id });
+                    return;
+                }
+                return runJob(message);
+            });
+        } else if (message.type === 'cancel') {
+            const cancel = cancels.get(message.id);
+            if (cancel) cancel();
+        } else if (message.type === 'shutdown') {
+            shutdown();
+        }
+    });
+    // 親プロセスが終了したら後片付けして終わる
+    rl.on('close', shutdown);
+};
+
+main().catch((err) => {
+    emit({ type: 'error', message: err && err.message ? err.message : String(err) });
+    process.exit(1);
+});
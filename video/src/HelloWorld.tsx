@@ -7,6 +7,7 @@ import React from 'react';
 import {
     AbsoluteFill,
     Audio,
+    interpolate,
     Sequence,
     staticFile,
     useCurrentFrame,
@@ -41,12 +42,14 @@ import threadDataRaw from '../public/cat_data.json';
 
 interface Props {
     isPreview?: boolean;
+    /** レンダリング時に --props で渡すシーンデータ（省略時は cat_data.json） */
+    scenes?: ThreadItem[];
 }
 
 /**
  * メインコンポジションコンポーネント
  */
-export const HelloWorld: React.FC<Props> = ({ isPreview = false }) => {
+export const HelloWorld: React.FC<Props> = ({ isPreview = false, scenes: sceneProps }) => {
     const { width } = useVideoConfig();
 
     // シーン管理フックを使用
@@ -57,7 +60,7 @@ export const HelloWorld: React.FC<Props> = ({ isPreview = false }) => {
         endingStartFrame,
         prevScene
     } = useSceneManager({
-        rawData: threadDataRaw as unknown as ThreadItem[]
+        rawData: sceneProps ?? (threadDataRaw as unknown as ThreadItem[])
     });
 
     const { currentScene, sceneFrame, isEndingScene, sceneIndex } = state;
@@ -84,6 +87,7 @@ export const HelloWorld: React.FC<Props> = ({ isPreview = false }) => {
             }}>
                 {/* BGMシーケンス */}
                 <BGMController
+                    scenes={scenes}
                     endingStartFrame={endingStartFrame}
                     totalDurationInFrames={totalDurationInFrames}
                 />
@@ -151,20 +155,46 @@ export const HelloWorld: React.FC<Props> = ({ isPreview = false }) => {
  * BGMコントローラー
  */
 interface BGMControllerProps {
+    scenes: ProcessedScene[];
     endingStartFrame: number;
     totalDurationInFrames: number;
 }
 
+/** ダッキングの切り替えにかけるフレーム数 */
+const DUCK_RAMP_FRAMES = 6;
+
 const BGMController: React.FC<BGMControllerProps> = ({
+    scenes,
     endingStartFrame,
     totalDurationInFrames
 }) => {
+    // シーン境界ごとの音量（Python側で計算済み）をなめらかにつなぐ。
+    // ゲインはこのBGMファイルで測っている（audio_mastering.py の DEFAULT_BGM）ので、ファイルを変える場合は両方そろえる
+    const bgmVolume = (frame: number) => {
+        let startFrame = 0;
+        let prevGain = scenes[0]?.mix.bgmGain ?? 0.15;
+        for (const scene of scenes) {
+            const endFrame = startFrame + scene.durationInFrames;
+            if (frame < endFrame) {
+                return interpolate(
+                    frame,
+                    [startFrame, startFrame + DUCK_RAMP_FRAMES],
+                    [prevGain, scene.mix.bgmGain],
+                    { extrapolateLeft: 'clamp', extrapolateRight: 'clamp' }
+                );
+            }
+            prevGain = scene.mix.bgmGain;
+            startFrame = endFrame;
+        }
+        return prevGain;
+    };
+
     return (
         <>
             <Sequence from={0} durationInFrames={endingStartFrame || totalDurationInFrames}>
                 <Audio
                     src={staticFile('bgm/bgm_cute_main.mp3')}
-                    volume={0.15}
+                    volume={bgmVolume}
                     loop
                 />
             </Sequence>
@@ -4,11 +4,11 @@ import { ZundamonEmotionTest } from './ZundamonEmotionTest';
 import { EditorPreview } from './remotion/compositions/EditorPreview';
 import catDataRaw from '../public/cat_data.json';
 
-const threadData = catDataRaw as { id: number; duration?: number }[];
+const threadData = catDataRaw as { id: number; duration?: number; padding?: number }[];
 
-const calculateDuration = (targetFps: number) => {
-    return threadData.reduce((acc, item) => {
-        return acc + Math.ceil((item.duration || 5) * targetFps);
+const calculateDuration = (targetFps: number, data = threadData) => {
+    return data.reduce((acc, item) => {
+        return acc + Math.ceil(((item.duration || 5) + (item.padding || 0)) * targetFps);
     }, 0);
 };
 
@@ -36,6 +36,10 @@ export const RemotionVideo: React.FC = () => {
                 width={720}
                 height={1280}
                 defaultProps={{ isPreview: true }}
+                calculateMetadata={({ props }: { props: any }) => {
+                    if (!props.scenes) return {};
+                    return { durationInFrames: calculateDuration(24, props.scenes) || 240 };
+                }}
             />
             {/* 本番エクスポート用：フルHD縦型（1080p、30fps） */}
             <Composition
@@ -46,6 +50,15 @@ export const RemotionVideo: React.FC = () => {
                 width={1080}
                 height={1920}
                 defaultProps={{ isPreview: false }}
+                calculateMetadata={({ props }: { props: any }) => {
+                    // パイプラインから --props でシーンが渡された場合はその尺を使う。
+                    // fps はレンダリングプロファイル（draft / proxy / final）から props.fps で渡される
+                    const fps = props.fps || 30;
+                    return {
+                        durationInFrames: calculateDuration(fps, props.scenes || threadData) || fps * 10,
+                        fps,
+                    };
+                }}
             />
             {/* エディタからのエクスポート用 */}
             <Composition
@@ -57,12 +70,13 @@ export const RemotionVideo: React.FC = () => {
                 height={1920}
                 defaultProps={{ blocks: [], imageSpans: [] }}
                 calculateMetadata={({ props }: { props: any }) => {
-                    const fps = 30;
+                    // レンダリングプロファイル（draft / proxy / final）から fps が渡される
+                    const fps = props.fps || 30;
                     const blocks = props.blocks || [];
                     const duration = blocks.reduce(
                         (acc: number, b: any) => acc + Math.ceil((b.durationInSeconds || 2) * fps), 0
                     );
-                    return { durationInFrames: Math.max(duration, fps) };
+                    return { durationInFrames: Math.max(duration, fps), fps };
                 }}
             />
             <Composition
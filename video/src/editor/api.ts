@@ -14,7 +14,7 @@ export const fetchScript = async (): Promise<EditorBlock[]> => {
         id: item.id.toString(),
         text: item.text,
         speaker: item.speaker,
-        durationInSeconds: item.duration || 5.0,
+        durationInSeconds: (item.duration || 5.0) + (item.padding || 0),
         image: item.image,
         audio: item.audio
     }));
@@ -48,6 +48,52 @@ export const saveScript = async (blocks: EditorBlock[], generateAudio: boolean =
     return response.json();
 };
 
+// サーバー側（CLIの生成スクリプトを含む）でシーンが更新されたときの差分
+export interface ScriptChange {
+    revision: number;
+    order?: number[];
+    changed?: any[];
+    removed?: number[];
+    scenes?: any[]; // IDで対応が取れない場合は全シーン
+}
+
+// シーンの変更を購読する。戻り値を呼ぶと購読を終了する
+export const subscribeScriptChanges = (onChange: (change: ScriptChange) => void): (() => void) => {
+    const source = new EventSource(`${API_BASE}/script/events`);
+    source.addEventListener('scenes', (event) => {
+        onChange(JSON.parse((event as MessageEvent).data));
+    });
+    return () => source.close();
+};
+
+// 変更・追加したブロックと削除したIDだけを送る差分保存
+export const patchScenes = async (changed: EditorBlock[], deletedIds: string[] = [], generateAudio: boolean = true, speedScale: number = 1.0) => {
+    const scenes = changed.map((block, index) => ({
+        id: parseInt(block.id) || Date.now() + index,
+        speaker: block.speaker,
+        text: block.text,
+        emotion: "normal",
+        action: "none",
+        audio: block.audio || "",
+        image: block.image,
+        duration: block.durationInSeconds
+    }));
+
+    const response = await fetch(`${API_BASE}/scenes?generate_audio=${generateAudio}&speed_scale=${speedScale}`, {
+        method: 'PATCH',
+        headers: {
+            'Content-Type': 'application/json',
+        },
+        body: JSON.stringify({ scenes, deleted: deletedIds.map((id) => parseInt(id)).filter((id) => !isNaN(id)) }),
+    });
+
+    if (!response.ok) {
+        throw new Error('Failed to patch scenes');
+    }
+
+    return response.json();
+};
+
 export const uploadImage = async (file: File): Promise<string> => {
     // Try backend upload first
     try {
@@ -103,16 +149,24 @@ export const uploadImageAsBase64 = async (file: File): Promise<string> => {
 // ============================================================
 
 export interface RenderStatus {
-    status: 'idle' | 'rendering' | 'done' | 'error';
+    status: 'idle' | 'rendering' | 'done' | 'error' | 'cancelled';
     progress: number;
     error?: string | null;
+    phase?: 'starting' | 'bundling' | 'selecting' | 'rendering' | 'encoding' | 'done';
+    renderedFrames?: number;
+    totalFrames?: number;
+    fps?: number;
+    eta?: number | null; // 残り時間（秒）
 }
 
-export const startRender = async (blocks: EditorBlock[], imageSpans: ImageSpan[]): Promise<void> => {
+// draft: 確認用の低解像度・低fps / proxy: 中間 / final: 本番品質
+export type RenderProfile = 'draft' | 'proxy' | 'final';
+
+export const startRender = async (blocks: EditorBlock[], imageSpans: ImageSpan[], profile: RenderProfile = 'final'): Promise<void> => {
     const response = await fetch(`${API_BASE}/render`, {
         method: 'POST',
         headers: { 'Content-Type': 'application/json' },
-        body: JSON.stringify({ blocks, imageSpans }),
+        body: JSON.stringify({ blocks, imageSpans, profile }),
     });
 
     if (!response.ok) {
@@ -129,6 +183,25 @@ export const getRenderStatus = async (): Promise<RenderStatus> => {
     return response.json();
 };
 
+// 実行中のエクスポートを中断する（結果は getRenderStatus の status: 'cancelled' で確認する）
+export const cancelRender = async (): Promise<void> => {
+    const response = await fetch(`${API_BASE}/render/cancel`, { method: 'POST' });
+    if (!response.ok) {
+        const err = await response.json().catch(() => ({ detail: 'Unknown error' }));
+        throw new Error(err.detail || 'Failed to cancel render');
+    }
+};
+
 export const getRenderDownloadUrl = (): string => {
     return `${API_BASE}/render/download`;
 };
+
+// public/audio, public/images のファイルを内容ハッシュ付きURLで取得する（ブラウザに長期キャッシュされる）
+export const getMediaUrl = async (path: string): Promise<string> => {
+    const response = await fetch(`${API_BASE}/media_url?path=${encodeURIComponent(path)}`);
+    if (!response.ok) {
+        throw new Error('Failed to resolve media url');
+    }
+    const data = await response.json();
+    return `${API_BASE.replace(/\/api$/, '')}${data.url}`;
+};
@@ -11,7 +11,7 @@ import { PreviewTransformOverlay } from '../components/PreviewTransformOverlay';
 import { ImageSpanOverlay } from '../components/ImageSpanOverlay';
 import { EditorPreview } from '../../remotion/compositions/EditorPreview';
 import { ImageLayer, getBlockImages } from '../types';
-import { startRender, getRenderStatus, getRenderDownloadUrl, RenderStatus } from '../api';
+import { startRender, cancelRender, getRenderStatus, getRenderDownloadUrl, RenderStatus } from '../api';
 import styles from './MainLayout.module.css';
 
 export const MainLayout: React.FC = () => {
@@ -57,7 +57,7 @@ export const MainLayout: React.FC = () => {
                 try {
                     const status = await getRenderStatus();
                     setRenderStatus(status);
-                    if (status.status === 'done' || status.status === 'error') {
+                    if (status.status === 'done' || status.status === 'error' || status.status === 'cancelled') {
                         clearInterval(pollInterval);
                     }
                 } catch {
@@ -597,7 +597,17 @@ export const MainLayout: React.FC = () => {
                             {renderStatus.status === 'rendering' && (
                                 <>
                                     <span className={styles.exportSpinner} />
-                                    <span>エクスポート中... {renderStatus.progress}%</span>
+                                    <span>
+                                        エクスポート中... {renderStatus.progress}%
+                                        {renderStatus.phase === 'encoding' && ' (エンコード中)'}
+                                        {renderStatus.eta != null && ` 残り約${renderStatus.eta}秒`}
+                                    </span>
+                                    <button
+                                        className={styles.exportDownloadBtn}
+                                        onClick={() => cancelRender().catch(() => {})}
+                                    >
+                                        中止
+                                    </button>
                                 </>
                             )}
                             {renderStatus.status === 'done' && (
@@ -613,6 +623,9 @@ export const MainLayout: React.FC = () => {
                                     </a>
                                 </>
                             )}
+                            {renderStatus.status === 'cancelled' && (
+                                <span>エクスポートを中止しました</span>
+                            )}
                             {renderStatus.status === 'error' && (
                                 <span style={{ color: '#f87171' }}>
                                     エラー: {renderStatus.error || '不明なエラー'}
@@ -40,8 +40,8 @@ export const UILayer: React.FC<UILayerProps> = ({
 
     return (
         <AbsoluteFill>
-            {/* 音声 */}
-            <Audio src={staticFile(scene.audio)} />
+            {/* 音声（空の場合は無音区間） */}
+            {scene.audio && <Audio src={staticFile(scene.audio)} volume={scene.mix.voiceGain} />}
 
             {/* 感情オーバーレイ */}
             <MoodOverlay emotion={scene.emotion} opacity={0.5} />
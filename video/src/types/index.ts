@@ -116,6 +116,15 @@ export interface DirectionHints {
     isCutaway?: boolean;               // カットアウェイ（画像挿入シーン）
 }
 
+/**
+ * ミックス設定
+ * Python側(audio_mastering.py)で事前計算した音量値
+ */
+export interface MixSettings {
+    voiceGain: number;                 // ナレーション音量（ラウドネス正規化済みゲイン）
+    bgmGain: number;                   // このシーン中のBGM音量（ダッキング込み）
+}
+
 // ========================================
 // データ構造
 // ========================================
@@ -127,13 +136,14 @@ export interface DirectionHints {
 export interface ThreadItem {
     // === 必須フィールド ===
     id: number;                        // シーンID（1から連番）
-    audio: string;                     // 音声ファイルパス (例: "audio/scene_0.wav")
+    audio: string;                     // 音声ファイルパス (例: "audio/scene_0.wav")、空文字なら無音区間
 
     // === 基本フィールド ===
     speaker?: Speaker;                 // 話者 (デフォルト: "kanon")
     text?: string;                     // セリフテキスト
     type?: SceneType;                  // シーンタイプ (デフォルト: "narration")
     duration?: number;                 // 表示時間（秒）音声長から自動計算可
+    padding?: number;                  // 末尾の無音余白（秒）、durationに加算される
     emotion?: Emotion;                 // 感情 (デフォルト: "normal")
     action?: Action;                   // アクション (デフォルト: "none")
 
@@ -149,6 +159,7 @@ export interface ThreadItem {
     vfx?: Partial<VFXSettings>;                // VFX設定
     telop?: Partial<TelopSettings>;            // テロップ設定
     direction?: Partial<DirectionHints>;       // 演出ヒント
+    mix?: Partial<MixSettings>;                // 音量バランス
 
     // === 下位互換性 ===
     comment_text?: string;
@@ -178,6 +189,7 @@ export interface ProcessedScene {
     vfx: VFXSettings;
     telop: TelopSettings;
     direction: DirectionHints;
+    mix: MixSettings;
     emphasis_words: string[];  // 下位互換性
 }
 
@@ -283,6 +295,12 @@ export const DEFAULT_DIRECTION: DirectionHints = {
     isCutaway: false
 };
 
+/** デフォルトのミックス設定（従来の固定BGM音量 0.15 と同等） */
+export const DEFAULT_MIX: MixSettings = {
+    voiceGain: 1.0,
+    bgmGain: 0.15
+};
+
 // ========================================
 // ユーティリティ関数
 // ========================================
@@ -324,7 +342,7 @@ export function processThreadItem(
         comment_text: item.comment_text,
         audio: item.audio,
         bg_image: item.image || item.bg_image || 'images/bg_thread.jpg',
-        durationInFrames: Math.ceil((item.duration || 5) * fps),
+        durationInFrames: Math.ceil(((item.duration || 5) + (item.padding || 0)) * fps),
         emotion: item.emotion || 'normal',
         action: item.action || 'none',
         bgm: item.bgm || lastBgm,
@@ -335,6 +353,7 @@ export function processThreadItem(
         vfx: { ...DEFAULT_VFX, ...item.vfx },
         telop,
         direction: { ...DEFAULT_DIRECTION, ...item.direction },
+        mix: { ...DEFAULT_MIX, ...item.mix },
         emphasis_words: telop.emphasisWords || []
     };
 }
@@ -105,6 +105,7 @@ export const DialogBox: React.FC<DialogBoxProps> = ({
                     lineHeight: 1.15,
                     letterSpacing: '0px',
                     wordBreak: 'break-word',
+                    whiteSpace: 'pre-line', // 字幕分割で入れた改行をそのまま表示する
                     textShadow: `
                         4px 4px 0 #000,
                         -4px -4px 0 #000,